@@ -1,12 +1,218 @@
+from array import array
 from collections import deque
-import heapq
 import math
+from time import perf_counter_ns
+
+DIRECTIONS = ('UP', 'DOWN', 'LEFT', 'RIGHT')
+DIRECTION_CODES = {'UP': 1, 'DOWN': 2, 'LEFT': 3, 'RIGHT': 4}  # 0 marks an unvisited cell
+OPPOSITE_CODES = (0, 2, 1, 4, 3)  # Direction code -> code of the reverse move (0 stays unvisited)
+START_MARK = 255  # Direction record of the search start cell
+BLOCKED_MARK = 254  # Direction record of a dynamic obstacle, never entered
+# Grid values: 0 floor, 1 wall, 2 and above floor that costs that much to enter (slow tiles)
+WALL_COST = 255  # Entry cost recorded for walls, never used since walls are never entered
+MAX_COST = 254  # Largest entry cost of an open cell, extra costs are clamped to it
+
+def cell_cost(value):
+    """Cost of entering a cell with the given grid value"""
+    if value == 1:
+        return WALL_COST
+    return value if value > 1 else 1
+
+class IndexedMinHeap:
+    """
+    Binary min-heap of cells with one entry per cell, so a better priority for a queued
+    cell moves its entry up (decrease-key) instead of pushing a duplicate
+    """
+    def __init__(self):
+        self.heap = []  # [priority, cell] entries
+        self.index = {}  # cell -> position of its entry in heap
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, cell):
+        return cell in self.index
+
+    def push(self, cell, priority):
+        """Insert cell, or lower its priority if it is already queued with a worse one"""
+        position = self.index.get(cell)
+        if position is None:
+            self.heap.append([priority, cell])
+            self.index[cell] = len(self.heap) - 1
+            self.sift_up(len(self.heap) - 1)
+        elif priority < self.heap[position][0]:
+            self.heap[position][0] = priority
+            self.sift_up(position)
+
+    def pop(self):
+        """Remove and return the (priority, cell) with the smallest priority"""
+        heap = self.heap
+        priority, cell = heap[0]
+        del self.index[cell]
+        last = heap.pop()
+        if heap:
+            heap[0] = last
+            self.index[last[1]] = 0
+            self.sift_down(0)
+        return priority, cell
+
+    def sift_up(self, position):
+        heap, index = self.heap, self.index
+        entry = heap[position]
+        while position > 0:
+            parent = (position - 1) >> 1
+            if heap[parent][0] <= entry[0]:
+                break
+            heap[position] = heap[parent]
+            index[heap[position][1]] = position
+            position = parent
+        heap[position] = entry
+        index[entry[1]] = position
+
+    def sift_down(self, position):
+        heap, index = self.heap, self.index
+        size = len(heap)
+        entry = heap[position]
+        while True:
+            child = 2 * position + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1][0] < heap[child][0]:
+                child += 1
+            if entry[0] <= heap[child][0]:
+                break
+            heap[position] = heap[child]
+            index[heap[position][1]] = position
+            position = child
+        heap[position] = entry
+        index[entry[1]] = position
+
+class SearchStats:
+    """
+    Per-call search measurements, aggregated per algorithm
+    Each record holds nodes expanded, nodes pushed onto the frontier, peak frontier size
+    and the wall time of the call in nanoseconds
+    """
+    FIELDS = ('algorithm', 'method', 'nodes_expanded', 'nodes_pushed', 'peak_frontier', 'duration_ns')
+
+    def __init__(self, keep_calls=True):
+        self.keep_calls = keep_calls  # Keep every call record, not only the per-algorithm totals
+        self.calls = []
+        self.totals = {}
+
+    def record(self, algorithm, method, expanded, pushed, peak, duration_ns):
+        if self.keep_calls:
+            self.calls.append((algorithm, method, expanded, pushed, peak, duration_ns))
+        totals = self.totals.get(algorithm)
+        if totals is None:
+            totals = self.totals[algorithm] = {
+                'calls': 0, 'nodes_expanded': 0, 'nodes_pushed': 0, 'peak_frontier': 0, 'duration_ns': 0,
+            }
+        totals['calls'] += 1
+        totals['nodes_expanded'] += expanded
+        totals['nodes_pushed'] += pushed
+        totals['peak_frontier'] = max(totals['peak_frontier'], peak)
+        totals['duration_ns'] += duration_ns
+
+    def summary(self):
+        """Totals per algorithm plus per-call means"""
+        summary = {}
+        for algorithm, totals in self.totals.items():
+            calls = totals['calls']
+            summary[algorithm] = dict(
+                totals,
+                mean_nodes_expanded=totals['nodes_expanded'] / calls,
+                mean_duration_ns=totals['duration_ns'] / calls,
+            )
+        return summary
+
+    def reset(self):
+        self.calls.clear()
+        self.totals.clear()
+
+    def write_csv(self, path):
+        """Export every recorded call, one row per search"""
+        import csv
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(self.FIELDS)
+            writer.writerows(self.calls)
 
 class PathfindingAlgorithms:
     def __init__(self, grid):
-        self.grid = grid
+        self.grid = grid  # Nested lists or a maze.Maze, anything indexable as grid[row][col]
         self.rows = len(grid)
         self.cols = len(grid[0]) if grid else 0
+        self.wavefront = None  # NumPy engine, created on first use
+        self.incremental = None  # D* Lite planner, keeps its search state between calls
+        self.hierarchy = None  # HPA* cluster graph, created on first use
+        self.stats = None  # SearchStats while instrumentation is enabled
+        self.rebuild_index()
+
+    def rebuild_index(self):
+        """
+        Compile the grid into the neighbor index used by every search
+        moves[cell] is a bitmask of the open moves out of a cell (bit k is DIRECTIONS[k]),
+        and move_table[mask] lists the (cell offset, direction code) pairs for that mask
+        Call this again if the grid is replaced or resized; single cell edits go through set_cell
+        """
+        # Cell id offsets matching DIRECTIONS, used to walk the direction records backwards
+        self.move_offsets = (-self.cols, self.cols, -1, 1)
+        self.move_table = tuple(
+            tuple((self.move_offsets[k], k + 1) for k in range(4) if mask & (1 << k))
+            for mask in range(16)
+        )
+        self.wavefront = None
+        self.incremental = None
+        self.hierarchy = None
+        self.moves = bytearray(self.rows * self.cols)
+        self.costs = bytearray(self.rows * self.cols)  # Entry cost of each cell, used by Dijkstra and A*
+        grid, rows, cols = self.grid, self.rows, self.cols
+        for row in range(rows):
+            # Fetch each row once, which matters for compact grids (maze.Maze) where rows are views
+            above = grid[row - 1] if row > 0 else None
+            here = grid[row]
+            below = grid[row + 1] if row < rows - 1 else None
+            for col in range(cols):
+                mask = 0
+                if above is not None and above[col] != 1: mask |= 1
+                if below is not None and below[col] != 1: mask |= 2
+                if col > 0 and here[col - 1] != 1: mask |= 4
+                if col < cols - 1 and here[col + 1] != 1: mask |= 8
+                self.moves[row * cols + col] = mask
+                self.costs[row * cols + col] = cell_cost(here[col])
+        self.update_min_cost()
+
+    def update_min_cost(self):
+        """Cheapest entry cost of any open cell, the scale that keeps the A* heuristics admissible"""
+        self.min_cost = min(self.costs, default=1)
+        if self.min_cost == WALL_COST:
+            self.min_cost = 1  # No open cell at all
+
+    def compute_moves(self, row, col):
+        """Bitmask of the moves from (row, col) that land on an in-bounds non-wall cell"""
+        mask = 0
+        if row > 0 and self.grid[row - 1][col] != 1: mask |= 1
+        if row < self.rows - 1 and self.grid[row + 1][col] != 1: mask |= 2
+        if col > 0 and self.grid[row][col - 1] != 1: mask |= 4
+        if col < self.cols - 1 and self.grid[row][col + 1] != 1: mask |= 8
+        return mask
+
+    def set_cell(self, pos, value):
+        """Change one grid cell and patch the neighbor index of it and its four neighbors"""
+        row, col = pos
+        self.grid[row][col] = value
+        self.wavefront = None  # Its open-cell array is a copy of the grid
+        self.incremental = None  # Its g/rhs values assume the old walls
+        old_cost = self.costs[row * self.cols + col]
+        self.costs[row * self.cols + col] = cell_cost(value)
+        if self.costs[row * self.cols + col] < self.min_cost or old_cost == self.min_cost:
+            self.update_min_cost()
+        for r, c in ((row, col), (row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)):
+            if 0 <= r < self.rows and 0 <= c < self.cols:
+                self.moves[r * self.cols + c] = self.compute_moves(r, c)
+        if self.hierarchy is not None:
+            self.hierarchy.update_cell(pos)  # Only the clusters around the cell are rebuilt
 
     def is_valid_move(self, pos, dynamic_obstacles=None):
         """Check if a position is valid (within bounds, not a wall, not a dynamic obstacle)"""
@@ -20,20 +226,74 @@ class PathfindingAlgorithms:
     def get_neighbors(self, pos, dynamic_obstacles=None):
         """Get all valid neighboring positions"""
         row, col = pos
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            return []
+        cols = self.cols
+        cell = row * cols + col
         neighbors = []
-        directions = [
-            ('UP', (-1, 0)),
-            ('DOWN', (1, 0)),
-            ('LEFT', (0, -1)),
-            ('RIGHT', (0, 1))
-        ]
-
-        for direction, (dr, dc) in directions:
-            new_pos = (row + dr, col + dc)
-            if self.is_valid_move(new_pos, dynamic_obstacles):
-                neighbors.append((new_pos, direction))
+        for offset, code in self.move_table[self.moves[cell]]:
+            new_pos = divmod(cell + offset, cols)
+            if not (dynamic_obstacles and new_pos in dynamic_obstacles):
+                neighbors.append((new_pos, DIRECTIONS[code - 1]))
         return neighbors
 
+    def cell_id(self, pos):
+        """Flat index of a position, row * cols + col"""
+        return pos[0] * self.cols + pos[1]
+
+    def new_came_from(self, start_cell, dynamic_obstacles=None):
+        """
+        Allocate the per-cell direction records for one search
+        Only the start is marked, plus any in-bounds dynamic obstacles, which masks
+        them out of the neighbor index for this search without touching it
+        """
+        came_from = bytearray(self.rows * self.cols)
+        if dynamic_obstacles:
+            for row, col in dynamic_obstacles:
+                if 0 <= row < self.rows and 0 <= col < self.cols:
+                    came_from[row * self.cols + col] = BLOCKED_MARK
+        came_from[start_cell] = START_MARK
+        return came_from
+
+    def search_costs(self, extra_costs=None):
+        """
+        Entry costs for one search: the grid's own, or a copy with extra_costs
+        ({position: added cost}, e.g. danger around the ghost) added and clamped to MAX_COST
+        """
+        if not extra_costs:
+            return self.costs
+        costs = bytearray(self.costs)
+        for (row, col), extra in extra_costs.items():
+            if 0 <= row < self.rows and 0 <= col < self.cols:
+                cell = row * self.cols + col
+                if costs[cell] != WALL_COST:
+                    costs[cell] = min(MAX_COST, costs[cell] + extra)
+        return costs
+
+    def reconstruct_path(self, came_from, start_cell, target_cell):
+        """Rebuild the direction list by following the direction records back from target"""
+        cell = target_cell
+        path = []
+        while cell != start_cell:
+            move = came_from[cell] - 1
+            path.append(DIRECTIONS[move])
+            cell -= self.move_offsets[move]
+        path.reverse()
+        return path
+
+    def enable_instrumentation(self, stats=None):
+        """Start recording every search into stats (a new SearchStats if none given) and return it"""
+        self.stats = stats if stats is not None else SearchStats()
+        return self.stats
+
+    def disable_instrumentation(self):
+        self.stats = None
+
+    def record_search(self, algorithm, method, started, expanded, pushed, peak):
+        """Hand one finished search to the stats, only timed and stored while instrumentation is on"""
+        if self.stats is not None:
+            self.stats.record(algorithm, method, expanded, pushed, peak, perf_counter_ns() - started)
+
     def manhattan_distance(self, pos1, pos2):
         """Calculate Manhattan distance between two positions"""
         return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
@@ -43,103 +303,574 @@ class PathfindingAlgorithms:
         Breadth-First Search: Find shortest path from start to target
         Returns list of directions to reach target
         """
+        moves, move_table = self.moves, self.move_table
+        start_cell = self.cell_id(start)
+        target_cell = self.cell_id(target)
+        came_from = self.new_came_from(start_cell, dynamic_obstacles)  # Doubles as the visited set
         queue = deque()
-        queue.append((start, []))  # (position, path)
-        visited = set()
-        visited.add(start)
+        queue.append(start_cell)
 
+        started = perf_counter_ns() if self.stats is not None else 0
+        expanded = 0
+        peak = 1
         while queue:
-            current_pos, path = queue.popleft()
+            cell = queue.popleft()
+            expanded += 1
 
-            if current_pos == target:
-                return path
+            if cell == target_cell:
+                self.record_search('bfs', 'bfs', started, expanded, expanded + len(queue), peak)
+                return self.reconstruct_path(came_from, start_cell, target_cell)
 
-            for neighbor_pos, direction in self.get_neighbors(current_pos, dynamic_obstacles):
-                if neighbor_pos not in visited:
-                    visited.add(neighbor_pos)
-                    queue.append((neighbor_pos, path + [direction]))
+            for offset, code in move_table[moves[cell]]:
+                neighbor = cell + offset
+                if not came_from[neighbor]:
+                    came_from[neighbor] = code
+                    queue.append(neighbor)
+            if len(queue) > peak:
+                peak = len(queue)
+        self.record_search('bfs', 'bfs', started, expanded, expanded + len(queue), peak)
         return []
 
-    def dijkstra(self, start, target, dynamic_obstacles=None):
+    def bidirectional_search(self, start, goals, dynamic_obstacles, method):
+        """
+        BFS grown from the start and from every goal at once, always expanding one whole layer
+        of the smaller frontier, so each side only explores a ball of about half the distance
+        A cell labeled by both sides is a meeting point; the layer that finds the first one is
+        finished and its shortest meeting kept, which makes the stitched path a shortest one
+        Returns (goal_cell, path_to_goal), or (None, []) when the sides never meet
+        """
+        moves, move_table = self.moves, self.move_table
+        size = self.rows * self.cols
+        start_cell = self.cell_id(start)
+        came_from = self.new_came_from(start_cell, dynamic_obstacles)  # Forward records and obstacle marks
+        toward_goal = bytearray(size)  # Direction of the step from a backward-labeled cell towards its goal
+        forward_depth = array('i', [-1]) * size
+        backward_depth = array('i', [-1]) * size
+        forward_depth[start_cell] = 0
+        forward_frontier = [start_cell]
+        backward_frontier = []
+        for goal in goals:
+            if came_from[goal] != BLOCKED_MARK:
+                toward_goal[goal] = START_MARK
+                backward_depth[goal] = 0
+                backward_frontier.append(goal)
+
+        started = perf_counter_ns() if self.stats is not None else 0
+        expanded = 0
+        pushed = 1 + len(backward_frontier)
+        peak = pushed
+        best_length = -1
+        meeting = None
+        while forward_frontier and backward_frontier and meeting is None:
+            next_frontier = []
+            if len(forward_frontier) <= len(backward_frontier):
+                for cell in forward_frontier:
+                    expanded += 1
+                    depth = forward_depth[cell] + 1
+                    for offset, code in move_table[moves[cell]]:
+                        neighbor = cell + offset
+                        if came_from[neighbor]:
+                            continue  # Already labeled, the start, or an obstacle
+                        came_from[neighbor] = code
+                        forward_depth[neighbor] = depth
+                        next_frontier.append(neighbor)
+                        if backward_depth[neighbor] >= 0 and (meeting is None or depth + backward_depth[neighbor] < best_length):
+                            meeting = neighbor
+                            best_length = depth + backward_depth[neighbor]
+                forward_frontier = next_frontier
+            else:
+                for cell in backward_frontier:
+                    expanded += 1
+                    depth = backward_depth[cell] + 1
+                    for offset, code in move_table[moves[cell]]:
+                        neighbor = cell + offset
+                        if toward_goal[neighbor] or came_from[neighbor] == BLOCKED_MARK:
+                            continue
+                        toward_goal[neighbor] = OPPOSITE_CODES[code]
+                        backward_depth[neighbor] = depth
+                        next_frontier.append(neighbor)
+                        if forward_depth[neighbor] >= 0 and (meeting is None or depth + forward_depth[neighbor] < best_length):
+                            meeting = neighbor
+                            best_length = depth + forward_depth[neighbor]
+                backward_frontier = next_frontier
+            pushed += len(next_frontier)
+            if len(forward_frontier) + len(backward_frontier) > peak:
+                peak = len(forward_frontier) + len(backward_frontier)
+        self.record_search('bibfs', method, started, expanded, pushed, peak)
+        if meeting is None:
+            return None, []
+
+        path = self.reconstruct_path(came_from, start_cell, meeting)
+        cell = meeting
+        while toward_goal[cell] != START_MARK:
+            move = toward_goal[cell] - 1
+            path.append(DIRECTIONS[move])
+            cell += self.move_offsets[move]
+        return cell, path
+
+    def bidirectional_bfs(self, start, target, dynamic_obstacles=None):
+        """
+        Bidirectional BFS: shortest path from start to target, searching from both ends
+        Returns list of directions to reach target
+        """
+        goals = self.goal_cells(start, [target])
+        if not goals:
+            return []
+        return self.bidirectional_search(start, goals, dynamic_obstacles, 'bidirectional_bfs')[1]
+
+    def bidirectional_bfs_multi(self, start, targets, dynamic_obstacles=None):
+        """
+        Multi-target bidirectional BFS: the backward side starts from every target, so the
+        meeting point lies on a shortest path to the nearest one
+        Returns (target_position, path_to_target)
+        """
+        goals = self.goal_cells(start, targets)
+        if not goals:
+            return None, []
+        goal_cell, path = self.bidirectional_search(start, goals, dynamic_obstacles, 'bidirectional_bfs_multi')
+        if goal_cell is None:
+            return None, []
+        return divmod(goal_cell, self.cols), path
+
+    def dijkstra(self, start, target, dynamic_obstacles=None, extra_costs=None):
         """
-        Dijkstra's Algorithm: Find shortest path from start to target
+        Dijkstra's Algorithm: Find the cheapest path from start to target, paying each cell's entry cost
         Returns list of directions to reach target
         """
-        heap = [(0, start, [])]  # (distance, position, path)
-        distances = {start: 0}
-        processed_nodes = set()
+        moves, move_table = self.moves, self.move_table
+        costs = self.search_costs(extra_costs)
+        start_cell = self.cell_id(start)
+        target_cell = self.cell_id(target)
+        came_from = self.new_came_from(start_cell, dynamic_obstacles)
+        heap = IndexedMinHeap()
+        heap.push(start_cell, 0)
+        distances = {start_cell: 0}
 
+        started = perf_counter_ns() if self.stats is not None else 0
+        expanded = 0
+        pushed = 1
+        peak = 1
         while heap:
-            current_distance, current_pos, path = heapq.heappop(heap)
+            # Non-negative costs: a popped cell's distance is final and it is never queued again
+            current_distance, cell = heap.pop()
+            expanded += 1
+
+            if cell == target_cell:
+                self.record_search('dijkstra', 'dijkstra', started, expanded, pushed, peak)
+                return self.reconstruct_path(came_from, start_cell, target_cell)
+
+            for offset, code in move_table[moves[cell]]:
+                neighbor = cell + offset
+                if came_from[neighbor] == BLOCKED_MARK:
+                    continue
+                new_distance = current_distance + costs[neighbor]
+                if new_distance < distances.get(neighbor, math.inf):
+                    distances[neighbor] = new_distance
+                    came_from[neighbor] = code
+                    heap.push(neighbor, new_distance)  # Insert or decrease-key
+                    pushed += 1
+            if len(heap) > peak:
+                peak = len(heap)
+        self.record_search('dijkstra', 'dijkstra', started, expanded, pushed, peak)
+        return []
+
+    def a_star(self, start, target, dynamic_obstacles=None, extra_costs=None):
+        """
+        A* Search: Find the cheapest path from start to target using heuristic
+        Manhattan distance times the cheapest cell cost never overestimates, so paths stay optimal
+        Returns list of directions to reach target
+        """
+        cols = self.cols
+        moves, move_table = self.moves, self.move_table
+        costs = self.search_costs(extra_costs)
+        scale = self.min_cost
+        start_cell = self.cell_id(start)
+        target_cell = self.cell_id(target)
+        target_row, target_col = target
+        came_from = self.new_came_from(start_cell, dynamic_obstacles)
+        heap = IndexedMinHeap()
+        heap.push(start_cell, (0, 0))  # Priority (f_score, g_score)
+        g_scores = {start_cell: 0}
 
-            if current_pos in processed_nodes:
-                continue
-            processed_nodes.add(current_pos)
+        started = perf_counter_ns() if self.stats is not None else 0
+        expanded = 0
+        pushed = 1
+        peak = 1
+        while heap:
+            # The heuristic is consistent, so a popped cell is settled and never queued again
+            (f_score_val, g_score), cell = heap.pop()
+            expanded += 1
 
-            if current_pos == target:
-                return path
+            if cell == target_cell:
+                self.record_search('astar', 'a_star', started, expanded, pushed, peak)
+                return self.reconstruct_path(came_from, start_cell, target_cell)
 
-            for neighbor_pos, direction in self.get_neighbors(current_pos, dynamic_obstacles):
-                new_distance = current_distance + 1
-                if neighbor_pos not in distances or new_distance < distances[neighbor_pos]:
-                    distances[neighbor_pos] = new_distance
-                    heapq.heappush(heap, (new_distance, neighbor_pos, path + [direction]))
+            for offset, code in move_table[moves[cell]]:
+                neighbor = cell + offset
+                if came_from[neighbor] == BLOCKED_MARK:
+                    continue
+                tentative_g_score = g_score + costs[neighbor]
+                if tentative_g_score < g_scores.get(neighbor, math.inf):
+                    g_scores[neighbor] = tentative_g_score
+                    came_from[neighbor] = code
+                    row, col = divmod(neighbor, cols)
+                    h_score = scale * (abs(row - target_row) + abs(col - target_col))
+                    new_f_score = tentative_g_score + h_score
+                    heap.push(neighbor, (new_f_score, tentative_g_score))  # Insert or decrease-key
+                    pushed += 1
+            if len(heap) > peak:
+                peak = len(heap)
+        self.record_search('astar', 'a_star', started, expanded, pushed, peak)
         return []
 
-    def a_star(self, start, target, dynamic_obstacles=None):
+    def get_wavefront(self):
+        """NumPy wavefront engine over the current grid (needs numpy, imported only when used)"""
+        if self.wavefront is None:
+            from wavefront import WavefrontBFS
+            self.wavefront = WavefrontBFS(self.grid)
+        return self.wavefront
+
+    def wavefront_bfs(self, start, target, dynamic_obstacles=None):
+        """
+        Vectorized BFS: one NumPy step per wavefront layer, meant for very large maps
+        Returns list of directions to reach target, same lengths as bfs
+        """
+        started = perf_counter_ns() if self.stats is not None else 0
+        wavefront = self.get_wavefront()
+        path = wavefront.bfs(start, target, dynamic_obstacles)
+        self.record_search('wavefront', 'wavefront_bfs', started,
+                           wavefront.last_expanded, wavefront.last_reached, wavefront.last_peak)
+        return path
+
+    def wavefront_bfs_multi(self, start, targets, dynamic_obstacles=None):
+        """
+        Multi-target vectorized BFS, stops at the first wavefront layer holding a target
+        Returns (target_position, path_to_target)
         """
-        A* Search: Find optimal path from start to target using heuristic
+        started = perf_counter_ns() if self.stats is not None else 0
+        wavefront = self.get_wavefront()
+        result = wavefront.bfs_multi(start, targets, dynamic_obstacles)
+        self.record_search('wavefront', 'wavefront_bfs_multi', started,
+                           wavefront.last_expanded, wavefront.last_reached, wavefront.last_peak)
+        return result
+
+    def dstar_lite_multi(self, start, targets, dynamic_obstacles=None):
+        """
+        Incremental multi-target search (D* Lite): reuses the previous call's search and only
+        repairs what changed in start, targets and dynamic obstacles
+        Returns (target_position, path_to_target)
+        """
+        if self.incremental is None:
+            from incremental import DStarLite
+            self.incremental = DStarLite(self)
+        return self.incremental.plan(start, targets, dynamic_obstacles)
+
+    def get_hierarchy(self):
+        """HPA* cluster graph over the current grid, built on first use and patched by set_cell"""
+        if self.hierarchy is None:
+            from hierarchical import HierarchicalPathfinder
+            self.hierarchy = HierarchicalPathfinder(self)
+        return self.hierarchy
+
+    def hpa(self, start, target):
+        """
+        Hierarchical A* (HPA*): near-optimal path over precomputed cluster-to-cluster distances,
+        for long queries on huge mazes. Pays cell costs, ignores dynamic obstacles
         Returns list of directions to reach target
         """
-        heap = [(0, 0, start, [])]  # (f_score, g_score, position, path)
-        g_scores = {start: 0}
-        closed_set = set()
+        return self.get_hierarchy().find_path(start, target)
+
+    def multi_target_heuristic(self, pos, targets):
+        """
+        Admissible heuristic for a target set: Manhattan distance to the nearest target
+        A food_index.FoodIndex answers from the buckets near pos instead of every target
+        """
+        if hasattr(targets, 'nearest_distance'):
+            return targets.nearest_distance(pos)
+        row, col = pos
+        return min(abs(row - t_row) + abs(col - t_col) for t_row, t_col in targets)
+
+    def goal_cells(self, start, targets):
+        """Cell ids of the targets, without the start cell since a target under Pacman needs no path"""
+        cells = getattr(targets, 'cells', None)  # A FoodIndex keeps them already
+        goals = set(cells) if cells is not None else set(self.cell_id(target) for target in targets)
+        goals.discard(self.cell_id(start))
+        return goals
+
+    def bfs_multi(self, start, targets, dynamic_obstacles=None):
+        """
+        Multi-target BFS: a single expansion from start that stops at the first target reached
+        Returns (target_position, path_to_target)
+        """
+        goals = self.goal_cells(start, targets)
+        if not goals:
+            return None, []
+
+        moves, move_table = self.moves, self.move_table
+        start_cell = self.cell_id(start)
+        came_from = self.new_came_from(start_cell, dynamic_obstacles)
+        queue = deque()
+        queue.append(start_cell)
+
+        started = perf_counter_ns() if self.stats is not None else 0
+        expanded = 0
+        peak = 1
+        while queue:
+            cell = queue.popleft()
+            expanded += 1
+
+            if cell in goals:
+                self.record_search('bfs', 'bfs_multi', started, expanded, expanded + len(queue), peak)
+                return divmod(cell, self.cols), self.reconstruct_path(came_from, start_cell, cell)
+
+            for offset, code in move_table[moves[cell]]:
+                neighbor = cell + offset
+                if not came_from[neighbor]:
+                    came_from[neighbor] = code
+                    queue.append(neighbor)
+            if len(queue) > peak:
+                peak = len(queue)
+        self.record_search('bfs', 'bfs_multi', started, expanded, expanded + len(queue), peak)
+        return None, []
+
+    def dijkstra_multi(self, start, targets, dynamic_obstacles=None, extra_costs=None):
+        """
+        Multi-target Dijkstra: stops at the first target popped from the heap, the cheapest to reach
+        Returns (target_position, path_to_target)
+        """
+        goals = self.goal_cells(start, targets)
+        if not goals:
+            return None, []
 
+        moves, move_table = self.moves, self.move_table
+        costs = self.search_costs(extra_costs)
+        start_cell = self.cell_id(start)
+        came_from = self.new_came_from(start_cell, dynamic_obstacles)
+        heap = IndexedMinHeap()
+        heap.push(start_cell, 0)
+        distances = {start_cell: 0}
+
+        started = perf_counter_ns() if self.stats is not None else 0
+        expanded = 0
+        pushed = 1
+        peak = 1
         while heap:
-            f_score_val, g_score, current_pos, path = heapq.heappop(heap)
+            current_distance, cell = heap.pop()
+            expanded += 1
 
-            if current_pos in closed_set:
-                continue
-            closed_set.add(current_pos)
+            if cell in goals:
+                self.record_search('dijkstra', 'dijkstra_multi', started, expanded, pushed, peak)
+                return divmod(cell, self.cols), self.reconstruct_path(came_from, start_cell, cell)
 
-            if current_pos == target:
-                return path
+            for offset, code in move_table[moves[cell]]:
+                neighbor = cell + offset
+                if came_from[neighbor] == BLOCKED_MARK:
+                    continue
+                new_distance = current_distance + costs[neighbor]
+                if new_distance < distances.get(neighbor, math.inf):
+                    distances[neighbor] = new_distance
+                    came_from[neighbor] = code
+                    heap.push(neighbor, new_distance)
+                    pushed += 1
+            if len(heap) > peak:
+                peak = len(heap)
+        self.record_search('dijkstra', 'dijkstra_multi', started, expanded, pushed, peak)
+        return None, []
 
-            for neighbor_pos, direction in self.get_neighbors(current_pos, dynamic_obstacles):
-                tentative_g_score = g_score + 1
-                if tentative_g_score < g_scores.get(neighbor_pos, float('inf')):
-                    g_scores[neighbor_pos] = tentative_g_score
-                    h_score = self.manhattan_distance(neighbor_pos, target)
+    def a_star_multi(self, start, targets, dynamic_obstacles=None, extra_costs=None):
+        """
+        Multi-target A*: guided by the distance to the nearest target, stops at the first target popped
+        Returns (target_position, path_to_target)
+        """
+        goals = self.goal_cells(start, targets)
+        if not goals:
+            return None, []
+
+        cols = self.cols
+        moves, move_table = self.moves, self.move_table
+        costs = self.search_costs(extra_costs)
+        scale = self.min_cost
+        goal_list = targets if hasattr(targets, 'nearest_distance') else [divmod(cell, cols) for cell in goals]
+        start_cell = self.cell_id(start)
+        came_from = self.new_came_from(start_cell, dynamic_obstacles)
+        heap = IndexedMinHeap()
+        heap.push(start_cell, (0, 0))  # Priority (f_score, g_score)
+        g_scores = {start_cell: 0}
+
+        started = perf_counter_ns() if self.stats is not None else 0
+        expanded = 0
+        pushed = 1
+        peak = 1
+        while heap:
+            (f_score_val, g_score), cell = heap.pop()
+            expanded += 1
+
+            if cell in goals:
+                self.record_search('astar', 'a_star_multi', started, expanded, pushed, peak)
+                return divmod(cell, cols), self.reconstruct_path(came_from, start_cell, cell)
+
+            for offset, code in move_table[moves[cell]]:
+                neighbor = cell + offset
+                if came_from[neighbor] == BLOCKED_MARK:
+                    continue
+                tentative_g_score = g_score + costs[neighbor]
+                if tentative_g_score < g_scores.get(neighbor, math.inf):
+                    g_scores[neighbor] = tentative_g_score
+                    came_from[neighbor] = code
+                    h_score = scale * self.multi_target_heuristic(divmod(neighbor, cols), goal_list)
                     new_f_score = tentative_g_score + h_score
-                    heapq.heappush(heap, (new_f_score, tentative_g_score, neighbor_pos, path + [direction]))
-        return []
+                    heap.push(neighbor, (new_f_score, tentative_g_score))
+                    pushed += 1
+            if len(heap) > peak:
+                peak = len(heap)
+        self.record_search('astar', 'a_star_multi', started, expanded, pushed, peak)
+        return None, []
 
-    def find_closest_target(self, start, targets, algorithm='bfs', dynamic_obstacles=None):
+    def jump_point_search(self, start, goals, dynamic_obstacles, method):
+        """
+        Jump Point Search for 4-connected grids, counting steps like BFS (cell costs are ignored)
+        Canonical paths may turn from horizontal to vertical anywhere, but leave a vertical run
+        only at a forced cell, where the side cell is open and the one beside the previous cell
+        is not; every other cell on a straight run is skipped over by a jump instead of being
+        pushed, so runs of symmetric equal-length paths cost one expansion
+        Returns (goal_cell, path_to_goal), or (None, []) when no goal is reachable
+        """
+        cols = self.cols
+        moves, offsets = self.moves, self.move_offsets
+        start_cell = self.cell_id(start)
+        came_from = self.new_came_from(start_cell, dynamic_obstacles)  # Only used for the obstacle marks
+        goal_list = [divmod(cell, cols) for cell in goals]
+
+        def can_move(cell, k):
+            return moves[cell] >> k & 1 and came_from[cell + offsets[k]] != BLOCKED_MARK
+
+        def jump_vertical(cell, k):
+            """Walk UP (k=0) or DOWN (k=1) until a goal or a forced cell, None at a wall"""
+            step = offsets[k]
+            while can_move(cell, k):
+                cell += step
+                if cell in goals:
+                    return cell
+                for side in (2, 3):
+                    if can_move(cell, side) and not can_move(cell - step, side):
+                        return cell
+            return None
+
+        def jump_horizontal(cell, k):
+            """Walk LEFT (k=2) or RIGHT (k=3) until a goal or a cell whose vertical runs find a jump point"""
+            step = offsets[k]
+            while can_move(cell, k):
+                cell += step
+                if cell in goals or jump_vertical(cell, 0) is not None or jump_vertical(cell, 1) is not None:
+                    return cell
+            return None
+
+        heap = IndexedMinHeap()
+        heap.push(start_cell, (0, 0))  # Priority (f_score, g_score)
+        g_scores = {start_cell: 0}
+        parents = {start_cell: (None, -1)}  # jump point -> (previous jump point, direction index of the jump)
+
+        started = perf_counter_ns() if self.stats is not None else 0
+        expanded = 0
+        pushed = 1
+        peak = 1
+        goal_cell = None
+        while heap:
+            (f_score_val, g_score), cell = heap.pop()
+            expanded += 1
+            if cell in goals:
+                goal_cell = cell
+                break
+
+            arrived = parents[cell][1]
+            if arrived < 0:
+                directions = (0, 1, 2, 3)  # The start looks every way
+            elif arrived >= 2:
+                directions = (arrived, 0, 1)  # Horizontal: keep going or turn vertical
+            else:
+                step = offsets[arrived]
+                directions = [arrived] + [side for side in (2, 3)
+                                          if can_move(cell, side) and not can_move(cell - step, side)]
+            for k in directions:
+                jump_cell = jump_vertical(cell, k) if k < 2 else jump_horizontal(cell, k)
+                if jump_cell is None:
+                    continue
+                tentative_g_score = g_score + abs(jump_cell - cell) // (1 if k >= 2 else cols)
+                if tentative_g_score < g_scores.get(jump_cell, math.inf):
+                    g_scores[jump_cell] = tentative_g_score
+                    parents[jump_cell] = (cell, k)
+                    h_score = self.multi_target_heuristic(divmod(jump_cell, cols), goal_list)
+                    heap.push(jump_cell, (tentative_g_score + h_score, tentative_g_score))
+                    pushed += 1
+            if len(heap) > peak:
+                peak = len(heap)
+        self.record_search('jps', method, started, expanded, pushed, peak)
+        if goal_cell is None:
+            return None, []
+
+        # Unroll the straight jumps between consecutive jump points into single steps
+        path = []
+        cell = goal_cell
+        while cell != start_cell:
+            parent, k = parents[cell]
+            length = abs(cell - parent) // (1 if k >= 2 else cols)
+            path.extend([DIRECTIONS[k]] * length)
+            cell = parent
+        path.reverse()
+        return goal_cell, path
+
+    def jps(self, start, target, dynamic_obstacles=None):
+        """
+        Jump Point Search: shortest path in steps from start to target
+        Returns list of directions to reach target
+        """
+        goals = self.goal_cells(start, [target])
+        if not goals:
+            return []
+        return self.jump_point_search(start, goals, dynamic_obstacles, 'jps')[1]
+
+    def jps_multi(self, start, targets, dynamic_obstacles=None):
+        """
+        Multi-target Jump Point Search: stops at the first target popped
+        Returns (target_position, path_to_target)
+        """
+        goals = self.goal_cells(start, targets)
+        if not goals:
+            return None, []
+        goal_cell, path = self.jump_point_search(start, goals, dynamic_obstacles, 'jps_multi')
+        if goal_cell is None:
+            return None, []
+        return divmod(goal_cell, self.cols), path
+
+    def find_closest_target(self, start, targets, algorithm='bfs', dynamic_obstacles=None, extra_costs=None):
         """
         Find the closest target from a set of targets using specified algorithm
+        All targets are searched for in a single expansion instead of one search per target
+        Dijkstra and A* pay cell costs (plus extra_costs) and find the cheapest target,
+        the other algorithms count steps only
         Returns (target_position, path_to_target)
         """
         if not targets:
             return None, []
 
-        closest_target = None
-        shortest_path = []
-        min_distance = float('inf')
-
-        pathfind_func = None
+        multi_search_func = None
         if algorithm == 'bfs':
-            pathfind_func = self.bfs
+            multi_search_func = self.bfs_multi
         elif algorithm == 'dijkstra':
-            pathfind_func = self.dijkstra
+            multi_search_func = self.dijkstra_multi
         elif algorithm == 'astar':
-            pathfind_func = self.a_star
+            multi_search_func = self.a_star_multi
+        elif algorithm == 'wavefront':
+            multi_search_func = self.wavefront_bfs_multi
+        elif algorithm == 'dstar':
+            multi_search_func = self.dstar_lite_multi
+        elif algorithm == 'jps':
+            multi_search_func = self.jps_multi
+        elif algorithm == 'bibfs':
+            multi_search_func = self.bidirectional_bfs_multi
         else:
-            pathfind_func = self.bfs  # Default to BFS
-
-        for target_pos in targets: # Changed target to target_pos for clarity
-            path = pathfind_func(start, target_pos, dynamic_obstacles)
-            if path and len(path) < min_distance:
-                min_distance = len(path)
-                closest_target = target_pos
-                shortest_path = path
-        return closest_target, shortest_path
\ No newline at end of file
+            multi_search_func = self.bfs_multi  # Default to BFS
+
+        if algorithm in ('dijkstra', 'astar'):
+            return multi_search_func(start, targets, dynamic_obstacles, extra_costs)
+        return multi_search_func(start, targets, dynamic_obstacles)
@@ -0,0 +1,105 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from algorithm import PathfindingAlgorithms, SearchStats
+from tour import TourPlanner
+
+logger = logging.getLogger(__name__)
+worker_pathfinder = None  # Pathfinder of a planner process, built once by init_worker
+worker_tour_planner = None  # Its tour planner, so the pellet fields stay cached between plans
+
+def init_worker(grid):
+    """Process pool initializer: index the maze once per worker instead of once per request"""
+    global worker_pathfinder, worker_tour_planner
+    worker_pathfinder = new_worker_pathfinder(grid)
+    worker_tour_planner = TourPlanner(worker_pathfinder)
+
+def new_worker_pathfinder(grid):
+    pathfinder = PathfindingAlgorithms(grid)
+    pathfinder.enable_instrumentation(SearchStats())
+    return pathfinder
+
+def run_search(pathfinder, start, targets, algorithm, dynamic_obstacles, extra_costs, fallback_obstacles=None):
+    """
+    Worker side of a plan request: one find_closest_target on the worker's own pathfinder,
+    repeated with fallback_obstacles if given and the first one found no path
+    Returns (path, cpu seconds, search records), the records are merged into the game's stats
+    """
+    pathfinder = pathfinder or worker_pathfinder
+    started = time.thread_time()
+    _, path = pathfinder.find_closest_target(start, targets, algorithm, dynamic_obstacles, extra_costs)
+    if not path and fallback_obstacles is not None:
+        _, path = pathfinder.find_closest_target(start, targets, algorithm, fallback_obstacles)
+    cpu_time = time.thread_time() - started
+    calls = list(pathfinder.stats.calls)
+    pathfinder.stats.reset()
+    return path, cpu_time, calls
+
+def run_tour_plan(tour_planner, start, pellets, blocked, time_budget, move_budget=None):
+    """Worker side of a tour request: one TourPlanner.plan, returns (tour, cpu seconds, search records)"""
+    tour_planner = tour_planner or worker_tour_planner
+    pathfinder = tour_planner.pathfinder
+    started = time.thread_time()
+    tour = tour_planner.plan(start, pellets, blocked=blocked, time_budget=time_budget, move_budget=move_budget)
+    cpu_time = time.thread_time() - started
+    calls = list(pathfinder.stats.calls)
+    pathfinder.stats.reset()
+    return tour, cpu_time, calls
+
+class AsyncPlanner:
+    """
+    Runs Pacman's searches and tour plans on a worker thread (or process) from an asyncio loop,
+    so a slow search never holds up input or rendering
+    The worker has its own pathfinder and tour planner over the same maze, so nothing is shared
+    with the game while a search runs. Results come back through the loop as callback(sequence, path,
+    cpu_time, calls); the game compares the sequence number to drop stale plans. A request
+    that raises on the worker, or cannot be queued since a worker process died, is logged
+    and answered with a path (or tour) of None, so the game never waits on it forever.
+    """
+    def __init__(self, grid, use_processes=False):
+        if use_processes:
+            rows = grid.to_rows() if hasattr(grid, 'to_rows') else grid  # maze.Maze views do not pickle
+            self.executor = ProcessPoolExecutor(max_workers=1, initializer=init_worker, initargs=(rows,))
+            self.pathfinder = None  # Lives in the worker process
+            self.tour_planner = None
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=1)
+            self.pathfinder = new_worker_pathfinder(grid)
+            self.tour_planner = TourPlanner(self.pathfinder)
+        self.in_flight = 0
+
+    def submit(self, sequence, request, callback):
+        """Queue one search; request is (start, targets, algorithm, dynamic_obstacles, extra_costs, fallback_obstacles)"""
+        self.queue(sequence, run_search, (self.pathfinder, *request), callback)
+
+    def submit_tour(self, sequence, request, callback):
+        """Queue one tour plan; request is (start, pellets, blocked, time_budget, move_budget), callback gets the tour instead of a path"""
+        self.queue(sequence, run_tour_plan, (self.tour_planner, *request), callback)
+
+    def queue(self, sequence, function, args, callback):
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.run_in_executor(self.executor, function, *args)
+        except Exception:  # A broken process pool refuses new work
+            logger.exception("Could not queue plan %d on the planner", sequence)
+            loop.call_soon(callback, sequence, None, 0.0, [])
+            return
+        self.in_flight += 1
+        future.add_done_callback(lambda done: self.finish(sequence, done, callback))
+
+    def finish(self, sequence, future, callback):
+        self.in_flight -= 1
+        if future.cancelled():
+            return
+        try:
+            result = future.result()
+        except Exception:
+            logger.exception("Plan %d failed on the planner", sequence)
+            callback(sequence, None, 0.0, [])
+            return
+        callback(sequence, *result)
+
+    def close(self):
+        """Drop queued requests and wait for the running one, which is short"""
+        self.executor.shutdown(wait=True, cancel_futures=True)
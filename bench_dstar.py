@@ -0,0 +1,60 @@
+import argparse
+import random
+from algorithm import PathfindingAlgorithms, SearchStats
+from bench_jps import MAP_KINDS, build_grid
+
+STEPS = {'UP': (-1, 0), 'DOWN': (1, 0), 'LEFT': (0, -1), 'RIGHT': (0, 1)}
+
+def run_walk(grid, targets, obstacles, steps, seed):
+    """
+    Walk towards the nearest of a few targets while obstacles wander the maze, replanning every
+    step with D* Lite (a repair of the previous search) and with a fresh multi-target BFS
+    Both must find paths of equal length; a reached target is taken out of the set
+    """
+    pathfinder = PathfindingAlgorithms(grid)
+    stats = pathfinder.enable_instrumentation(SearchStats(keep_calls=False))
+    rng = random.Random(seed)
+    open_cells = [(r, c) for r, row in enumerate(grid) for c, value in enumerate(row) if value != 1]
+    walker, *rest = rng.sample(open_cells, 1 + targets + obstacles)
+    goals, blocked = set(rest[:targets]), rest[targets:]
+    for _ in range(steps):
+        if not goals:
+            break
+        _, path = pathfinder.find_closest_target(walker, goals, 'dstar', set(blocked))
+        _, fresh = pathfinder.find_closest_target(walker, goals, 'bfs', set(blocked))
+        if len(path) != len(fresh):
+            raise AssertionError(f"Path lengths differ from {walker}: dstar {len(path)}, bfs {len(fresh)}")
+        if path:
+            dr, dc = STEPS[path[0]]
+            walker = (walker[0] + dr, walker[1] + dc)
+            goals.discard(walker)
+        for index, (r, c) in enumerate(blocked):
+            dr, dc = rng.choice(list(STEPS.values()))
+            moved = (r + dr, c + dc)
+            if pathfinder.is_valid_move(moved) and moved != walker and moved not in blocked and moved not in goals:
+                blocked[index] = moved
+    return stats.summary()
+
+def main():
+    parser = argparse.ArgumentParser(description="Nodes expanded by D* Lite repairs and fresh BFS searches on the same walk")
+    parser.add_argument('--kinds', nargs='+', choices=MAP_KINDS, default=list(MAP_KINDS))
+    parser.add_argument('--rows', type=int, default=61)
+    parser.add_argument('--cols', type=int, default=61)
+    parser.add_argument('--targets', nargs='+', type=int, default=[1, 8, 64], help="Target set sizes to compare")
+    parser.add_argument('--obstacles', type=int, default=4, help="Wandering obstacles, each steps once per walker step")
+    parser.add_argument('--steps', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'map':>12} {'targets':>7} {'engine':>6} {'nodes/search':>13} {'us/search':>10}")
+    for kind in args.kinds:
+        grid = build_grid(kind, args.rows, args.cols, args.seed)
+        for targets in args.targets:
+            summary = run_walk(grid, targets, args.obstacles, args.steps, args.seed)
+            for algorithm in ('dstar', 'bfs'):
+                row = summary[algorithm]
+                print(f"{kind:>12} {targets:>7} {algorithm:>6} {row['mean_nodes_expanded']:>13.1f} "
+                      f"{row['mean_duration_ns'] / 1000:>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import argparse
+import random
+import statistics
+import sys
+from algorithm import PathfindingAlgorithms
+from bench_jps import build_grid
+
+MAP_KINDS = ('open', 'rooms', 'braid', 'backtracker')
+STEPS = {'UP': (-1, 0), 'DOWN': (1, 0), 'LEFT': (0, -1), 'RIGHT': (0, 1)}
+# Allowed mean HPA* path cost over the optimal one; single short queries across a cluster border
+# can cost several times more, since they must pass a transition, so the worst is only reported
+MAX_MEAN_RATIO = 1.1
+
+def scatter_walls(grid, share, rng):
+    """Wall off a share of the inner open cells, so openings and clusters get cut up"""
+    for r in range(1, len(grid) - 1):
+        for c in range(1, len(grid[0]) - 1):
+            if grid[r][c] != 1 and rng.random() < share:
+                grid[r][c] = 1
+
+def walk(pathfinder, start, path):
+    """Follow a direction list over the grid, returns (end cell, cost paid) or None if it enters a wall"""
+    row, col = start
+    cost = 0
+    for direction in path:
+        dr, dc = STEPS[direction]
+        row, col = row + dr, col + dc
+        if not pathfinder.is_valid_move((row, col)):
+            return None
+        cost += pathfinder.costs[pathfinder.cell_id((row, col))]
+    return (row, col), cost
+
+def check_queries(pathfinder, queries, rng):
+    """
+    Run HPA* on random pairs and walk every refined path against the grid
+    Returns (failures, cost ratios over Dijkstra): a path through a wall, to the wrong cell,
+    or missing while Dijkstra finds one (or found while Dijkstra finds none) fails
+    """
+    open_cells = [(r, c) for r in range(pathfinder.rows) for c in range(pathfinder.cols) if pathfinder.grid[r][c] != 1]
+    failures = []
+    ratios = []
+    for _ in range(queries):
+        start, target = rng.sample(open_cells, 2)
+        path = pathfinder.hpa(start, target)
+        optimal = pathfinder.dijkstra(start, target)
+        if not path or not optimal:
+            if bool(path) != bool(optimal):
+                failures.append(f"{start} -> {target}: hpa {'found' if path else 'missed'} a path, dijkstra did not agree")
+            continue
+        walked, optimal_walked = walk(pathfinder, start, path), walk(pathfinder, start, optimal)
+        if walked is None or walked[0] != target:
+            failures.append(f"{start} -> {target}: hpa path {'enters a wall' if walked is None else f'ends at {walked[0]}'}")
+            continue
+        ratios.append(walked[1] / optimal_walked[1])
+    return failures, ratios
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk HPA* paths against the grid and compare their cost with Dijkstra")
+    parser.add_argument('--kinds', nargs='+', choices=MAP_KINDS, default=list(MAP_KINDS))
+    parser.add_argument('--rows', type=int, default=61)
+    parser.add_argument('--cols', type=int, default=61)
+    parser.add_argument('--walls', type=float, default=0.05, help="Share of open cells walled off after generation")
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--edits', type=int, default=50, help="Cells toggled between wall and floor before a second round of queries")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    failed = False
+    for kind in args.kinds:
+        rng = random.Random(args.seed)
+        grid = build_grid(kind, args.rows, args.cols, args.seed)
+        scatter_walls(grid, args.walls, rng)
+        pathfinder = PathfindingAlgorithms(grid)
+        pathfinder.get_hierarchy()
+        failures, ratios = check_queries(pathfinder, args.queries, rng)
+
+        # Patched clusters must hold up as well as freshly built ones
+        for _ in range(args.edits):
+            pos = (rng.randrange(1, args.rows - 1), rng.randrange(1, args.cols - 1))
+            pathfinder.set_cell(pos, 0 if grid[pos[0]][pos[1]] == 1 else 1)
+        edited_failures, edited_ratios = check_queries(pathfinder, args.queries, rng)
+        failures += edited_failures
+        ratios += edited_ratios
+
+        mean = statistics.fmean(ratios) if ratios else 1.0
+        verdict = 'ok'
+        if failures or mean > MAX_MEAN_RATIO:
+            verdict = f"FAIL {len(failures)} bad paths" if failures else f"FAIL mean cost ratio over {MAX_MEAN_RATIO}"
+            failed = True
+        print(f"{kind:>12}: {2 * args.queries} queries, cost ratio mean {mean:.3f} worst {max(ratios, default=1.0):.3f}  {verdict}")
+        for line in failures[:10]:
+            print(f"    {line}")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import argparse
+import random
+from algorithm import PathfindingAlgorithms, SearchStats
+from maze_generator import generate_maze
+
+# 'open' is a walled box with scattered pillars, the others are maze_generator styles
+MAP_KINDS = ('open', 'rooms', 'braid', 'backtracker')
+ENGINES = (('astar', 'a_star'), ('jps', 'jps'))
+
+def open_grid(rows, cols, rng, pillar_share=0.05):
+    """Bordered room with a share of single-cell pillars, where symmetric paths abound"""
+    return [
+        [1 if r in (0, rows - 1) or c in (0, cols - 1) or rng.random() < pillar_share else 0 for c in range(cols)]
+        for r in range(rows)
+    ]
+
+def build_grid(kind, rows, cols, seed):
+    if kind == 'open':
+        return open_grid(rows, cols, random.Random(seed))
+    return generate_maze(rows, cols, kind, seed).to_rows()
+
+def run_queries(grid, queries, seed):
+    """Time the same start/target pairs on A* and JPS, checking both find paths of equal length"""
+    pathfinder = PathfindingAlgorithms(grid)
+    stats = pathfinder.enable_instrumentation(SearchStats(keep_calls=False))
+    rng = random.Random(seed)
+    open_cells = [(r, c) for r, row in enumerate(grid) for c, value in enumerate(row) if value != 1]
+    for _ in range(queries):
+        start, target = rng.sample(open_cells, 2)
+        lengths = set()
+        for _, method in ENGINES:
+            lengths.add(len(getattr(pathfinder, method)(start, target)))
+        if len(lengths) != 1:
+            raise AssertionError(f"Path lengths differ for {start} -> {target}: {sorted(lengths)}")
+    return stats.summary()
+
+def main():
+    parser = argparse.ArgumentParser(description="Nodes expanded by A* and Jump Point Search on the same queries")
+    parser.add_argument('--kinds', nargs='+', choices=MAP_KINDS, default=list(MAP_KINDS))
+    parser.add_argument('--rows', type=int, default=101)
+    parser.add_argument('--cols', type=int, default=101)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'map':>12} {'engine':>6} {'nodes/search':>13} {'pushed/search':>14} {'us/search':>10}")
+    for kind in args.kinds:
+        grid = build_grid(kind, args.rows, args.cols, args.seed)
+        summary = run_queries(grid, args.queries, args.seed)
+        for algorithm, _ in ENGINES:
+            row = summary[algorithm]
+            print(f"{kind:>12} {algorithm:>6} {row['mean_nodes_expanded']:>13.1f} "
+                  f"{row['nodes_pushed'] / row['calls']:>14.1f} {row['mean_duration_ns'] / 1000:>10.1f}")
+
+if __name__ == "__main__":
+    main()
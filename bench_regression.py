@@ -0,0 +1,187 @@
+import argparse
+import gc
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from algorithm import PathfindingAlgorithms, SearchStats
+from bench_jps import build_grid
+
+# Fixture name -> (bench_jps map kind, rows, cols); 'open' is a pillared room, 'backtracker' all corridors
+FIXTURES = {
+    'open-41': ('open', 41, 41),
+    'open-101': ('open', 101, 101),
+    'open-201': ('open', 201, 201),
+    'corridor-41': ('backtracker', 41, 41),
+    'corridor-101': ('backtracker', 101, 101),
+    'corridor-201': ('backtracker', 201, 201),
+}
+# Engine name -> (method, whether it takes a target list); the multi-target ones go through find_closest_target
+ENGINES = {
+    'bfs': ('bfs', False),
+    'dijkstra': ('dijkstra', False),
+    'astar': ('a_star', False),
+    'jps': ('jps', False),
+    'bibfs': ('bidirectional_bfs', False),
+    'wavefront': ('wavefront_bfs', False),
+    'hpa': ('hpa', False),
+    'closest-bfs': ('bfs', True),
+    'closest-dijkstra': ('dijkstra', True),
+    'closest-astar': ('astar', True),
+    'closest-jps': ('jps', True),
+    'closest-bibfs': ('bibfs', True),
+    'closest-wavefront': ('wavefront', True),
+    'closest-dstar': ('dstar', True),
+}
+# Near-optimal engines -> allowed mean path length over the exact ones; the fixtures have unit costs,
+# so every other engine must match the exact length query by query
+APPROXIMATE_ENGINES = {'hpa': 1.1}
+METRICS = ('ms_per_query', 'peak_kb', 'nodes_per_query')
+SEED = 0
+TARGETS = 8  # Targets per find_closest_target query
+
+def build_queries(grid, count, seed):
+    """(start, target, targets) triples on open cells, the same every run for a fixture"""
+    rng = random.Random(seed)
+    open_cells = [(r, c) for r, row in enumerate(grid) for c, value in enumerate(row) if value != 1]
+    queries = []
+    for _ in range(count):
+        start, target, *targets = rng.sample(open_cells, 2 + TARGETS)
+        queries.append((start, target, [target] + targets))
+    return queries
+
+def run_engine(pathfinder, engine, queries):
+    """Every query on one engine, returns the path lengths"""
+    method, multi = ENGINES[engine]
+    if multi:
+        return [len(pathfinder.find_closest_target(start, targets, method)[1]) for start, _, targets in queries]
+    search = getattr(pathfinder, method)
+    return [len(search(start, target)) for start, target, _ in queries]
+
+def measure(grid, queries, engines, repeat):
+    """
+    Metrics of each engine on one fixture, the queries where the exact engines disagree and
+    the mean path length of each approximate engine over the exact one
+    Nodes and the allocation peak come from one instrumented, traced pass; the time is the
+    median of repeat plain passes, since both instruments slow the searches down
+    """
+    pathfinder = PathfindingAlgorithms(grid)
+    results = {}
+    lengths = {}
+    for engine in engines:
+        stats = pathfinder.enable_instrumentation(SearchStats(keep_calls=False))
+        gc.collect()
+        tracemalloc.start()
+        lengths[engine] = run_engine(pathfinder, engine, queries)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        pathfinder.disable_instrumentation()
+        nodes = sum(totals['nodes_expanded'] for totals in stats.totals.values())
+
+        times = []
+        for _ in range(repeat):
+            gc.collect()
+            started = time.perf_counter()
+            run_engine(pathfinder, engine, queries)
+            times.append(time.perf_counter() - started)
+        results[engine] = {
+            'ms_per_query': statistics.median(times) * 1000 / len(queries),
+            'peak_kb': peak / 1024,
+            'nodes_per_query': nodes / len(queries),
+        }
+
+    # Exact point-to-point engines must agree with each other, and so must the closest-target ones
+    disagreements = []
+    for multi in (False, True):
+        group = [engine for engine in engines if ENGINES[engine][1] == multi and engine not in APPROXIMATE_ENGINES]
+        for index, query in enumerate(queries):
+            found = {engine: lengths[engine][index] for engine in group}
+            if len(set(found.values())) > 1:
+                disagreements.append((query[0], query[2] if multi else query[1], found))
+
+    # Approximate engines are held to a ratio over the first exact point-to-point one, but must
+    # find a path exactly when it does and never a shorter one
+    ratios = {}
+    exact = next((engine for engine in engines if not ENGINES[engine][1] and engine not in APPROXIMATE_ENGINES), None)
+    for engine in engines:
+        if engine not in APPROXIMATE_ENGINES or exact is None:
+            continue
+        pairs = list(zip(lengths[engine], lengths[exact]))
+        for query, (length, optimal) in zip(queries, pairs):
+            if (length == 0) != (optimal == 0) or length < optimal:
+                disagreements.append((query[0], query[1], {engine: length, exact: optimal}))
+        found = [length / optimal for length, optimal in pairs if optimal > 0]
+        ratios[engine] = statistics.fmean(found) if found else 1.0
+    return results, disagreements, ratios
+
+def compare(results, baseline, threshold):
+    """Lines for every metric over its baseline by more than threshold (a fraction)"""
+    regressions = []
+    for key, metrics in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        for metric in METRICS:
+            if reference[metric] > 0 and metrics[metric] > reference[metric] * (1 + threshold):
+                regressions.append(f"{key} {metric}: {metrics[metric]:.3f} vs {reference[metric]:.3f} "
+                                   f"(+{(metrics[metric] / reference[metric] - 1) * 100:.0f}%)")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Performance regression check of the pathfinding engines against a stored baseline")
+    parser.add_argument('--fixtures', nargs='+', choices=list(FIXTURES), default=list(FIXTURES))
+    parser.add_argument('--engines', nargs='+', choices=list(ENGINES), default=list(ENGINES))
+    parser.add_argument('--queries', type=int, default=50, help="Queries per fixture")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed passes per engine, the median is kept")
+    parser.add_argument('--baseline', help="Baseline JSON to compare against")
+    parser.add_argument('--save', help="Write the results as a baseline JSON to this path")
+    parser.add_argument('--threshold', type=float, default=0.25, help="Allowed growth of any metric over the baseline, as a fraction")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            stored = json.load(f)
+        if stored.get('queries') != args.queries:
+            parser.error(f"the baseline was taken with --queries {stored.get('queries')}")
+        baseline = stored['results']
+
+    results = {}
+    failures = 0
+    print(f"{'fixture':>13} {'engine':>16} {'ms/query':>9} {'peak KB':>9} {'nodes/query':>12}")
+    for fixture in args.fixtures:
+        kind, rows, cols = FIXTURES[fixture]
+        grid = build_grid(kind, rows, cols, SEED)
+        fixture_results, disagreements, ratios = measure(grid, build_queries(grid, args.queries, SEED), args.engines, args.repeat)
+        for engine, metrics in fixture_results.items():
+            results[f"{fixture}/{engine}"] = metrics
+            print(f"{fixture:>13} {engine:>16} {metrics['ms_per_query']:>9.3f} {metrics['peak_kb']:>9.1f} "
+                  f"{metrics['nodes_per_query']:>12.1f}")
+        for start, target, found in disagreements:
+            print(f"FAIL {fixture}: path lengths differ for {start} -> {target}: {found}")
+        failures += len(disagreements)
+        for engine, ratio in ratios.items():
+            verdict = 'ok'
+            if ratio > APPROXIMATE_ENGINES[engine]:
+                verdict = 'FAIL'
+                failures += 1
+            print(f"{fixture:>13} {engine:>16} mean path length {ratio:.3f} times the exact one, "
+                  f"allowed {APPROXIMATE_ENGINES[engine]}  {verdict}")
+
+    regressions = compare(results, baseline, args.threshold)
+    for line in regressions:
+        print(f"FAIL regression {line}")
+    failures += len(regressions)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'python': platform.python_version(), 'queries': args.queries, 'results': results}, f, indent=2)
+    if baseline:
+        print(f"{len(regressions)} regressions over {args.threshold:.0%} against {args.baseline}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
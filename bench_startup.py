@@ -0,0 +1,53 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# Module -> import time budget in milliseconds, None only reports the time (the median run, so bytecode is cached)
+MODULES = (('algorithm', 5.0), ('game_core', 10.0), ('pacman', 10.0))
+HEAVY_MODULES = ('pygame', 'numpy')  # Loaded on first use only, never by an import of MODULES
+PROBE = """
+import sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(elapsed * 1000, *[name for name in {heavy!r} if name in sys.modules])
+"""
+
+def measure(module, runs):
+    """Import module in fresh interpreters, returns (median milliseconds, heavy modules it loaded)"""
+    times = []
+    loaded = set()
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, '-c', PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+        elapsed, *heavy = result.stdout.split()
+        times.append(float(elapsed))
+        loaded.update(heavy)
+    return statistics.median(times), sorted(loaded)
+
+def main():
+    parser = argparse.ArgumentParser(description="Import time of the core modules, each in a fresh interpreter")
+    parser.add_argument('--runs', type=int, default=7, help="Interpreters started per module, the median is reported")
+    parser.add_argument('--scale', type=float, default=1.0, help="Multiply the budgets, for slow machines")
+    args = parser.parse_args()
+
+    failures = 0
+    for module, budget in MODULES:
+        elapsed, heavy = measure(module, args.runs)
+        verdict = ''
+        if heavy:
+            verdict = f"FAIL loads {', '.join(heavy)}"
+        elif budget is not None and elapsed > budget * args.scale:
+            verdict = f"FAIL over {budget * args.scale:.1f} ms"
+        elif budget is not None:
+            verdict = 'ok'
+        failures += verdict.startswith('FAIL')
+        print(f"{module:>10} {elapsed:8.2f} ms  {verdict}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
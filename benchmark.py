@@ -0,0 +1,140 @@
+import argparse
+import csv
+import itertools
+import json
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from game_core import AVOIDANCE_MODES, CLASSIC_MAZE, run_headless
+from maze import load_maze
+from maze_generator import generate_maze
+
+ALGORITHMS = ('bfs', 'dijkstra', 'astar', 'jps', 'tour', 'lookahead')
+# 'classic' is the built-in layout of game_core.PacmanGame, 'gen:<style>:<rows>x<cols>:<seed>[:<slow share>]'
+# a generated maze, and any other name a maze file path
+MAZES = ('classic',)
+DEFAULT_STARTS = ((1, 1), (9, 9), (18, 1))
+AGGREGATE_FIELDS = (
+    'ticks', 'caught', 'searches', 'nodes_expanded', 'nodes_pushed', 'peak_frontier',
+    'search_cpu_time', 'cpu_per_search',
+)
+
+def load_benchmark_maze(name):
+    """Grid for a maze name, None for the built-in layout"""
+    if name == 'classic':
+        return None
+    if name.startswith('gen:'):
+        _, style, size, seed, *slow = name.split(':')
+        rows, cols = (int(value) for value in size.split('x'))
+        return generate_maze(rows, cols, style, int(seed), slow_share=float(slow[0]) if slow else 0.0)
+    return load_maze(name)
+
+def run_episode(episode):
+    """Play one headless game for an (algorithm, maze, seed, start, avoidance) tuple and return its metrics"""
+    algorithm, maze, seed, start, avoidance = episode
+    grid = load_benchmark_maze(maze)
+    result = run_headless(algorithm, seed=seed, start_pos=start, maze=grid, avoidance=avoidance)
+    result['maze'] = maze
+    result['seed'] = seed
+    result['start'] = f"{start[0]},{start[1]}"
+    result['cpu_per_search'] = result['search_cpu_time'] / result['searches'] if result['searches'] else 0.0
+    return result
+
+def open_starts(maze, starts):
+    """The starts that are open cells of a maze, a wall start would leave Pacman stuck until max_ticks"""
+    grid = load_benchmark_maze(maze) or CLASSIC_MAZE
+    rows, cols = len(grid), len(grid[0])
+    return [(r, c) for r, c in starts if 0 <= r < rows and 0 <= c < cols and grid[r][c] != 1]
+
+def build_episodes(algorithms, mazes, seeds, starts, avoidances=('ghost_cell',)):
+    """Cartesian product of every benchmark axis, each maze with only its open starts"""
+    episodes = []
+    for maze in mazes:
+        maze_starts = open_starts(maze, starts)
+        skipped = [start for start in starts if start not in maze_starts]
+        if skipped:
+            print(f"{maze}: skipping starts {', '.join(f'{r},{c}' for r, c in skipped)}, not open cells")
+        episodes += itertools.product(algorithms, [maze], seeds, maze_starts, avoidances)
+    return episodes
+
+def run_benchmark(episodes, workers=None):
+    """Fan the episodes out over a process pool, results come back in episode order"""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return [run_episode(episode) for episode in episodes]
+    chunksize = max(1, len(episodes) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(run_episode, episodes, chunksize=chunksize))
+
+def aggregate(results):
+    """Mean/median/min/max of each metric, grouped by (algorithm, maze, avoidance)"""
+    groups = {}
+    for result in results:
+        groups.setdefault((result['algorithm'], result['maze'], result['avoidance']), []).append(result)
+
+    summary = []
+    for (algorithm, maze, avoidance), group in sorted(groups.items()):
+        row = {
+            'algorithm': algorithm,
+            'maze': maze,
+            'avoidance': avoidance,
+            'episodes': len(group),
+            'completed': sum(1 for result in group if result['completed']),
+        }
+        for field in AGGREGATE_FIELDS:
+            values = [result[field] for result in group]
+            row[f'{field}_mean'] = statistics.fmean(values)
+            row[f'{field}_median'] = statistics.median(values)
+            row[f'{field}_min'] = min(values)
+            row[f'{field}_max'] = max(values)
+        summary.append(row)
+    return summary
+
+def write_csv(path, rows):
+    if not rows:
+        return
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+
+def parse_start(text):
+    row, col = text.split(',')
+    return int(row), int(col)
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch benchmark of the pathfinding algorithms on headless games")
+    parser.add_argument('--algorithms', nargs='+', default=list(ALGORITHMS))
+    parser.add_argument('--mazes', nargs='+', default=list(MAZES), help="'classic', gen:<style>:<rows>x<cols>:<seed>[:<slow share>] or maze file paths")
+    parser.add_argument('--seeds', type=int, default=8, help="Number of ghost RNG seeds per combination")
+    parser.add_argument('--starts', nargs='+', type=parse_start, default=list(DEFAULT_STARTS),
+                        help="Pacman start cells as row,col")
+    parser.add_argument('--avoidance', nargs='+', choices=AVOIDANCE_MODES, default=['ghost_cell'],
+                        help="How Pacman keeps clear of the ghost, several compare the modes")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--csv', help="Write per-episode results to this CSV file")
+    parser.add_argument('--json', help="Write per-episode results and the summary to this JSON file")
+    args = parser.parse_args()
+
+    episodes = build_episodes(args.algorithms, args.mazes, range(args.seeds), args.starts, args.avoidance)
+    started = time.perf_counter()
+    results = run_benchmark(episodes, args.workers)
+    wall_time = time.perf_counter() - started
+    summary = aggregate(results)
+
+    if args.csv:
+        write_csv(args.csv, results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'episodes': results, 'summary': summary, 'wall_time': wall_time}, f, indent=2)
+
+    print(f"{len(episodes)} episodes in {wall_time:.2f}s")
+    for row in summary:
+        print(f"{row['algorithm']:>9} {row['maze']:>8} {row['avoidance']:>10}: "
+              f"{row['ticks_mean']:.1f} ticks, {row['caught_mean']:.2f} caught, "
+              f"{row['nodes_expanded_mean']:.0f} nodes expanded, "
+              f"{row['cpu_per_search_mean'] * 1e6:.1f} us/search")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+from array import array
+from collections import OrderedDict, deque
+from algorithm import DIRECTIONS, OPPOSITE_CODES
+
+class DistanceFieldCache:
+    """
+    Cache of wall-only BFS distance fields, keyed by source cell
+    Each field holds, for every cell, the distance to the source and the direction to step
+    from that cell towards the source. On a static maze these never change, so repeated
+    queries like the ghost chasing Pacman become lookups instead of fresh searches.
+    Fields are evicted least-recently-used once max_fields or max_bytes is exceeded.
+    """
+    def __init__(self, pathfinder, max_fields=64, max_bytes=None, precompute_all=False):
+        self.pathfinder = pathfinder
+        self.max_fields = max_fields
+        self.max_bytes = max_bytes
+        self.fields = OrderedDict()  # source cell -> (distances, toward_source)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.point_searches = 0  # Cold next_move queries answered without building a field
+        if precompute_all:
+            self.precompute_all()
+
+    def field_bytes(self):
+        """Memory taken by one field: a 4-byte distance and a 1-byte direction per cell"""
+        return self.pathfinder.rows * self.pathfinder.cols * 5
+
+    def precompute_all(self):
+        """Build the field of every open cell up front (all pairs), lifting the size limits to fit"""
+        pf = self.pathfinder
+        open_cells = [(r, c) for r in range(pf.rows) for c in range(pf.cols) if pf.grid[r][c] != 1]
+        self.max_fields = max(self.max_fields, len(open_cells))
+        if self.max_bytes is not None:
+            self.max_bytes = max(self.max_bytes, len(open_cells) * self.field_bytes())
+        for pos in open_cells:
+            source_cell = pf.cell_id(pos)
+            if source_cell not in self.fields:
+                self.fields[source_cell] = self.compute_field(source_cell)
+
+    def compute_field(self, source_cell):
+        """BFS over the wall-only neighbor index from source_cell"""
+        return self.compute_multi_field((source_cell,))
+
+    def compute_multi_field(self, source_cells, stop_cells=None, blocked_cells=None):
+        """
+        One BFS from several sources at once, not cached
+        Every cell gets the distance to, and the first step towards, its nearest source.
+        With stop_cells the BFS ends once all of them are expanded: they and their neighbors
+        are labelled, cells further out may be left at -1. Blocked cells are never entered
+        and stay at -1.
+        """
+        pf = self.pathfinder
+        moves, move_table = pf.moves, pf.move_table
+        distances = array('i', [-1]) * (pf.rows * pf.cols)  # -1 marks an unreachable cell
+        toward_source = bytearray(pf.rows * pf.cols)  # Direction code of the first step back to the source
+        if blocked_cells:
+            for cell in blocked_cells:
+                distances[cell] = -2  # Looks visited to the BFS
+        queue = deque()
+        for source_cell in source_cells:
+            if distances[source_cell] == -1:
+                distances[source_cell] = 0
+                queue.append(source_cell)
+
+        remaining = set(stop_cells) if stop_cells is not None else None
+        while queue:
+            cell = queue.popleft()
+            next_distance = distances[cell] + 1
+            for offset, code in move_table[moves[cell]]:
+                neighbor = cell + offset
+                if distances[neighbor] < 0:
+                    distances[neighbor] = next_distance
+                    toward_source[neighbor] = OPPOSITE_CODES[code]
+                    queue.append(neighbor)
+            if remaining is not None:
+                remaining.discard(cell)
+                if not remaining:
+                    break
+        if blocked_cells:
+            for cell in blocked_cells:
+                distances[cell] = -1
+        return distances, toward_source
+
+    def get_field(self, source):
+        """Return (distances, toward_source) for source, computing and caching it on a miss"""
+        source_cell = self.pathfinder.cell_id(source)
+        field = self.fields.get(source_cell)
+        if field is not None:
+            self.hits += 1
+            self.fields.move_to_end(source_cell)
+            return field
+
+        self.misses += 1
+        field = self.compute_field(source_cell)
+        self.fields[source_cell] = field
+        self.evict()
+        return field
+
+    def evict(self):
+        """Drop least recently used fields until the cache fits its limits"""
+        while len(self.fields) > 1 and (
+            len(self.fields) > self.max_fields
+            or (self.max_bytes is not None and len(self.fields) * self.field_bytes() > self.max_bytes)
+        ):
+            self.fields.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self):
+        """Forget every field, for when walls in the grid change"""
+        self.fields.clear()
+
+    def distance(self, start, target):
+        """Wall-only shortest path length from start to target, or -1 if unreachable"""
+        distances, _ = self.get_field(target)
+        return distances[self.pathfinder.cell_id(start)]
+
+    def next_move(self, start, target, build=True):
+        """
+        First direction of a shortest path from start to target, or None if already there or unreachable
+        With build False a target without a cached field gets a BFS that stops once it reaches
+        start and is not kept, for queries whose target rarely repeats
+        """
+        pf = self.pathfinder
+        start_cell = pf.cell_id(start)
+        if build or pf.cell_id(target) in self.fields:
+            _, toward_source = self.get_field(target)
+        else:
+            self.point_searches += 1
+            _, toward_source = self.compute_multi_field((pf.cell_id(target),), stop_cells=(start_cell,))
+        code = toward_source[start_cell]
+        return DIRECTIONS[code - 1] if code else None
+
+    def path(self, start, target):
+        """Shortest path from start to target as a direction list, same format as the searches"""
+        _, toward_source = self.get_field(target)
+        offsets = self.pathfinder.move_offsets
+        cell = self.pathfinder.cell_id(start)
+        target_cell = self.pathfinder.cell_id(target)
+        path = []
+        while cell != target_cell:
+            code = toward_source[cell]
+            if not code:
+                return []
+            path.append(DIRECTIONS[code - 1])
+            cell += offsets[code - 1]
+        return path
+
+    def stats(self):
+        """Hit/miss/eviction counters and current size"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'point_searches': self.point_searches,
+            'fields': len(self.fields),
+            'bytes': len(self.fields) * self.field_bytes(),
+        }
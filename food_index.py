@@ -0,0 +1,113 @@
+BUCKET_SIZE = 8  # Cells per bucket side
+
+class FoodIndex:
+    """
+    The remaining pellets, bucketed by BUCKET_SIZE square blocks of the grid
+    Stands in for the set of pellet positions (in, len, iteration, add, remove, discard,
+    copy), and every update is O(1). nearest scans the buckets ring by ring out from the
+    query cell and stops once the next ring cannot hold a closer pellet, so a query costs
+    about the pellets near it rather than all of them. The searches take the index as
+    their target set: cells is their goal set, and nearest_distance the A* lower bound.
+    """
+    def __init__(self, rows, cols, positions=(), bucket_size=BUCKET_SIZE):
+        self.rows, self.cols = rows, cols
+        self.size = bucket_size
+        self.bucket_rows = -(-rows // bucket_size)
+        self.bucket_cols = -(-cols // bucket_size)
+        self.buckets = [set() for _ in range(self.bucket_rows * self.bucket_cols)]  # Cell ids per bucket
+        self.cells = set()  # Cell ids of every pellet
+        for pos in positions:
+            self.add(pos)
+
+    def bucket_of(self, row, col):
+        return (row // self.size) * self.bucket_cols + col // self.size
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, pos):
+        row, col = pos
+        return 0 <= row < self.rows and 0 <= col < self.cols and row * self.cols + col in self.cells
+
+    def __iter__(self):
+        cols = self.cols
+        for cell in self.cells:
+            yield divmod(cell, cols)
+
+    def add(self, pos):
+        row, col = pos
+        cell = row * self.cols + col
+        self.cells.add(cell)
+        self.buckets[self.bucket_of(row, col)].add(cell)
+
+    def remove(self, pos):
+        """Remove a pellet, KeyError if there is none there like set.remove"""
+        row, col = pos
+        cell = row * self.cols + col
+        self.cells.remove(cell)
+        self.buckets[self.bucket_of(row, col)].remove(cell)
+
+    def discard(self, pos):
+        if pos in self:
+            self.remove(pos)
+
+    def copy(self):
+        index = FoodIndex(self.rows, self.cols, bucket_size=self.size)
+        index.cells = set(self.cells)
+        index.buckets = [set(bucket) for bucket in self.buckets]
+        return index
+
+    def ring(self, bucket_row, bucket_col, radius):
+        """Buckets at Chebyshev distance radius from a bucket, clipped to the grid"""
+        if radius == 0:
+            return [bucket_row * self.bucket_cols + bucket_col]
+        rings = []
+        left, right = max(0, bucket_col - radius), min(self.bucket_cols - 1, bucket_col + radius)
+        for r in (bucket_row - radius, bucket_row + radius):
+            if 0 <= r < self.bucket_rows:
+                rings.extend(range(r * self.bucket_cols + left, r * self.bucket_cols + right + 1))
+        for r in range(max(0, bucket_row - radius + 1), min(self.bucket_rows, bucket_row + radius)):
+            for c in (bucket_col - radius, bucket_col + radius):
+                if 0 <= c < self.bucket_cols:
+                    rings.append(r * self.bucket_cols + c)
+        return rings
+
+    def nearest(self, pos):
+        """(position, Manhattan distance) of the nearest pellet, (None, -1) when none are left"""
+        if not self.cells:
+            return None, -1
+        row, col = pos
+        cols = self.cols
+        bucket_row, bucket_col = row // self.size, col // self.size
+        best, best_distance = None, -1
+        scanned = 0
+        for radius in range(max(self.bucket_rows, self.bucket_cols)):
+            # Every cell of a bucket radius rings out is at least (radius - 1) * size + 1 away on one axis
+            if best is not None and (radius - 1) * self.size + 1 > best_distance:
+                break
+            if scanned > len(self.cells): # Sparse food on a big grid, the rings cost more than a plain scan
+                return self.scan(pos)
+            for bucket in self.ring(bucket_row, bucket_col, radius):
+                scanned += 1
+                for cell in self.buckets[bucket]:
+                    r, c = divmod(cell, cols)
+                    distance = abs(row - r) + abs(col - c)
+                    if best is None or distance < best_distance:
+                        best, best_distance = cell, distance
+        return divmod(best, cols), best_distance
+
+    def scan(self, pos):
+        """nearest by checking every pellet"""
+        row, col = pos
+        cols = self.cols
+        best, best_distance = None, -1
+        for cell in self.cells:
+            r, c = divmod(cell, cols)
+            distance = abs(row - r) + abs(col - c)
+            if best is None or distance < best_distance:
+                best, best_distance = cell, distance
+        return (divmod(best, cols), best_distance) if best is not None else (None, -1)
+
+    def nearest_distance(self, pos):
+        """Manhattan distance to the nearest pellet, a lower bound on the path to any of them"""
+        return self.nearest(pos)[1]
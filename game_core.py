@@ -0,0 +1,706 @@
+import random
+import time
+from algorithm import PathfindingAlgorithms, SearchStats
+from distance_cache import DistanceFieldCache
+from food_index import FoodIndex
+from tour import TourPlanner
+
+# Constants
+ROWS, COLS = 20, 20
+GHOST_PENALTY_TIME = 5  # Seconds added to timer if caught
+FOOD_SCORE = 10  # Points per pellet eaten
+TICK_RATE = 10  # Logical ticks per second, matches the 10 FPS display loop
+MENU_ALGORITHMS = ('bfs', 'dijkstra', 'astar', 'jps', 'tour', 'lookahead')  # Menu choice n selects MENU_ALGORITHMS[n - 1]
+INCREMENTAL_ALGORITHMS = {'dstar'}  # Repair their last search, so they replan as soon as moved obstacles cut their path
+WEIGHTED_ALGORITHMS = {'dijkstra', 'astar'}  # Pay cell costs, so they also steer around the ghost's danger zone
+GHOST_DANGER_RADIUS = 2  # Steps around the ghost that cost extra to enter
+GHOST_DANGER_COST = 8  # Extra cost next to the ghost, halved with every further step
+TOUR_ALGORITHMS = {'tour'}  # Plan the order of every pellet once instead of chasing the nearest one
+TOUR_TIME_BUDGET = 0.5  # Seconds of tour improvement per plan, the classic maze converges well within it
+TOUR_REPLAN_BUDGET = 0.01  # Seconds of improvement when the ghost blocks a leg
+TOUR_MOVE_BUDGETS = (1_000_000, 20_000)  # Candidate moves of a plan and a re-plan in headless and recorded runs, about the time budgets' worth
+LOOKAHEAD_ALGORITHMS = {'lookahead'}  # Choose every move by searching over the ghost's replies, see lookahead.py
+LOOKAHEAD_NODE_BUDGET = 3000  # Search nodes per lookahead move in headless and recorded runs, about what its time budget buys
+AVOIDANCE_MODES = ('ghost_cell', 'threat')  # How Pacman's searches keep clear of the ghost, see search_avoidance
+THREAT_COST = 32  # Extra cost of entering a threatened cell for the weighted algorithms
+HIERARCHY_MIN_CELLS = 100_000  # From this maze size the ghost chases with HPA* instead of a full distance field per Pacman cell
+CHASE_PRECOMPUTE_CELLS = 512  # Up to this many open cells every chase field is built up front, about 70 ms and 2 MB
+
+CLASSIC_MAZE = (
+    [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
+    [1, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
+    [1, 0, 1, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1],
+    [1, 0, 1, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1],
+    [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
+    [1, 0, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1],
+    [1, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1],
+    [1, 1, 1, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 1, 1, 1, 1],
+    [1, 1, 1, 1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1, 1, 1, 1, 1],
+    [1, 0, 0, 0, 0, 0, 0, 1, 1, 0, 1, 1, 0, 0, 0, 0, 0, 0, 0, 1], # Pacman at (1,1)
+    [1, 0, 1, 1, 0, 1, 0, 1, 0, 0, 0, 1, 0, 1, 0, 1, 1, 1, 0, 1],
+    [1, 0, 0, 1, 0, 1, 0, 1, 1, 1, 1, 1, 0, 1, 0, 1, 0, 0, 0, 1],
+    [1, 1, 0, 1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1, 0, 1, 1, 1],
+    [1, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0, 1],
+    [1, 0, 1, 1, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 1, 1, 1, 0, 1],
+    [1, 0, 0, 0, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 0, 0, 0, 0, 1],
+    [1, 0, 1, 1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1, 1, 1, 0, 1],
+    [1, 0, 1, 1, 0, 1, 0, 1, 1, 0, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1], # Ghost near (18,18) -> (ROWS-2, COLS-2)
+    [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
+    [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
+)
+
+class GameState:
+    MENU = "menu"
+    PLAYING = "playing"
+    FINISHED = "finished" # This state might be implicitly handled by game_completed flag
+    RESULTS = "results"
+
+class PacmanGame:
+    """
+    Game rules without any rendering, driven by a logical clock
+    Every auto_play_step is one tick and all timings are measured in ticks, so a whole
+    game can be simulated as fast as the CPU allows and replays the same way every run
+    """
+    def __init__(self, seed=None, verbose=True, start_pos=None, maze=None, avoidance='ghost_cell'):
+        self.grid = []
+        self.pacman_pos = None
+        self.food_positions = set()
+        self.original_food_positions = set()
+        self.score = 0
+        self.start_time = None
+        self.end_time = None
+        self.game_completed = False
+        self.pathfinder = None
+        self.current_algorithm = None
+        self.state = GameState.MENU
+        self.results = {}  # Store results for each algorithm
+        self.tested_algorithms = set()
+        self.tick = 0  # Logical clock, advanced once per auto_play_step
+        self.seed = seed
+        self.rng = random.Random(seed)  # Ghost's unstick moves, reseeded by reset_game so every run replays
+        self.verbose = verbose  # Print catches and results to the console
+        self.maze = maze  # Loaded maze (maze.Maze or nested lists), None for the built-in layout
+        self.start_pos = start_pos  # Pacman's spawn and respawn cell, defaults to the maze's
+        self.rows, self.cols = ROWS, COLS  # Taken from the maze in create_grid
+        self.avoidance = avoidance  # One of AVOIDANCE_MODES
+        self.threat = None  # ((tick, Pacman, ghost), cells) of the last threat_cells
+
+        # Planning cost of the current run, Pacman's searches only
+        self.search_count = 0
+        self.search_cpu_time = 0.0
+
+        # Ghost attributes
+        self.ghost_pos = None
+        self.initial_ghost_pos = None # Set in create_grid once the maze size is known
+        self.ghost_move_interval = 0.3  # Seconds, ghost moves
+        self.ghost_move_ticks = max(1, round(self.ghost_move_interval * TICK_RATE))
+        self.ghost_last_move_tick = 0
+        self.pacman_caught_count = 0
+        self.time_penalty = 0 # Total time penalty from being caught in current run
+
+        self.current_path_to_food = [] # Pacman's current path
+        self.path_obstacles = None # Dynamic obstacles the current path was searched around
+        self.pacman_wait_ticks = 0 # Ticks left crossing a slow tile, a cell of cost n takes n ticks
+        self.tour = [] # Pellets left in the planned order ('tour' algorithm), next one last
+        self.lookahead = None # lookahead.LookaheadPlanner, made on the first lookahead move
+        self.lookahead_node_budget = None # Caps its search by nodes instead of time when set, so a run repeats move for move
+        self.tour_move_budgets = None # (plan, re-plan) caps of the tour improvement instead of time when set, likewise
+
+        # Background planning, see async_planner.AsyncPlanner
+        self.planner = None # Runs Pacman's searches off the frame thread when set
+        self.plan_sequence = 0 # Bumped on every plan request and every Pacman move
+        self.awaiting_plan = False # The newest request is still in flight
+        self.requested_sequence = 0 # Sequence number of the newest request
+        self.discarded_plans = 0 # Plans that arrived after a newer request or a move
+
+        self.recorder = None # replay.ReplayRecorder while the run is being recorded
+
+        self.create_grid()
+        self.pathfinder = PathfindingAlgorithms(self.grid)
+        # Wall-only distance fields for the ghost's chase, one per Pacman cell: all of them on small mazes,
+        # elsewhere only the ones the threat and lookahead modes build, see move_ghost
+        open_cells = sum(value != 1 for row in self.grid for value in row)
+        self.chase_fields_built = open_cells <= CHASE_PRECOMPUTE_CELLS
+        self.distance_cache = DistanceFieldCache(self.pathfinder, precompute_all=self.chase_fields_built)
+        self.tour_planner = TourPlanner(self.pathfinder, TOUR_TIME_BUDGET)
+        self.search_stats = self.pathfinder.enable_instrumentation(SearchStats(keep_calls=False)) # Per algorithm, kept across runs
+
+    def create_grid(self):
+        """Create the maze layout, the loaded maze if one was given or the built-in one"""
+        if self.maze is not None:
+            self.setup_grid(self.maze, getattr(self.maze, 'pacman_start', None), getattr(self.maze, 'ghost_start', None))
+            return
+        self.setup_grid([row[:] for row in CLASSIC_MAZE]) # Fresh rows, the grid is edited in place by set_cell
+
+    def setup_grid(self, grid, pacman_start=None, ghost_start=None):
+        """Take dimensions, food and start positions from a maze grid"""
+        self.grid = grid
+        self.rows = len(grid)
+        self.cols = len(grid[0]) if self.rows else 0
+        if self.start_pos is None:
+            self.start_pos = pacman_start or (1, 1)
+        row, col = self.start_pos
+        if not (0 <= row < self.rows and 0 <= col < self.cols) or self.grid[row][col] == 1:
+            raise ValueError(f"Pacman start {self.start_pos} is not an open cell of the maze")
+        self.initial_ghost_pos = ghost_start or (self.rows - 2, self.cols - 2)
+
+        # Slow tiles hold food too
+        self.food_positions = FoodIndex(self.rows, self.cols, (
+            (r, c) for r in range(self.rows) for c in range(self.cols) if self.grid[r][c] != 1))
+        self.original_food_positions = set(self.food_positions)
+        self.pacman_pos = self.start_pos
+        self.food_positions.discard(self.pacman_pos)
+        self.original_food_positions.discard(self.pacman_pos)
+
+        # Initialize ghost position safely
+        self.ghost_pos = self.initial_ghost_pos
+        if self.grid[self.ghost_pos[0]][self.ghost_pos[1]] == 1 or self.ghost_pos == self.pacman_pos:
+            found_valid_ghost_start = False
+            for r_idx in range(self.rows - 2, 0, -1):
+                for c_idx in range(self.cols - 2, 0, -1):
+                    if self.grid[r_idx][c_idx] != 1 and (r_idx, c_idx) != self.pacman_pos:
+                        self.ghost_pos = (r_idx, c_idx)
+                        found_valid_ghost_start = True
+                        break
+                if found_valid_ghost_start:
+                    break
+            if not found_valid_ghost_start: # Fallback if no good spot found (should not happen in this map)
+                 self.ghost_pos = (self.rows - 2, 1) if self.grid[self.rows-2][1] != 1 else (1, self.cols-2)
+
+
+        self.food_positions.discard(self.ghost_pos) # Ghost doesn't sit on food
+        self.original_food_positions.discard(self.ghost_pos)
+
+    def reset_game(self):
+        self.food_positions = FoodIndex(self.rows, self.cols, self.original_food_positions)
+        self.pacman_pos = self.start_pos
+        
+        # Reset ghost position safely
+        self.ghost_pos = self.initial_ghost_pos
+        if self.grid[self.ghost_pos[0]][self.ghost_pos[1]] == 1 or self.ghost_pos == self.pacman_pos:
+            found_valid_ghost_start = False
+            for r_idx in range(self.rows - 2, 0, -1):
+                for c_idx in range(self.cols - 2, 0, -1):
+                    if self.grid[r_idx][c_idx] != 1 and (r_idx, c_idx) != self.pacman_pos:
+                        self.ghost_pos = (r_idx, c_idx)
+                        found_valid_ghost_start = True
+                        break
+                if found_valid_ghost_start:
+                    break
+            if not found_valid_ghost_start:
+                 self.ghost_pos = (self.rows - 2, 1) if self.grid[self.rows-2][1] != 1 and (self.rows-2,1) != self.pacman_pos else (1, self.cols-2)
+
+
+        self.score = 0
+        self.start_time = None
+        self.end_time = None
+        self.game_completed = False
+        self.pacman_caught_count = 0
+        self.time_penalty = 0
+        self.current_path_to_food = []
+        self.pacman_wait_ticks = 0
+        self.tour = []
+        self.plan_sequence += 1 # Drop whatever is still being planned for the previous run
+        self.awaiting_plan = False
+        self.tick = 0
+        self.rng = random.Random(self.seed)
+        self.ghost_last_move_tick = 0
+        self.search_count = 0
+        self.search_cpu_time = 0.0
+
+    def current_time(self):
+        """Logical time in seconds"""
+        return self.tick / TICK_RATE
+
+    def elapsed_time(self):
+        """Logical seconds of the current run, including catch penalties"""
+        if self.start_time is None:
+            return 0
+        end_time = self.end_time if self.game_completed and self.end_time is not None else self.current_time()
+        return (end_time - self.start_time) + self.time_penalty
+
+    def move_pacman(self, direction):
+        row, col = self.pacman_pos
+        new_pos = None
+        if direction == 'UP': new_pos = (row - 1, col)
+        elif direction == 'DOWN': new_pos = (row + 1, col)
+        elif direction == 'LEFT': new_pos = (row, col - 1)
+        elif direction == 'RIGHT': new_pos = (row, col + 1)
+        
+        # Pathfinding should ensure this move is valid regarding walls/ghost at planning time
+        # This basic check is for walls only when executing the move.
+        if new_pos and self.pathfinder.is_valid_move(new_pos, dynamic_obstacles=None): # Pacman doesn't self-sabotage with dynamic obstacles for its own move execution
+            self.pacman_pos = new_pos
+            self.plan_sequence += 1
+            if self.recorder is not None:
+                self.recorder.pacman_moved(direction)
+            self.pacman_wait_ticks = self.enter_cell(new_pos)
+            return True
+        return False
+
+    def enter_cell(self, pos):
+        """Eat the pellet on the cell a Pacman stepped onto, returns the ticks it waits there (a cell of cost n takes n ticks)"""
+        if pos in self.food_positions:
+            self.food_positions.remove(pos)
+            self.score += FOOD_SCORE
+        return self.pathfinder.costs[self.pathfinder.cell_id(pos)] - 1
+
+    def move_ghost(self):
+        if not self.ghost_pos or self.game_completed:
+            return
+
+        if self.tick - self.ghost_last_move_tick >= self.ghost_move_ticks:
+            self.ghost_last_move_tick = self.tick
+            # Ghost targets Pacman, does not consider itself an obstacle for its own path.
+            # The maze is static, so on small mazes the chase step is a lookup in Pacman's precomputed
+            # distance field. Elsewhere Pacman rarely stands on the same cell twice when the ghost moves,
+            # so a cold field is not built (a whole-maze BFS) but replaced by a BFS that stops at the ghost.
+            # On huge mazes the cluster graph is searched instead and only the first segment of its path refined.
+            self.ghost_pos = self.ghost_step(self.ghost_pos, self.chase_direction(self.ghost_pos, self.pacman_pos))
+
+    def chase_direction(self, ghost, pacman):
+        """First direction of the ghost's shortest wall-only path to Pacman, None if there or unreachable"""
+        if self.rows * self.cols >= HIERARCHY_MIN_CELLS:
+            return self.pathfinder.get_hierarchy().next_move(ghost, pacman)
+        return self.distance_cache.next_move(ghost, pacman, build=self.chase_fields_built)
+
+    def ghost_step(self, ghost, direction):
+        """Cell a ghost moves to from ghost in direction"""
+        if direction:
+            r, c = ghost
+            next_ghost_pos = None
+            if direction == 'UP': next_ghost_pos = (r - 1, c)
+            elif direction == 'DOWN': next_ghost_pos = (r + 1, c)
+            elif direction == 'LEFT': next_ghost_pos = (r, c - 1)
+            elif direction == 'RIGHT': next_ghost_pos = (r, c + 1)
+
+            if next_ghost_pos and self.pathfinder.is_valid_move(next_ghost_pos): # Ghost can move if valid (not wall)
+                return next_ghost_pos
+        else: # Ghost is stuck or Pacman is somehow unreachable by BFS (e.g. map error)
+              # Try a random valid move to unstick itself
+            neighbors = self.pathfinder.get_neighbors(ghost, dynamic_obstacles=None)
+            if neighbors:
+                chosen_move_pos, _ = self.rng.choice(neighbors)
+                return chosen_move_pos
+        return ghost
+
+    def request_plan(self):
+        """Send a search from Pacman's current state to the background planner"""
+        self.plan_sequence += 1
+        self.requested_sequence = self.plan_sequence
+        self.awaiting_plan = True
+        obstacles, extra_costs, fallback = self.search_avoidance()
+        self.planner.submit(
+            self.plan_sequence,
+            # A copy, the planner's thread or process must not see the food change under it
+            (self.pacman_pos, self.food_positions.copy(), self.current_algorithm, obstacles, extra_costs, fallback),
+            self.receive_plan,
+        )
+
+    def search_food_path(self):
+        """Pacman's path to the nearest food on the game's thread, avoiding the ghost"""
+        search_started = time.process_time()
+        obstacles, extra_costs, fallback = self.search_avoidance() # Pacman avoids the ghost
+        # The food index is the target set itself, no list of every pellet is built
+        _, path_to_food = self.pathfinder.find_closest_target(
+            self.pacman_pos, self.food_positions, self.current_algorithm,
+            dynamic_obstacles=obstacles, extra_costs=extra_costs
+        )
+        if not path_to_food and fallback is not None: # Cut off by the threat, only keep off the ghost
+            _, path_to_food = self.pathfinder.find_closest_target(
+                self.pacman_pos, self.food_positions, self.current_algorithm, dynamic_obstacles=fallback
+            )
+        self.search_cpu_time += time.process_time() - search_started
+        self.search_count += 1
+        self.path_obstacles = obstacles
+        return path_to_food
+
+    def receive_plan(self, sequence, path, cpu_time, calls):
+        """
+        Planner callback, run on the game's thread: adopt the path unless a newer request
+        or a Pacman move since the request made it stale
+        A path of None means the search failed on the planner, the game's thread searches instead
+        """
+        self.search_cpu_time += cpu_time
+        self.search_count += path is not None
+        for call in calls:
+            self.search_stats.record(*call)
+        if sequence == self.requested_sequence:
+            self.awaiting_plan = False
+        if sequence != self.plan_sequence:
+            self.discarded_plans += 1
+            return
+        self.current_path_to_food = path if path is not None else self.search_food_path()
+
+    def next_tour_leg(self):
+        """
+        Path to the next uneaten pellet of the planned tour
+        The tour is planned once (again after a catch) and legs come from its cached distance
+        fields; only when the ghost blocks the next leg is the order re-planned from here, with
+        the way out going around the ghost. With a planner the plan is made in the background
+        and Pacman keeps heading for the old leg's pellet (or the nearest one, before the first
+        tour) until it arrives.
+        """
+        while self.tour and self.tour[-1] not in self.food_positions:
+            self.tour.pop() # Eaten on the way to an earlier pellet
+        ghost_zone = self.tour_ghost_zone()
+        if self.tour:
+            leg = self.tour_planner.leg(self.pacman_pos, self.tour[-1])
+            if not self.path_enters(leg, ghost_zone):
+                return leg
+
+        if self.planner is not None:
+            if not self.awaiting_plan:
+                self.request_tour_plan(ghost_zone)
+            if self.tour:
+                return self.first_tour_leg(ghost_zone) # The old leg's pellet, around the ghost, until the plan arrives
+            # No tour yet (first plan, or after a catch): eat the nearest pellet meanwhile rather than stand still
+            search_started = time.process_time()
+            _, path = self.pathfinder.bfs_multi(self.pacman_pos, self.food_positions, dynamic_obstacles=ghost_zone)
+            self.search_cpu_time += time.process_time() - search_started
+            self.search_count += 1
+            return path
+
+        return self.plan_tour(ghost_zone)
+
+    def plan_tour(self, ghost_zone):
+        """Plan the tour on the game's thread, all of it or the rest around the ghost, returns the first leg"""
+        search_started = time.process_time()
+        self.search_count += 1
+        plan_moves, replan_moves = self.tour_move_budgets or (None, None)
+        if self.tour: # Blocked leg: re-order what is left, with the way out going around the ghost
+            self.tour = self.tour_planner.plan(self.pacman_pos, self.food_positions, blocked=ghost_zone,
+                                               time_budget=TOUR_REPLAN_BUDGET, move_budget=replan_moves)
+        else:
+            self.tour = self.tour_planner.plan(self.pacman_pos, self.food_positions, move_budget=plan_moves)
+        self.tour.reverse() # Popped from the end
+        path = self.first_tour_leg(ghost_zone)
+        self.search_cpu_time += time.process_time() - search_started
+        return path
+
+    def tour_ghost_zone(self):
+        """
+        Cells the ghost holds or can step into next (or reaches first, with threat avoidance);
+        a leg through them is blocked
+        """
+        if self.avoidance == 'threat':
+            ghost_zone = set(self.threat_cells())
+        else:
+            ghost_zone = {self.ghost_pos}
+            ghost_zone.update(pos for pos, _ in self.pathfinder.get_neighbors(self.ghost_pos))
+        ghost_zone.discard(self.pacman_pos)
+        return ghost_zone
+
+    def first_tour_leg(self, ghost_zone):
+        """Leg to the next pellet of the tour, searched around the ghost if the planned one runs into it"""
+        path = []
+        if self.tour:
+            path = self.tour_planner.leg(self.pacman_pos, self.tour[-1])
+            if self.path_enters(path, ghost_zone):
+                path = self.pathfinder.bidirectional_bfs(self.pacman_pos, self.tour[-1], dynamic_obstacles=ghost_zone)
+                if not path: # Cornered, only keep off the ghost's own cell like the other algorithms
+                    _, path = self.pathfinder.bfs_multi(self.pacman_pos, self.food_positions, dynamic_obstacles={self.ghost_pos})
+        return path
+
+    def request_tour_plan(self, ghost_zone):
+        """Send a tour plan to the background planner: all of it at first, the rest around the ghost after that"""
+        self.plan_sequence += 1
+        self.requested_sequence = self.plan_sequence
+        self.awaiting_plan = True
+        plan_moves, replan_moves = self.tour_move_budgets or (None, None)
+        if self.tour:
+            blocked, time_budget, move_budget = ghost_zone, TOUR_REPLAN_BUDGET, replan_moves
+        else:
+            blocked, time_budget, move_budget = None, TOUR_TIME_BUDGET, plan_moves
+        self.planner.submit_tour(
+            self.plan_sequence,
+            (self.pacman_pos, self.food_positions.copy(), blocked, time_budget, move_budget),
+            self.receive_tour_plan,
+        )
+
+    def receive_tour_plan(self, sequence, tour, cpu_time, calls):
+        """
+        Planner callback for a tour: adopt it unless a newer request, a catch or a reset came
+        since; Pacman's moves do not make it stale, the leg is taken from where Pacman is now
+        A tour of None means the plan failed on the planner, the game's thread plans instead
+        """
+        self.search_cpu_time += cpu_time
+        self.search_count += tour is not None
+        for call in calls:
+            self.search_stats.record(*call)
+        if sequence != self.requested_sequence or not self.awaiting_plan:
+            self.discarded_plans += 1
+            return
+        self.awaiting_plan = False
+        if tour is None:
+            self.current_path_to_food = self.plan_tour(self.tour_ghost_zone())
+            return
+        search_started = time.process_time()
+        # Legs are read on this thread, keep a field per pellet like the planner's own cache
+        self.tour_planner.fields.max_fields = max(self.tour_planner.fields.max_fields, len(tour) + 1)
+        self.tour = [pellet for pellet in reversed(tour) if pellet in self.food_positions]
+        self.current_path_to_food = self.first_tour_leg(self.tour_ghost_zone())
+        self.search_cpu_time += time.process_time() - search_started
+
+    def next_lookahead_move(self):
+        """Pacman's move from the lookahead search, None to stay put; run on the game's thread even with a planner"""
+        if self.lookahead is None:
+            from lookahead import LookaheadPlanner
+            self.lookahead = LookaheadPlanner(self.pathfinder, self.distance_cache, self.ghost_move_ticks,
+                                              node_budget=self.lookahead_node_budget)
+        search_started = time.process_time()
+        direction = self.lookahead.choose_move(self)
+        self.search_cpu_time += time.process_time() - search_started
+        self.search_count += 1
+        return direction
+
+    def path_cut(self, obstacles):
+        """Whether obstacles that moved since the current path was searched now lie on it"""
+        return obstacles != self.path_obstacles and self.path_enters(self.current_path_to_food, obstacles)
+
+    def path_enters(self, path, cells):
+        """Whether walking path from Pacman's cell steps on any of cells"""
+        r, c = self.pacman_pos
+        for direction in path:
+            if direction == 'UP': r -= 1
+            elif direction == 'DOWN': r += 1
+            elif direction == 'LEFT': c -= 1
+            elif direction == 'RIGHT': c += 1
+            if (r, c) in cells:
+                return True
+        return False
+
+    def search_avoidance(self):
+        """
+        (dynamic_obstacles, extra_costs, fallback_obstacles) for Pacman's next search
+        'ghost_cell' only blocks the ghost's cell, plus danger costs around it for the weighted
+        algorithms. 'threat' blocks every cell the ghost can reach no later than Pacman (or
+        makes it expensive, for the weighted algorithms); when that leaves no path, the search
+        is repeated with fallback_obstacles, the ghost's cell alone.
+        """
+        weighted = self.current_algorithm in WEIGHTED_ALGORITHMS
+        if self.avoidance == 'threat':
+            threat = self.threat_cells()
+            if weighted:
+                return {self.ghost_pos}, dict.fromkeys(threat, THREAT_COST), None
+            return threat, None, {self.ghost_pos}
+        return {self.ghost_pos}, self.ghost_danger_costs() if weighted else None, None
+
+    def threat_cells(self):
+        """
+        Cells the ghost can reach before Pacman gets out of them, as a frozenset of positions
+        Compares the ghost's distance field (cached per ghost cell, so built once per ghost
+        move) with Pacman's, in ticks: Pacman enters a cell d steps away on tick d and leaves
+        it the next, the ghost steps every ghost_move_ticks. Worked out once per tick and
+        reused by every search in it.
+        """
+        key = (self.tick, self.pacman_pos, self.ghost_pos)
+        if self.threat is not None and self.threat[0] == key:
+            return self.threat[1]
+        ghost_distances, _ = self.distance_cache.get_field(self.ghost_pos)
+        pacman_distances, _ = self.distance_cache.get_field(self.pacman_pos)
+        first_step = self.ghost_last_move_tick + self.ghost_move_ticks - self.tick  # Ticks until the ghost's next step
+        step_ticks = self.ghost_move_ticks
+        cols = self.cols
+        threat = frozenset(
+            divmod(cell, cols) for cell, (ghost_distance, pacman_distance) in enumerate(zip(ghost_distances, pacman_distances))
+            if ghost_distance >= 0 and pacman_distance >= 0
+            and (ghost_distance == 0 or first_step + (ghost_distance - 1) * step_ticks <= pacman_distance)
+        )
+        self.threat = (key, threat)
+        return threat
+
+    def ghost_danger_costs(self):
+        """Extra entry costs of the cells within GHOST_DANGER_RADIUS steps of the ghost, {position: cost}"""
+        danger = {}
+        if not self.ghost_pos:
+            return danger
+        frontier = [self.ghost_pos]
+        seen = {self.ghost_pos}
+        for step in range(1, GHOST_DANGER_RADIUS + 1):
+            next_frontier = []
+            for pos in frontier:
+                for neighbor, _ in self.pathfinder.get_neighbors(pos):
+                    if neighbor not in seen:
+                        seen.add(neighbor)
+                        danger[neighbor] = GHOST_DANGER_COST >> (step - 1)
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+        return danger
+
+    def charge_catch(self):
+        """Count a catch and add its time penalty"""
+        if self.verbose:
+            print(f"Pacman caught by ghost! Penalty +{GHOST_PENALTY_TIME}s.")
+        self.pacman_caught_count += 1
+        self.time_penalty += GHOST_PENALTY_TIME
+
+    def handle_pacman_caught(self):
+        self.charge_catch()
+        self.pacman_pos = self.start_pos # Reset Pacman
+        self.pacman_wait_ticks = 0
+        self.plan_sequence += 1
+        self.awaiting_plan = False
+        
+        # Optionally reset ghost or move it away to give Pacman a fresh start
+        # self.ghost_pos = self.initial_ghost_pos 
+        # Ensure ghost is not on Pacman's reset spot
+        if self.ghost_pos == self.pacman_pos:
+            self.ghost_pos = self.initial_ghost_pos if self.initial_ghost_pos != self.pacman_pos else (self.rows -2, self.cols -2)
+            # Further ensure new ghost_pos is valid
+            if self.grid[self.ghost_pos[0]][self.ghost_pos[1]] == 1 or self.ghost_pos == self.pacman_pos:
+                 self.ghost_pos = (1, self.cols-2) # A fallback
+
+        self.current_path_to_food = [] # Force path recalculation
+        self.tour = [] # The planned order started from where Pacman no longer is
+
+    def auto_play_step(self):
+        """Play one tick, then hand it to the recorder if one is attached"""
+        if self.game_completed:
+            return
+        self.play_tick()
+        if self.recorder is not None:
+            self.recorder.end_tick()
+
+    def start_tick(self):
+        """Advance the clock, the first tick of a run also starts its timer"""
+        self.tick += 1
+        if self.start_time is None:
+            self.start_time = self.current_time()
+            self.ghost_last_move_tick = self.tick # Sync ghost's first potential move
+
+    def play_tick(self):
+        self.start_tick()
+
+        # 1. Ghost moves
+        self.move_ghost()
+
+        # 2. Check collision: Ghost moved onto Pacman
+        if self.pacman_pos == self.ghost_pos:
+            self.handle_pacman_caught()
+            return # End this step early as Pacman is reset
+
+        # 3. Pacman acts (if not caught above and not still crossing a slow tile)
+        if self.pacman_wait_ticks > 0:
+            self.pacman_wait_ticks -= 1
+        elif self.food_positions and self.current_algorithm in LOOKAHEAD_ALGORITHMS:
+            # No path to follow, every move is searched from the current state
+            direction = self.next_lookahead_move()
+            if direction:
+                self.move_pacman(direction)
+                if self.pacman_pos == self.ghost_pos:
+                    self.handle_pacman_caught()
+                    return
+        elif self.food_positions:
+            # Incremental planners replan, a repair of the last search, as soon as obstacles that moved
+            # lie on their path rather than only when the next step is blocked; not in the background,
+            # where Pacman's move would make every such plan stale before it arrives
+            recalculate_pacman_path = not self.current_path_to_food or (
+                self.current_algorithm in INCREMENTAL_ALGORITHMS and self.planner is None
+                and self.path_cut(self.search_avoidance()[0]))
+            next_step_blocked = False
+            if self.current_path_to_food: # Check if current path is still valid (e.g. ghost moved into it)
+                next_step_dir = self.current_path_to_food[0]
+                r, c = self.pacman_pos
+                potential_next_pac_pos = None
+                if next_step_dir == 'UP': potential_next_pac_pos = (r - 1, c)
+                elif next_step_dir == 'DOWN': potential_next_pac_pos = (r + 1, c)
+                elif next_step_dir == 'LEFT': potential_next_pac_pos = (r, c - 1)
+                elif next_step_dir == 'RIGHT': potential_next_pac_pos = (r, c + 1)
+                
+                if potential_next_pac_pos == self.ghost_pos: # Pacman's next step is where ghost is NOW
+                    recalculate_pacman_path = True
+                    next_step_blocked = True
+
+            if recalculate_pacman_path and self.current_algorithm in TOUR_ALGORITHMS:
+                self.current_path_to_food = self.next_tour_leg()
+            elif recalculate_pacman_path and self.planner is not None:
+                # Keep following the last valid path until the background plan arrives
+                if not self.awaiting_plan:
+                    self.request_plan()
+                if next_step_blocked:
+                    self.current_path_to_food = [] # Wait rather than walk into the ghost
+            elif recalculate_pacman_path:
+                self.current_path_to_food = self.search_food_path()
+            
+            if self.current_path_to_food:
+                direction_to_move = self.current_path_to_food.pop(0)
+                self.move_pacman(direction_to_move)
+
+                # 4. Check collision: Pacman moved onto Ghost
+                if self.pacman_pos == self.ghost_pos:
+                    self.handle_pacman_caught()
+                    return # End this step early
+
+            if (self.planner is not None and not self.current_path_to_food and not self.awaiting_plan
+                    and self.food_positions and self.current_algorithm not in TOUR_ALGORITHMS):
+                self.request_plan() # Ask now, so the plan can arrive before the next tick
+        
+        # 5. Check game completion (all food eaten)
+        self.check_completion()
+
+    def check_completion(self):
+        """End the run once all food is eaten, recording its time including penalties"""
+        if not self.food_positions and not self.game_completed:
+            self.game_completed = True
+            self.end_time = self.current_time()
+            final_run_time = (self.end_time - self.start_time) + self.time_penalty
+            self.results[self.current_algorithm] = final_run_time # Store total time including penalties
+            self.tested_algorithms.add(self.current_algorithm)
+            
+            if not self.verbose:
+                return
+            algo_disp_name = self.current_algorithm.upper()
+            if algo_disp_name == 'DIJKSTRA': algo_disp_name = "DIJKSTRA'S"
+            
+            print(f"{algo_disp_name} completed in {final_run_time:.2f}s (Score: {self.score}, Caught: {self.pacman_caught_count}, Penalty: {self.time_penalty:.2f}s).")
+
+    def select_algorithm(self, choice):
+        if 1 <= choice <= len(MENU_ALGORITHMS):
+            selected_algo_key = MENU_ALGORITHMS[choice - 1]
+            if selected_algo_key not in self.tested_algorithms:
+                self.current_algorithm = selected_algo_key
+                self.reset_game() # Reset for the new algorithm test
+                self.state = GameState.PLAYING
+                return True
+        return False
+
+def run_headless(algorithm, seed=None, max_ticks=10000, start_pos=None, maze=None, avoidance='ghost_cell'):
+    """
+    Simulate one full game with the given algorithm, no display and no frame pacing
+    Returns a dict with the outcome of the run
+    """
+    game = PacmanGame(seed=seed, verbose=False, start_pos=start_pos, maze=maze, avoidance=avoidance)
+    game.lookahead_node_budget = LOOKAHEAD_NODE_BUDGET # Reproducible, unlike the time budgets
+    game.tour_move_budgets = TOUR_MOVE_BUDGETS
+    game.current_algorithm = algorithm
+    game.reset_game()
+    game.state = GameState.PLAYING
+    while not game.game_completed and game.tick < max_ticks:
+        game.auto_play_step()
+    search_summary = game.search_stats.summary().get(algorithm, {})
+    return {
+        'algorithm': algorithm,
+        'avoidance': avoidance,
+        'completed': game.game_completed,
+        'ticks': game.tick,
+        'time': game.elapsed_time(),
+        'score': game.score,
+        'caught': game.pacman_caught_count,
+        'penalty': game.time_penalty,
+        'searches': game.search_count,
+        'search_cpu_time': game.search_cpu_time,
+        'nodes_expanded': search_summary.get('nodes_expanded', 0),
+        'nodes_pushed': search_summary.get('nodes_pushed', 0),
+        'peak_frontier': search_summary.get('peak_frontier', 0),
+        'search_time_ns': search_summary.get('duration_ns', 0),
+    }
+
+if __name__ == "__main__":
+    import sys
+    from maze import load_maze
+    maze = load_maze(sys.argv[1]) if len(sys.argv) > 1 else None
+    for algorithm in MENU_ALGORITHMS:
+        result = run_headless(algorithm, maze=maze)
+        print(f"{algorithm}: {result['ticks']} ticks, {result['time']:.2f}s, "
+              f"score {result['score']}, caught {result['caught']}")
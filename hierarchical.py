@@ -0,0 +1,247 @@
+import heapq
+from time import perf_counter_ns
+from algorithm import DIRECTIONS, WALL_COST, IndexedMinHeap
+
+CLUSTER_SIZE = 16  # Cells per cluster side
+SINGLE_ENTRANCE_LENGTH = 6  # Border openings shorter than this get one transition in the middle, longer ones two
+
+class HierarchicalPathfinder:
+    """
+    HPA*: the grid is cut into CLUSTER_SIZE square clusters, and every opening between two
+    neighboring clusters gets one or two transitions (a pair of facing cells). The cells of
+    the transitions are the nodes of an abstract graph whose edges are the crossings (one
+    step) and the cheapest paths between the nodes of a cluster that stay inside it,
+    precomputed per cluster.
+    A query links start and target to the nodes of their clusters, runs A* on the small
+    abstract graph and refines only the segments asked for, each with a search confined to
+    one cluster. Paths pay cell entry costs like Dijkstra/A* and are near-optimal: they
+    may be a little longer than a flat search finds, since they pass through transitions.
+    A changed cell rebuilds its cluster, plus the cluster across a border it lies on.
+    """
+    def __init__(self, pathfinder, cluster_size=CLUSTER_SIZE):
+        self.pathfinder = pathfinder
+        self.size = cluster_size
+        self.cluster_rows = -(-pathfinder.rows // cluster_size)
+        self.cluster_cols = -(-pathfinder.cols // cluster_size)
+        self.transitions = {}  # border -> [(cell, cell across the border)], see borders_of
+        self.partners = {}  # node cell -> set of the cells it crosses to
+        self.nodes = {}  # cluster -> set of its node cells
+        self.intra = {}  # node cell -> [(node cell in the same cluster, path cost)]
+        self.expanded = 0  # Cells and nodes expanded by the current query, for the search stats
+        for cluster in range(self.cluster_rows * self.cluster_cols):
+            for border in self.borders_of(cluster):
+                if border[1] == cluster:  # Each border once, from the cluster above or left of it
+                    self.scan_border(border)
+        for cluster in range(self.cluster_rows * self.cluster_cols):
+            self.build_cluster(cluster)
+
+    def cluster_of(self, cell):
+        row, col = divmod(cell, self.pathfinder.cols)
+        return (row // self.size) * self.cluster_cols + col // self.size
+
+    def bounds(self, cluster):
+        """(top, left, bottom, right) of a cluster, bottom and right exclusive"""
+        cluster_row, cluster_col = divmod(cluster, self.cluster_cols)
+        top, left = cluster_row * self.size, cluster_col * self.size
+        return top, left, min(top + self.size, self.pathfinder.rows), min(left + self.size, self.pathfinder.cols)
+
+    def borders_of(self, cluster):
+        """
+        Borders of a cluster that have a cluster on the other side
+        ('h', k) is the border below cluster k and ('v', k) the one right of it
+        """
+        cluster_row, cluster_col = divmod(cluster, self.cluster_cols)
+        borders = []
+        if cluster_row > 0:
+            borders.append(('h', cluster - self.cluster_cols))
+        if cluster_row < self.cluster_rows - 1:
+            borders.append(('h', cluster))
+        if cluster_col > 0:
+            borders.append(('v', cluster - 1))
+        if cluster_col < self.cluster_cols - 1:
+            borders.append(('v', cluster))
+        return borders
+
+    def scan_border(self, border):
+        """Find the openings along a border and replace its transitions"""
+        pf = self.pathfinder
+        cols = pf.cols
+        kind, cluster = border
+        top, left, bottom, right = self.bounds(cluster)
+        if kind == 'h':  # Cells of the cluster's last row, each facing the cell below
+            first, stride, count, step, bit = (bottom - 1) * cols + left, 1, right - left, cols, 2
+        else:  # Cells of the cluster's last column, each facing the cell to the right
+            first, stride, count, step, bit = top * cols + right - 1, cols, bottom - top, 1, 8
+
+        for a, b in self.transitions.get(border, ()):
+            for cell, other in ((a, b), (b, a)):
+                self.partners[cell].discard(other)
+                if not self.partners[cell]:
+                    del self.partners[cell]
+        transitions = []
+        run = []
+        for index in range(count + 1):
+            cell = first + index * stride
+            # The move bit only says the cell across is open, walls get move masks too
+            if index < count and pf.costs[cell] != WALL_COST and pf.moves[cell] & bit:
+                run.append(cell)
+                continue
+            if len(run) >= SINGLE_ENTRANCE_LENGTH:
+                transitions += [(run[0], run[0] + step), (run[-1], run[-1] + step)]
+            elif run:
+                middle = run[len(run) // 2]
+                transitions.append((middle, middle + step))
+            run = []
+        self.transitions[border] = transitions
+        for a, b in transitions:
+            self.partners.setdefault(a, set()).add(b)
+            self.partners.setdefault(b, set()).add(a)
+
+    def build_cluster(self, cluster):
+        """Collect the cluster's nodes and the cheapest in-cluster path between every pair of them"""
+        for node in self.nodes.get(cluster, ()):
+            self.intra.pop(node, None)
+        nodes = set()
+        for border in self.borders_of(cluster):
+            for pair in self.transitions[border]:
+                nodes.update(cell for cell in pair if self.cluster_of(cell) == cluster)
+        self.nodes[cluster] = nodes
+        for node in nodes:
+            distances, _ = self.cluster_search(node, cluster, nodes)
+            self.intra[node] = [(other, distances[other]) for other in nodes if other != node and other in distances]
+
+    def update_cell(self, pos):
+        """Rebuild what a changed cell (wall or cost) affects: its borders and the clusters on them"""
+        row, col = pos
+        cell = row * self.pathfinder.cols + col
+        cluster = self.cluster_of(cell)
+        top, left, bottom, right = self.bounds(cluster)
+        touched = [
+            border for border, on_edge in (
+                (('h', cluster - self.cluster_cols), row == top),
+                (('h', cluster), row == bottom - 1),
+                (('v', cluster - 1), col == left),
+                (('v', cluster), col == right - 1),
+            ) if on_edge and border in self.transitions
+        ]
+        clusters = {cluster}
+        for border in touched:
+            self.scan_border(border)
+            kind, upper = border
+            clusters.update((upper, upper + (self.cluster_cols if kind == 'h' else 1)))
+        for affected in clusters:
+            self.build_cluster(affected)
+
+    def cluster_search(self, source, cluster, goals=None, reverse=False):
+        """
+        Dijkstra from source that never leaves cluster, stopping once every goal is settled
+        reverse=True gives the cost of reaching source from each cell instead of the other way
+        Returns (cost, came_from) dicts keyed by cell, came_from[cell] = (previous cell, direction code)
+        """
+        pf = self.pathfinder
+        cols, costs, moves, move_table = pf.cols, pf.costs, pf.moves, pf.move_table
+        top, left, bottom, right = self.bounds(cluster)
+        distances = {source: 0}
+        came_from = {source: None}
+        remaining = set(goals) if goals is not None else None
+        heap = [(0, source)]
+        while heap:
+            distance, cell = heapq.heappop(heap)
+            if distance > distances[cell]:
+                continue  # Stale entry
+            self.expanded += 1
+            if remaining is not None:
+                remaining.discard(cell)
+                if not remaining:
+                    break
+            for offset, code in move_table[moves[cell]]:
+                neighbor = cell + offset
+                row, col = divmod(neighbor, cols)
+                if not (top <= row < bottom and left <= col < right):
+                    continue
+                new_distance = distance + (costs[cell] if reverse else costs[neighbor])
+                if new_distance < distances.get(neighbor, new_distance + 1):
+                    distances[neighbor] = new_distance
+                    came_from[neighbor] = (cell, code)
+                    heapq.heappush(heap, (new_distance, neighbor))
+        return distances, came_from
+
+    def abstract_path(self, start_cell, target_cell):
+        """
+        A* over the abstract graph with start and target linked in
+        Returns the cells of the path, start and target included, or [] if there is none
+        """
+        pf = self.pathfinder
+        cols, costs, scale = pf.cols, pf.costs, pf.min_cost
+        start_cluster = self.cluster_of(start_cell)
+        target_cluster = self.cluster_of(target_cell)
+        start_links, _ = self.cluster_search(start_cell, start_cluster, self.nodes[start_cluster] | {target_cell})
+        target_links, _ = self.cluster_search(target_cell, target_cluster, self.nodes[target_cluster], reverse=True)
+        target_row, target_col = divmod(target_cell, cols)
+
+        heap = IndexedMinHeap()
+        heap.push(start_cell, (0, 0))  # Priority (f_score, g_score)
+        g_scores = {start_cell: 0}
+        parents = {start_cell: None}
+        while heap:
+            (_, g_score), cell = heap.pop()
+            self.expanded += 1
+            if cell == target_cell:
+                path = []
+                while cell is not None:
+                    path.append(cell)
+                    cell = parents[cell]
+                path.reverse()
+                return path
+            if cell == start_cell:
+                edges = [(node, cost) for node, cost in start_links.items()
+                         if node in self.nodes[start_cluster] or node == target_cell]
+            else:
+                edges = list(self.intra.get(cell, ()))
+                if cell in self.nodes[target_cluster] and cell in target_links:
+                    edges.append((target_cell, target_links[cell]))
+            edges += [(other, costs[other]) for other in self.partners.get(cell, ())]
+            for neighbor, cost in edges:
+                tentative = g_score + cost
+                if tentative < g_scores.get(neighbor, tentative + 1):
+                    g_scores[neighbor] = tentative
+                    parents[neighbor] = cell
+                    row, col = divmod(neighbor, cols)
+                    heap.push(neighbor, (tentative + scale * (abs(row - target_row) + abs(col - target_col)), tentative))
+        return []
+
+    def refine(self, abstract, segments=None):
+        """Direction list along an abstract path, for its first segments only if given"""
+        path = []
+        hops = list(zip(abstract, abstract[1:]))
+        for a, b in hops[:segments] if segments is not None else hops:
+            cluster = self.cluster_of(a)
+            if cluster != self.cluster_of(b):  # A crossing, the cells are neighbors
+                offsets = self.pathfinder.move_offsets
+                path.append(DIRECTIONS[offsets.index(b - a)])
+                continue
+            _, came_from = self.cluster_search(a, cluster, (b,))
+            segment = []
+            cell = b
+            while came_from[cell] is not None:
+                cell, code = came_from[cell]
+                segment.append(DIRECTIONS[code - 1])
+            path += reversed(segment)
+        return path
+
+    def find_path(self, start, target, segments=None):
+        """Direction list from start to target, refined for the first segments only if given"""
+        pf = self.pathfinder
+        start_cell, target_cell = pf.cell_id(start), pf.cell_id(target)
+        self.expanded = 0
+        started = perf_counter_ns() if pf.stats is not None else 0
+        path = []
+        if start_cell != target_cell and pf.grid[start[0]][start[1]] != 1 and pf.grid[target[0]][target[1]] != 1:
+            path = self.refine(self.abstract_path(start_cell, target_cell), segments)
+        pf.record_search('hpa', 'hpa', started, self.expanded, self.expanded, 0)
+        return path
+
+    def next_move(self, start, target):
+        """First direction towards target, refining only the first segment; None if there is no path"""
+        path = self.find_path(start, target, segments=1)
+        return path[0] if path else None
@@ -0,0 +1,200 @@
+import heapq
+from time import perf_counter_ns
+from algorithm import DIRECTIONS
+
+INF = float('inf')
+
+class DStarLite:
+    """
+    D* Lite over the pathfinder's neighbor index, searching backwards from every target at once
+    The g/rhs values and the priority queue survive between plan() calls, so when Pacman
+    advances, a target is eaten or a dynamic obstacle moves, only the cells whose distance
+    actually changes are repaired instead of searching the whole maze again.
+    """
+    def __init__(self, pathfinder):
+        self.pathfinder = pathfinder
+        self.g = {}
+        self.rhs = {}
+        self.heap = []
+        self.queued = {}  # cell -> key of its live heap entry, older entries are skipped when popped
+        self.goals = set()
+        self.blocked = set()
+        self.start_cell = None
+        self.last_cell = None
+        self.km = 0  # Accumulated heuristic offset from start moves
+        self.initialized = False
+        # Counters of the current plan() call
+        self.pushed = 0
+        self.peak = 0
+
+    def heuristic(self, a, b):
+        cols = self.pathfinder.cols
+        a_row, a_col = divmod(a, cols)
+        b_row, b_col = divmod(b, cols)
+        return abs(a_row - b_row) + abs(a_col - b_col)
+
+    def neighbors(self, cell):
+        """Open (non-wall, non-obstacle) cells next to cell, with the direction code of the move"""
+        pf = self.pathfinder
+        blocked = self.blocked
+        return [(cell + offset, code) for offset, code in pf.move_table[pf.moves[cell]]
+                if cell + offset not in blocked]
+
+    def calculate_key(self, cell):
+        best = min(self.g.get(cell, INF), self.rhs.get(cell, INF))
+        return (best + self.heuristic(self.start_cell, cell) + self.km, best)
+
+    def push(self, cell):
+        key = self.calculate_key(cell)
+        self.queued[cell] = key
+        heapq.heappush(self.heap, (key, cell))
+        self.pushed += 1
+
+    def top_key(self):
+        """Smallest live key, dropping stale heap entries on the way"""
+        heap = self.heap
+        while heap and self.queued.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else (INF, INF)
+
+    def compute_rhs(self, cell):
+        blocked = self.blocked
+        if cell in blocked:
+            return INF
+        if cell in self.goals:
+            return 0
+        # neighbors() inlined, every repaired cell and its neighbors come through here
+        pf = self.pathfinder
+        g = self.g
+        best = INF
+        for offset, _ in pf.move_table[pf.moves[cell]]:
+            neighbor = cell + offset
+            if neighbor not in blocked:
+                value = g.get(neighbor, INF) + 1
+                if value < best:
+                    best = value
+        return best
+
+    def update_vertex(self, cell):
+        self.rhs[cell] = self.compute_rhs(cell)
+        self.queued.pop(cell, None)
+        if self.g.get(cell, INF) != self.rhs[cell]:
+            self.push(cell)
+
+    def update_around(self, cell):
+        """A cell changed (goal or obstacle), so its own rhs and every neighbor's may change"""
+        self.update_vertex(cell)
+        pf = self.pathfinder
+        for offset, _ in pf.move_table[pf.moves[cell]]:
+            self.update_vertex(cell + offset)
+
+    def compute_shortest_path(self):
+        """Process inconsistent cells until the start's distance is settled, returns cells expanded"""
+        expanded = 0
+        g, rhs = self.g, self.rhs
+        start = self.start_cell
+        while True:
+            top = self.top_key()
+            if top >= self.calculate_key(start) and rhs.get(start, INF) == g.get(start, INF):
+                break
+            key, cell = heapq.heappop(self.heap)
+            del self.queued[cell]
+            expanded += 1
+            new_key = self.calculate_key(cell)
+            if key < new_key:
+                self.queued[cell] = new_key
+                heapq.heappush(self.heap, (new_key, cell))
+                self.pushed += 1
+            elif g.get(cell, INF) > rhs.get(cell, INF):
+                g[cell] = rhs[cell]
+                for neighbor, _ in self.neighbors(cell):
+                    self.update_vertex(neighbor)
+            else:
+                g[cell] = INF
+                self.update_vertex(cell)
+                for neighbor, _ in self.neighbors(cell):
+                    self.update_vertex(neighbor)
+            if len(self.heap) > self.peak:
+                self.peak = len(self.heap)
+        return expanded
+
+    def sync(self, start_cell, goals, blocked):
+        """Bring the stored state in line with the new start, target set and obstacles"""
+        if not self.initialized:
+            self.start_cell = self.last_cell = start_cell
+            self.goals = goals
+            self.blocked = blocked
+            for goal in goals:
+                if goal not in blocked:
+                    self.rhs[goal] = 0
+                    self.push(goal)
+            self.initialized = True
+            return
+
+        if start_cell != self.start_cell:
+            self.start_cell = start_cell
+            self.km += self.heuristic(self.last_cell, start_cell)
+            self.last_cell = start_cell
+
+        changed = (self.goals ^ goals) | (self.blocked ^ blocked)
+        self.goals = goals
+        self.blocked = blocked
+        for cell in changed:
+            self.update_around(cell)
+
+    def plan(self, start, targets, dynamic_obstacles=None):
+        """
+        Path from start to the nearest target, repairing the previous search where needed
+        Returns (target_position, path_to_target)
+        """
+        pf = self.pathfinder
+        started = perf_counter_ns() if pf.stats is not None else 0
+        self.pushed = 0
+        self.peak = len(self.heap)
+        start_cell = pf.cell_id(start)
+        goals = pf.goal_cells(start, targets)
+        blocked = set()
+        if dynamic_obstacles:
+            for row, col in dynamic_obstacles:
+                if 0 <= row < pf.rows and 0 <= col < pf.cols:
+                    blocked.add(row * pf.cols + col)
+        blocked.discard(start_cell)
+
+        self.sync(start_cell, goals, blocked)
+        if len(self.heap) > 4 * len(self.queued) + 64:
+            # Too many stale entries, rebuild the heap from the live ones
+            self.heap = [(key, cell) for cell, key in self.queued.items()]
+            heapq.heapify(self.heap)
+        expanded = 0
+        target, path = None, []
+        if goals:
+            expanded = self.compute_shortest_path()
+            target, path = self.extract_path()
+        pf.record_search('dstar', 'dstar_lite', started, expanded, self.pushed, self.peak)
+        return target, path
+
+    def extract_path(self):
+        """Walk downhill in g from the start until a target is reached"""
+        pf = self.pathfinder
+        moves, move_table = pf.moves, pf.move_table
+        g, goals, blocked = self.g, self.goals, self.blocked
+        cell = self.start_cell
+        if g.get(cell, INF) == INF:
+            return None, []
+        path = []
+        for _ in range(pf.rows * pf.cols):
+            if cell in goals:
+                return divmod(cell, pf.cols), path
+            # Inlined neighbors() and min(), this walk runs on every plan; the first lowest g wins
+            next_cell, next_code, next_g = None, 0, INF
+            for offset, code in move_table[moves[cell]]:
+                neighbor = cell + offset
+                if neighbor not in blocked:
+                    value = g.get(neighbor, INF)
+                    if value < next_g:
+                        next_cell, next_code, next_g = neighbor, code, value
+            if next_cell is None:
+                break
+            path.append(DIRECTIONS[next_code - 1])
+            cell = next_cell
+        return None, []
@@ -0,0 +1,231 @@
+import random
+from collections import OrderedDict
+from time import perf_counter, perf_counter_ns
+from algorithm import DIRECTIONS
+
+LOOKAHEAD_TIME_BUDGET = 0.02  # Seconds of search per move, a fifth of a 10 FPS frame
+MAX_DEPTH = 40  # Deepest iteration, in Pacman moves
+TABLE_SIZE = 1 << 18  # Transposition table entries, the oldest are dropped beyond it
+FOOD_FIELDS = 64  # Nearest-pellet fields kept, one per food set met by the search
+TIME_CHECK_NODES = 256  # Nodes between clock reads
+FOOD_VALUE = 10.0  # Reward for a pellet, the game's score for it
+CLEAR_VALUE = 100.0  # Reward for eating the last pellet
+CATCH_VALUE = -500.0  # A catch costs GHOST_PENALTY_TIME, about 50 moves of eating
+DISCOUNT = 0.95  # Per tick, so food sooner beats the same food later, slow tiles included
+GHOST_WEIGHT = 0.5  # Leaf reward per step between Pacman and the ghost, up to SAFE_DISTANCE
+SAFE_DISTANCE = 6
+STALL_MOVES = 60  # Moves without eating after which Pacman heads for the nearest pellet regardless
+
+class SearchTimeout(Exception):
+    """The move's time or node budget ran out in the middle of an iteration"""
+
+def food_bits(food_positions, cols):
+    """Remaining food as an int bitset, bit row * cols + col set for each pellet"""
+    bits = 0
+    for r, c in food_positions:
+        bits |= 1 << (r * cols + c)
+    return bits
+
+def set_bits(bits):
+    """Cell ids of the set bits of a food bitset, lowest first; costs one step per pellet, not per cell"""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+def encode_state(game):
+    """
+    Compact, hashable state of a PacmanGame at the point Pacman decides:
+    (Pacman's cell, the ghost's cell, ticks until the ghost's next step, food bitset)
+    """
+    pf = game.pathfinder
+    wait = max(0, game.ghost_last_move_tick + game.ghost_move_ticks - game.tick - 1)
+    return pf.cell_id(game.pacman_pos), pf.cell_id(game.ghost_pos), wait, food_bits(game.food_positions, game.cols)
+
+class LookaheadPlanner:
+    """
+    Pacman controller that looks ahead over the ghost's replies instead of walking to the
+    nearest pellet
+    The ghost is a deterministic chaser (a step along Pacman's distance field every
+    ghost_move_ticks), so the opponent layer of the minimax tree has a single child and the
+    search is a depth-limited max over Pacman's moves (stay or step), the ghost simulated
+    between them. Leaves score eaten food, the distance to the nearest pellet and the room
+    left to the ghost; catches end a line.
+    States are Zobrist hashed (Pacman, ghost, ghost phase and every pellet each get a random
+    64-bit key, XORed in and out as moves are made) into a transposition table that outlives
+    the move, so the next move starts from what this one learnt. Iterative deepening runs
+    until the time budget is spent and keeps the best move of the last full iteration; the
+    table's best moves and the nearest-pellet field order the moves of the next one. With a
+    node budget the search stops after that many nodes instead, whatever the clock says, so a
+    run repeats move for move.
+    The ghost's unstick moves are random and modelled as staying put. Beyond the horizon the
+    search cannot see that leading the ghost away pays off, so when every pellet left is
+    guarded Pacman would circle the ghost forever; after STALL_MOVES moves without eating it
+    walks to the nearest pellet and risks the catch instead, until it eats or respawns.
+    """
+    def __init__(self, pathfinder, distance_cache, ghost_move_ticks, time_budget=LOOKAHEAD_TIME_BUDGET,
+                 max_depth=MAX_DEPTH, table_size=TABLE_SIZE, seed=0, node_budget=None):
+        self.pathfinder = pathfinder
+        self.distance_cache = distance_cache  # The game's, so the ghost's chase fields are shared
+        self.ghost_move_ticks = ghost_move_ticks
+        self.time_budget = time_budget
+        self.node_budget = node_budget  # Decision nodes per move, replaces the time budget when set
+        self.max_depth = max_depth
+        self.table_size = table_size
+        cells = pathfinder.rows * pathfinder.cols
+        rng = random.Random(seed)
+        self.pacman_keys = [rng.getrandbits(64) for _ in range(cells)]
+        self.ghost_keys = [rng.getrandbits(64) for _ in range(cells)]
+        self.food_keys = [rng.getrandbits(64) for _ in range(cells)]
+        self.wait_keys = [rng.getrandbits(64) for _ in range(ghost_move_ticks)]
+        self.table = OrderedDict()  # state key -> (depth searched, value, best move code)
+        self.food_fields = OrderedDict()  # food bitset -> distances to the nearest pellet
+        self.root_food = 0  # Food bitset at the move being searched, and its cell ids
+        self.root_cells = []
+        self.deadline = None
+        self.node_limit = None
+        self.nodes = 0  # Decision nodes visited for the current move
+        self.depth = 0  # Depth of the last full iteration
+        self.table_hits = 0
+        self.last_food = None  # Food bitset and catch count at the previous move
+        self.last_caught = 0
+        self.stalled = 0  # Moves since food was last eaten or Pacman respawned
+
+    def clear(self):
+        """Forget the table and the food fields, for when walls or costs change"""
+        self.table.clear()
+        self.food_fields.clear()
+
+    def state_key(self, pacman, ghost, wait, food_cells):
+        key = self.pacman_keys[pacman] ^ self.ghost_keys[ghost] ^ self.wait_keys[wait]
+        for cell in food_cells:
+            key ^= self.food_keys[cell]
+        return key
+
+    def food_field(self, food):
+        """BFS distance of every cell to the nearest pellet of a food bitset"""
+        field = self.food_fields.get(food)
+        if field is not None:
+            self.food_fields.move_to_end(food)
+            return field
+        # Search states only lose pellets, so the few eaten since the root are the bits to walk
+        eaten = set(set_bits(self.root_food ^ food))
+        field, _ = self.distance_cache.compute_multi_field([cell for cell in self.root_cells if cell not in eaten])
+        self.food_fields[food] = field
+        if len(self.food_fields) > FOOD_FIELDS:
+            self.food_fields.popitem(last=False)
+        return field
+
+    def choose_move(self, game):
+        """Direction for Pacman's next move, None to stay put"""
+        pacman, ghost, wait, food = encode_state(game)
+        if not food:
+            return None
+        self.root_food, self.root_cells = food, list(set_bits(food))
+        fresh = food != self.last_food or game.pacman_caught_count != self.last_caught
+        self.stalled = 0 if fresh else self.stalled + 1
+        self.last_food, self.last_caught = food, game.pacman_caught_count
+        if self.stalled >= STALL_MOVES:
+            return self.nearest_food_move(pacman, food)
+        key = self.state_key(pacman, ghost, wait, self.root_cells)
+        started = perf_counter_ns()
+        deadline = perf_counter() + self.time_budget if self.node_budget is None else float('inf')
+        node_limit = self.node_budget if self.node_budget is not None else float('inf')
+        self.nodes = 0
+        self.depth = 0
+        best_code = 0
+        self.deadline = self.node_limit = float('inf')  # The first iteration always finishes
+        try:
+            for depth in range(1, self.max_depth + 1):
+                self.search(pacman, ghost, wait, food, key, depth)
+                best_code = self.table[key][2]
+                self.depth = depth
+                self.deadline, self.node_limit = deadline, node_limit
+        except SearchTimeout:
+            pass
+        self.pathfinder.record_search('lookahead', 'lookahead', started, self.nodes, self.nodes, 0)
+        return DIRECTIONS[best_code - 1] if best_code else None
+
+    def nearest_food_move(self, pacman, food):
+        """First step towards the nearest pellet, ignoring the ghost"""
+        pf = self.pathfinder
+        distances = self.food_field(food)
+        best_code, best_distance = 0, distances[pacman]
+        for offset, code in pf.move_table[pf.moves[pacman]]:
+            if 0 <= distances[pacman + offset] < best_distance:
+                best_code, best_distance = code, distances[pacman + offset]
+        return DIRECTIONS[best_code - 1] if best_code else None
+
+    def search(self, pacman, ghost, wait, food, key, depth):
+        """Value of a decision node searched depth moves deep, storing its best move in the table"""
+        self.nodes += 1
+        if self.nodes > self.node_limit or (self.nodes % TIME_CHECK_NODES == 0 and perf_counter() > self.deadline):
+            raise SearchTimeout
+        entry = self.table.get(key)
+        hint = -1
+        if entry is not None:
+            if entry[0] >= depth:
+                self.table_hits += 1
+                return entry[1]
+            hint = entry[2]
+        distances = self.food_field(food)
+        if depth == 0:
+            return self.evaluate(pacman, ghost, distances)
+
+        pf = self.pathfinder
+        moves = [(cell_code[1], pacman + cell_code[0]) for cell_code in pf.move_table[pf.moves[pacman]]]
+        moves.append((0, pacman))
+        # The table's best move first, then the ones closest to food
+        moves.sort(key=lambda move: (move[0] != hint, distances[move[1]]))
+        best_value, best_code = None, 0
+        for code, target in moves:
+            value = self.play(pacman, ghost, wait, food, key, target, depth)
+            if best_value is None or value > best_value:
+                best_value, best_code = value, code
+
+        if key not in self.table and len(self.table) >= self.table_size:
+            self.table.popitem(last=False)
+        self.table[key] = (depth, best_value, best_code)
+        return best_value
+
+    def play(self, pacman, ghost, wait, food, key, target, depth):
+        """Value of Pacman moving to target (or staying): the pellet, the ghost's ticks until the next decision, the rest"""
+        pf = self.pathfinder
+        key ^= self.pacman_keys[pacman] ^ self.pacman_keys[target]
+        gain = 0.0
+        if food >> target & 1:
+            food ^= 1 << target
+            key ^= self.food_keys[target]
+            gain = FOOD_VALUE
+        if target == ghost:
+            return gain + CATCH_VALUE
+        if not food:
+            return gain + CLEAR_VALUE
+        # A cell of cost n holds Pacman for n ticks, the ghost may step in each of them
+        toward_pacman = None
+        ticks = pf.costs[target] if target != pacman else 1
+        for _ in range(ticks):
+            next_wait = wait - 1
+            if wait == 0:
+                next_wait = self.ghost_move_ticks - 1
+                if toward_pacman is None:
+                    _, toward_pacman = self.distance_cache.get_field(divmod(target, pf.cols))
+                code = toward_pacman[ghost]
+                if code:
+                    next_ghost = ghost + pf.move_offsets[code - 1]
+                    key ^= self.ghost_keys[ghost] ^ self.ghost_keys[next_ghost]
+                    ghost = next_ghost
+            key ^= self.wait_keys[wait] ^ self.wait_keys[next_wait]
+            wait = next_wait
+            if ghost == target:
+                return gain + CATCH_VALUE
+        return gain + DISCOUNT ** ticks * self.search(target, ghost, wait, food, key, depth - 1)
+
+    def evaluate(self, pacman, ghost, distances):
+        """Leaf score: closer to the nearest pellet and further from the ghost is better"""
+        ghost_distances, _ = self.distance_cache.get_field(divmod(pacman, self.pathfinder.cols))
+        ghost_distance = ghost_distances[ghost]
+        if ghost_distance < 0 or ghost_distance > SAFE_DISTANCE:
+            ghost_distance = SAFE_DISTANCE
+        food_distance = distances[pacman] if distances[pacman] >= 0 else len(distances)
+        return GHOST_WEIGHT * ghost_distance - food_distance
@@ -0,0 +1,190 @@
+import mmap
+import struct
+
+# Text format: one line per row, '#' wall, '.' or ' ' floor, '~' slow tile, 'P' Pacman start, 'G' ghost start
+WALL_CHAR = '#'
+FLOOR_CHARS = '. '
+SLOW_CHAR = '~'
+PACMAN_CHAR = 'P'
+GHOST_CHAR = 'G'
+SLOW_TILE = 3  # Grid value (entry cost) of a slow tile
+TEXT_CHARS = set(WALL_CHAR + FLOOR_CHARS + SLOW_CHAR + PACMAN_CHAR + GHOST_CHAR)
+TEXT_TO_CELL = bytes.maketrans(b'#. ~PG', b'\x01\x00\x00' + bytes([SLOW_TILE]) + b'\x00\x00')
+
+# Binary format: 12 byte header (magic, rows, cols as little-endian uint32) followed by the cells
+HEADER = struct.Struct('<4sII')
+PACKED_MAGIC = b'PMZ1'  # 1 bit per cell, row-major, bit set = wall, rows padded to whole bytes
+BYTES_MAGIC = b'PMZ8'  # 1 byte per cell, the raw grid values (room for terrain costs)
+
+class BitRow:
+    """One row of a bit-packed maze, indexable like a list of 0/1 cells"""
+    __slots__ = ('data', 'offset', 'cols')
+
+    def __init__(self, data, offset, cols):
+        self.data = data
+        self.offset = offset  # Byte offset of the row in data
+        self.cols = cols
+
+    def __len__(self):
+        return self.cols
+
+    def __getitem__(self, col):
+        if not 0 <= col < self.cols:
+            raise IndexError(col)
+        return (self.data[self.offset + (col >> 3)] >> (col & 7)) & 1
+
+    def __setitem__(self, col, value):
+        if not 0 <= col < self.cols:
+            raise IndexError(col)
+        index = self.offset + (col >> 3)
+        if value == 1:
+            self.data[index] |= 1 << (col & 7)
+        else:
+            self.data[index] &= ~(1 << (col & 7)) & 0xFF
+
+class Maze:
+    """
+    Compact grid: one byte or one bit per cell in a bytearray or a memory-mapped file
+    maze[row][col] reads and writes cells like the nested lists it replaces, so the
+    game and PathfindingAlgorithms use it unchanged, but no Python int is kept per cell
+    """
+    def __init__(self, rows, cols, cells=None, packed=False, pacman_start=None, ghost_start=None):
+        self.rows = rows
+        self.cols = cols
+        self.packed = packed
+        self.row_bytes = (cols + 7) // 8 if packed else cols
+        if cells is None:
+            cells = bytearray(rows * self.row_bytes)
+        self.cells = memoryview(cells)
+        self.pacman_start = pacman_start
+        self.ghost_start = ghost_start
+        self.mapping = None  # Open mmap when loaded from a binary file
+
+    @classmethod
+    def from_rows(cls, grid, packed=False):
+        """Copy a list-of-lists grid into a Maze"""
+        rows = len(grid)
+        cols = len(grid[0]) if grid else 0
+        maze = cls(rows, cols, packed=packed)
+        for r, row in enumerate(grid):
+            if packed:
+                for c, value in enumerate(row):
+                    maze[r][c] = value
+            else:
+                maze.cells[r * cols:(r + 1) * cols] = bytes(row)
+        return maze
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, row):
+        if not 0 <= row < self.rows:
+            raise IndexError(row)
+        if self.packed:
+            return BitRow(self.cells, row * self.row_bytes, self.cols)
+        return self.cells[row * self.cols:(row + 1) * self.cols]
+
+    def __iter__(self):
+        for row in range(self.rows):
+            yield self[row]
+
+    def to_rows(self):
+        """Nested list copy, only sensible for small mazes"""
+        return [list(row) for row in self]
+
+    def close(self):
+        self.cells.release()
+        if self.mapping is not None:
+            self.mapping.close()
+            self.mapping = None
+
+def text_row_cells(line, row, maze):
+    """Cell bytes of one text row (padded with floor to the maze width), recording the start markers"""
+    unknown = set(line) - TEXT_CHARS
+    if unknown:
+        raise ValueError(f"Unknown maze character {sorted(unknown)[0]!r} in row {row}")
+    if PACMAN_CHAR in line:
+        maze.pacman_start = (row, line.index(PACMAN_CHAR))
+    if GHOST_CHAR in line:
+        maze.ghost_start = (row, line.index(GHOST_CHAR))
+    return line.encode('ascii').translate(TEXT_TO_CELL).ljust(maze.cols, b'\x00')
+
+def load_text(path, packed=False):
+    """
+    Read an ASCII maze in two streaming passes (size, then cells) so only one line of
+    text is held at a time; lines shorter than the widest are padded with floor
+    Unix, Windows and old Mac line endings are all accepted
+    """
+    rows = cols = 0
+    with open(path, newline=None) as f:  # Universal newlines: '\r\n' and '\r' end a line like '\n'
+        for index, line in enumerate(f):
+            line = line.rstrip('\r\n')
+            cols = max(cols, len(line))
+            if line.strip():
+                rows = index + 1  # Trailing blank lines are not part of the maze
+
+    maze = Maze(rows, cols, packed=packed)
+    with open(path, newline=None) as f:
+        for row, line in enumerate(f):
+            if row >= rows:
+                break
+            cells = text_row_cells(line.rstrip('\r\n'), row, maze)
+            if packed:
+                cells = pack_row(cells)
+            maze.cells[row * maze.row_bytes:(row + 1) * maze.row_bytes] = cells
+    return maze
+
+def save_text(maze, path):
+    with open(path, 'w') as f:
+        for r in range(maze.rows):
+            # Any cost above 1 is written as a slow tile, the text format has one terrain kind
+            chars = [WALL_CHAR if value == 1 else SLOW_CHAR if value > 1 else '.' for value in maze[r]]
+            if maze.pacman_start and maze.pacman_start[0] == r:
+                chars[maze.pacman_start[1]] = PACMAN_CHAR
+            if maze.ghost_start and maze.ghost_start[0] == r:
+                chars[maze.ghost_start[1]] = GHOST_CHAR
+            f.write(''.join(chars) + '\n')
+
+def load_binary(path, writable=True):
+    """
+    Memory-map a binary maze instead of reading it into memory
+    With writable the mapping is copy-on-write, so cell edits never reach the file
+    """
+    with open(path, 'rb') as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY if writable else mmap.ACCESS_READ)
+    magic, rows, cols = HEADER.unpack_from(mapping, 0)
+    if magic not in (PACKED_MAGIC, BYTES_MAGIC):
+        mapping.close()
+        raise ValueError(f"{path} is not a binary maze file")
+    packed = magic == PACKED_MAGIC
+    row_bytes = (cols + 7) // 8 if packed else cols
+    cells = memoryview(mapping)[HEADER.size:HEADER.size + rows * row_bytes]
+    maze = Maze(rows, cols, cells, packed=packed)
+    maze.mapping = mapping
+    return maze
+
+def save_binary(maze, path, packed=True):
+    """Write a maze in the bit-packed (walls only) or byte-per-cell binary format"""
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(PACKED_MAGIC if packed else BYTES_MAGIC, maze.rows, maze.cols))
+        if packed == maze.packed:
+            f.write(maze.cells)
+            return
+        for r in range(maze.rows):
+            f.write(pack_row(maze[r]) if packed else bytes(maze[r]))
+
+def pack_row(row):
+    """Bit-pack one row of cells (any value of 1 is a wall)"""
+    packed = bytearray((len(row) + 7) // 8)
+    for col, value in enumerate(row):
+        if value == 1:
+            packed[col >> 3] |= 1 << (col & 7)
+    return packed
+
+def load_maze(path):
+    """Load a maze file, binary if it starts with a known magic, text otherwise"""
+    with open(path, 'rb') as f:
+        magic = f.read(4)
+    if magic in (PACKED_MAGIC, BYTES_MAGIC):
+        return load_binary(path)
+    return load_text(path)
@@ -0,0 +1,224 @@
+import argparse
+import random
+from array import array
+from maze import Maze, HEADER, PACKED_MAGIC, BYTES_MAGIC, SLOW_TILE, pack_row, save_text
+
+# Passages run along odd rows and columns; even rows and columns hold the walls between them.
+# Every style leaves the outer border walled and all passage cells connected.
+STYLES = ('backtracker', 'prim', 'braid', 'rooms', 'sidewinder')
+STREAMING_STYLES = ('sidewinder',)  # Generated row by row, never holding the whole maze
+
+def passage_steps(cell, rows, cols):
+    """Passage cells two steps away from cell that are still inside the border"""
+    row, col = divmod(cell, cols)
+    steps = []
+    if row >= 3: steps.append(cell - 2 * cols)
+    if row + 2 <= rows - 2: steps.append(cell + 2 * cols)
+    if col >= 3: steps.append(cell - 2)
+    if col + 2 <= cols - 2: steps.append(cell + 2)
+    return steps
+
+def carve_backtracker(cells, rows, cols, rng):
+    """Recursive backtracker (iterative, with an int array as the stack): long winding corridors"""
+    start = cols + 1
+    cells[start] = 0
+    stack = array('i', [start])
+    while stack:
+        cell = stack[-1]
+        options = [step for step in passage_steps(cell, rows, cols) if cells[step]]
+        if not options:
+            stack.pop()
+            continue
+        next_cell = rng.choice(options)
+        cells[(cell + next_cell) // 2] = 0  # Wall between the two passage cells
+        cells[next_cell] = 0
+        stack.append(next_cell)
+
+def carve_prim(cells, rows, cols, rng):
+    """Randomized Prim's: grows from one cell by attaching random frontier cells, many short dead ends"""
+    in_frontier = bytearray(rows * cols)
+    frontier = array('i')
+    start = cols + 1
+    cells[start] = 0
+    for step in passage_steps(start, rows, cols):
+        in_frontier[step] = 1
+        frontier.append(step)
+    while frontier:
+        index = rng.randrange(len(frontier))
+        cell = frontier[index]
+        frontier[index] = frontier[-1]  # Swap-remove keeps the pick O(1)
+        frontier.pop()
+        carved = [step for step in passage_steps(cell, rows, cols) if not cells[step]]
+        link = rng.choice(carved)
+        cells[(cell + link) // 2] = 0
+        cells[cell] = 0
+        for step in passage_steps(cell, rows, cols):
+            if cells[step] and not in_frontier[step]:
+                in_frontier[step] = 1
+                frontier.append(step)
+
+def open_neighbor_count(cells, cell, cols):
+    return (not cells[cell - cols]) + (not cells[cell + cols]) + (not cells[cell - 1]) + (not cells[cell + 1])
+
+def braid(cells, rows, cols, rng, amount):
+    """Knock through the end wall of a share of the dead ends, which adds loops"""
+    for row in range(1, rows - 1, 2):
+        for col in range(1, cols - 1, 2):
+            cell = row * cols + col
+            if cells[cell] or open_neighbor_count(cells, cell, cols) != 1 or rng.random() >= amount:
+                continue
+            walls = [step for step in passage_steps(cell, rows, cols) if cells[(cell + step) // 2]]
+            if not walls:
+                continue  # Only the border is left to knock through
+            # Prefer joining another dead end so one knock removes two
+            dead_ends = [step for step in walls if open_neighbor_count(cells, step, cols) == 1]
+            step = rng.choice(dead_ends or walls)
+            cells[(cell + step) // 2] = 0
+
+def carve_rooms(cells, rows, cols, rng, room_count):
+    """Clear random rectangles inside a maze; only walls are removed, so it stays connected"""
+    for _ in range(room_count):
+        height = rng.randint(3, max(3, rows // 4))
+        width = rng.randint(3, max(3, cols // 4))
+        top = rng.randint(1, max(1, rows - 1 - height))
+        left = rng.randint(1, max(1, cols - 1 - width))
+        for row in range(top, min(top + height, rows - 1)):
+            start = row * cols + left
+            end = row * cols + min(left + width, cols - 1)
+            cells[start:end] = bytes(end - start)
+
+def iter_sidewinder_rows(rows, cols, rng):
+    """
+    Sidewinder maze yielded one row (bytes) at a time; only the current passage row and the
+    wall row above it are held, so output size is not limited by memory
+    """
+    check_size(rows, cols)
+    yield bytes([1]) * cols  # Top border
+    first = True
+    for row in range(1, rows - 1, 2):
+        wall_row = bytearray([1]) * cols
+        passage_row = bytearray([1]) * cols
+        run_start = 1
+        for col in range(1, cols - 1, 2):
+            passage_row[col] = 0
+            at_east_edge = col + 2 > cols - 2
+            if first:
+                if not at_east_edge:
+                    passage_row[col + 1] = 0  # Top row is one long corridor
+                continue
+            if at_east_edge or rng.random() < 0.5:
+                up_col = rng.randrange(run_start, col + 1, 2)
+                wall_row[up_col] = 0  # Close the run by carving north from one of its cells
+                run_start = col + 2
+            else:
+                passage_row[col + 1] = 0
+        if not first:
+            yield bytes(wall_row)
+        yield bytes(passage_row)
+        first = False
+        emitted = row + 1
+    for _ in range(emitted, rows):
+        yield bytes([1]) * cols  # Bottom border, plus the spare wall row of an even height
+
+def slow_tiles_rng(seed):
+    """Separate stream for terrain, so adding slow tiles never changes the maze layout of a seed"""
+    return random.Random(None if seed is None else f"{seed}:slow")
+
+def add_slow_tiles(row, row_index, rows, rng, share):
+    """Turn a share of the floor cells of one row into slow tiles, leaving both start cells plain floor"""
+    row = bytearray(row)
+    cols = len(row)
+    starts = {(1, 1), last_passage_cell(rows, cols)}
+    for col, value in enumerate(row):
+        if value == 0 and rng.random() < share and (row_index, col) not in starts:
+            row[col] = SLOW_TILE
+    return row
+
+def check_size(rows, cols):
+    if rows < 3 or cols < 3:
+        raise ValueError("A maze needs at least 3 rows and 3 columns")
+
+def generate_cells(rows, cols, style='backtracker', seed=None, braid_amount=0.5, room_count=None, slow_share=0.0):
+    """Generate a maze into a flat bytearray of rows * cols cells (1 wall, 0 floor, SLOW_TILE slow floor)"""
+    check_size(rows, cols)
+    if style not in STYLES:
+        raise ValueError(f"Unknown maze style {style!r}, expected one of {', '.join(STYLES)}")
+    if style in STREAMING_STYLES:
+        return bytearray(b''.join(iter_maze_rows(rows, cols, style, seed, slow_share=slow_share)))
+
+    rng = random.Random(seed)
+
+    cells = bytearray([1]) * (rows * cols)
+    if style == 'prim':
+        carve_prim(cells, rows, cols, rng)
+    else:
+        carve_backtracker(cells, rows, cols, rng)
+    if style == 'braid':
+        braid(cells, rows, cols, rng, braid_amount)
+    elif style == 'rooms':
+        if room_count is None:
+            room_count = max(1, rows * cols // 400)
+        carve_rooms(cells, rows, cols, rng, room_count)
+    if slow_share:
+        slow_rng = slow_tiles_rng(seed)
+        for row in range(rows):
+            cells[row * cols:(row + 1) * cols] = add_slow_tiles(cells[row * cols:(row + 1) * cols], row, rows, slow_rng, slow_share)
+    return cells
+
+def last_passage_cell(rows, cols):
+    """Bottom-right passage cell, where the ghost starts"""
+    return (rows - 2 if rows % 2 else rows - 3, cols - 2 if cols % 2 else cols - 3)
+
+def generate_maze(rows, cols, style='backtracker', seed=None, braid_amount=0.5, room_count=None, slow_share=0.0):
+    """
+    Seeded maze in the maze.Maze format PathfindingAlgorithms and the game consume
+    Use maze.to_rows() for nested lists on small sizes
+    """
+    cells = generate_cells(rows, cols, style, seed, braid_amount, room_count, slow_share)
+    return Maze(rows, cols, cells, pacman_start=(1, 1), ghost_start=last_passage_cell(rows, cols))
+
+def iter_maze_rows(rows, cols, style='backtracker', seed=None, braid_amount=0.5, room_count=None, slow_share=0.0):
+    """Maze rows as bytes; streaming styles never build the whole maze"""
+    if style in STREAMING_STYLES:
+        slow_rng = slow_tiles_rng(seed)
+        for index, row in enumerate(iter_sidewinder_rows(rows, cols, random.Random(seed))):
+            yield bytes(add_slow_tiles(row, index, rows, slow_rng, slow_share)) if slow_share else row
+        return
+    cells = generate_cells(rows, cols, style, seed, braid_amount, room_count, slow_share)
+    for row in range(rows):
+        yield bytes(cells[row * cols:(row + 1) * cols])
+
+def generate_to_file(path, rows, cols, style='backtracker', seed=None, packed=True, chunk_rows=1024, **options):
+    """Write a generated maze to a binary maze file in chunks of chunk_rows rows"""
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(PACKED_MAGIC if packed else BYTES_MAGIC, rows, cols))
+        chunk = []
+        for row in iter_maze_rows(rows, cols, style, seed, **options):
+            chunk.append(pack_row(row) if packed else row)
+            if len(chunk) >= chunk_rows:
+                f.write(b''.join(chunk))
+                chunk.clear()
+        f.write(b''.join(chunk))
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a seeded maze file")
+    parser.add_argument('output', help="Output path, .txt for ASCII, anything else for binary")
+    parser.add_argument('--rows', type=int, default=21)
+    parser.add_argument('--cols', type=int, default=21)
+    parser.add_argument('--style', choices=STYLES, default='backtracker')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--braid', type=float, default=0.5, help="Share of dead ends removed by the braid style")
+    parser.add_argument('--rooms', type=int, default=None, help="Number of rooms for the rooms style")
+    parser.add_argument('--slow', type=float, default=0.0, help="Share of floor cells turned into slow tiles")
+    parser.add_argument('--bytes', action='store_true',
+                        help="Byte-per-cell binary instead of bit-packed (bit-packed files keep walls only)")
+    args = parser.parse_args()
+
+    if args.output.endswith('.txt'):
+        save_text(generate_maze(args.rows, args.cols, args.style, args.seed, args.braid, args.rooms, args.slow), args.output)
+    else:
+        generate_to_file(args.output, args.rows, args.cols, args.style, args.seed, packed=not args.bytes,
+                         braid_amount=args.braid, room_count=args.rooms, slow_share=args.slow)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+import argparse
+import time
+from algorithm import DIRECTION_CODES, DIRECTIONS
+from benchmark import load_benchmark_maze
+from game_core import GameState, PacmanGame
+
+def spread_cells(cells, count, taken):
+    """count of cells spread evenly along cells, one from the middle of each equal slice, skipping taken ones"""
+    free = [cell for cell in cells if cell not in taken]
+    return [free[(2 * index + 1) * len(free) // (2 * count)] for index in range(count)]
+
+class MultiAgentGame(PacmanGame):
+    """
+    Many Pacmen and many ghosts on one maze, headless, with all pathfinding batched per tick
+    The rules are PacmanGame's: the same clock and ghost pace, slow tiles that hold a Pacman
+    for their cost in ticks, the catch penalty and respawn, and the ghosts' unstick moves.
+    Pacman 0 and ghost 0 start where PacmanGame puts its Pacman and ghost, the others spread
+    over the maze. Ghost i chases Pacman i % pacmen. The ghosts read their next step from one
+    wall-only BFS field per distinct chased cell, grown only until it reaches every ghost
+    chasing that cell, and all Pacmen share one multi-source field from every pellet, rebuilt
+    after food was eaten. A tick therefore costs one BFS per distinct target however many
+    agents there are. With batched=False every agent runs its own search instead, the ghosts
+    PacmanGame's chase, for comparison.
+    """
+    def __init__(self, maze=None, pacmen=4, ghosts=8, seed=None, batched=True):
+        if pacmen < 1:
+            raise ValueError("A multi-agent game needs at least one Pacman")
+        super().__init__(seed=seed, verbose=False, maze=maze)
+        self.current_algorithm = 'bfs'  # The Pacmen's search, the key of the run in results
+        self.batched = batched
+        self.food_field = None  # (distances, toward_food) of the nearest pellet
+        self.food_changed = True  # Food was eaten or ghosts moved since food_field was built
+
+        open_cells = [(r, c) for r in range(self.rows) for c in range(self.cols) if self.grid[r][c] != 1]
+        if pacmen + ghosts > len(open_cells):
+            raise ValueError(f"{pacmen + ghosts} agents do not fit in {len(open_cells)} open cells")
+        taken = {self.start_pos, self.ghost_pos}
+        self.pacman_starts = [self.start_pos] + spread_cells(open_cells, pacmen - 1, taken)  # Respawn cells after a catch
+        taken.update(self.pacman_starts)
+        self.ghost_starts = ([self.ghost_pos] + spread_cells(open_cells[::-1], ghosts - 1, taken))[:ghosts]
+        self.ghost_targets = [index % pacmen for index in range(ghosts)]  # Pacman each ghost chases
+        self.original_food_positions -= set(self.pacman_starts) | set(self.ghost_starts)
+        self.reset_game()
+
+    def reset_game(self):
+        super().reset_game()
+        self.pacman_positions = list(self.pacman_starts)
+        self.ghost_positions = list(self.ghost_starts)
+        self.pacman_waits = [0] * len(self.pacman_starts)  # Ticks each Pacman still spends on a slow tile
+        self.food_field = None
+        self.food_changed = True
+        self.state = GameState.PLAYING
+
+    def play_tick(self):
+        """One tick, ordered like PacmanGame.play_tick: the ghosts when due, then every Pacman, catches checked after each"""
+        self.start_tick()
+        if self.tick - self.ghost_last_move_tick >= self.ghost_move_ticks:
+            self.ghost_last_move_tick = self.tick
+            self.move_ghosts()
+            self.food_changed = True # The Pacmen's field routes around the ghosts
+            self.resolve_catches()
+        self.move_pacmen()
+        self.check_completion()
+
+    def move_ghosts(self):
+        pf = self.pathfinder
+        if not self.batched:
+            for index, ghost in enumerate(self.ghost_positions):
+                direction = self.chase_direction(ghost, self.pacman_positions[self.ghost_targets[index]])
+                self.search_count += 1
+                self.ghost_positions[index] = self.ghost_step(ghost, direction)
+            return
+        chasers = {}  # Chased cell -> indices of the ghosts chasing it
+        for index, pacman_index in enumerate(self.ghost_targets):
+            chasers.setdefault(pf.cell_id(self.pacman_positions[pacman_index]), []).append(index)
+        for target_cell, ghost_indices in chasers.items():
+            # One BFS out of the chased cell, only as far as the farthest of its ghosts
+            ghost_cells = [pf.cell_id(self.ghost_positions[index]) for index in ghost_indices]
+            _, toward_target = self.distance_cache.compute_multi_field((target_cell,), ghost_cells)
+            self.search_count += 1
+            for index, cell in zip(ghost_indices, ghost_cells):
+                code = toward_target[cell]
+                self.ghost_positions[index] = self.ghost_step(self.ghost_positions[index], DIRECTIONS[code - 1] if code else None)
+
+    def move_pacmen(self):
+        pf = self.pathfinder
+        ghosts = set(self.ghost_positions)
+        if self.batched and self.food_positions:
+            pacman_cells = [pf.cell_id(pos) for pos in self.pacman_positions]
+            # Rebuilt after food was eaten, a ghost moved, or a Pacman left the part the last BFS labelled
+            if self.food_changed or any(self.food_field[0][cell] < 0 for cell in pacman_cells):
+                ghost_cells = [pf.cell_id(pos) for pos in ghosts]
+                self.food_field = self.distance_cache.compute_multi_field(list(self.food_positions.cells), pacman_cells, ghost_cells)
+                self.food_changed = False
+                self.search_count += 1
+        for index, pos in enumerate(self.pacman_positions):
+            if not self.food_positions:
+                return
+            if self.pacman_waits[index] > 0: # Still crossing a slow tile
+                self.pacman_waits[index] -= 1
+                continue
+            if self.batched:
+                next_pos = self.food_step(pos, ghosts)
+            else:
+                _, path = pf.bfs_multi(pos, self.food_positions, dynamic_obstacles=ghosts)
+                self.search_count += 1
+                next_pos = divmod(pf.cell_id(pos) + pf.move_offsets[DIRECTION_CODES[path[0]] - 1], pf.cols) if path else None
+            if next_pos is None:
+                continue
+            self.pacman_positions[index] = next_pos
+            food_left = len(self.food_positions)
+            self.pacman_waits[index] = self.enter_cell(next_pos)
+            if len(self.food_positions) != food_left:
+                self.food_changed = True # Later Pacmen this tick still follow the old field
+            if next_pos in ghosts:
+                self.catch(index)
+
+    def food_step(self, pos, ghosts):
+        """
+        Neighbor of pos closest to a pellet on the shared food field, skipping cells a ghost holds
+        The field routes around the ghosts as they stood when it was built. None if no pellet
+        is reachable without passing a ghost.
+        """
+        pf = self.pathfinder
+        distances, _ = self.food_field
+        cell = pf.cell_id(pos)
+        best, best_distance = None, -1
+        for offset, _ in pf.move_table[pf.moves[cell]]:
+            neighbor = cell + offset
+            distance = distances[neighbor]
+            if distance < 0 or (best is not None and distance >= best_distance):
+                continue
+            neighbor_pos = divmod(neighbor, pf.cols)
+            if neighbor_pos not in ghosts:
+                best, best_distance = neighbor_pos, distance
+        return best
+
+    def resolve_catches(self):
+        """Catch every Pacman sharing a cell with a ghost"""
+        ghosts = set(self.ghost_positions)
+        for index, pos in enumerate(self.pacman_positions):
+            if pos in ghosts:
+                self.catch(index)
+
+    def catch(self, index):
+        """PacmanGame's catch for Pacman index: the time penalty and back to its start, a ghost standing there to its own"""
+        self.charge_catch()
+        start = self.pacman_starts[index]
+        self.pacman_positions[index] = start
+        self.pacman_waits[index] = 0
+        for ghost_index, ghost in enumerate(self.ghost_positions):
+            if ghost == start:
+                self.ghost_positions[ghost_index] = self.ghost_starts[ghost_index]
+
+def run_multi_agent(maze=None, pacmen=4, ghosts=8, seed=None, batched=True, max_ticks=10000):
+    """Play a multi-agent game until the food is gone or max_ticks, returns its metrics"""
+    game = MultiAgentGame(maze, pacmen, ghosts, seed, batched)
+    started = time.perf_counter()
+    while not game.game_completed and game.tick < max_ticks:
+        game.auto_play_step()
+    wall_time = time.perf_counter() - started
+    return {
+        'batched': batched,
+        'completed': game.game_completed,
+        'ticks': game.tick,
+        'time': game.elapsed_time(),
+        'score': game.score,
+        'caught': game.pacman_caught_count,
+        'penalty': game.time_penalty,
+        'food_left': len(game.food_positions),
+        'searches': game.search_count,
+        'wall_time': wall_time,
+        'ms_per_tick': wall_time * 1000 / game.tick if game.tick else 0.0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress test of many Pacmen and ghosts with batched pathfinding")
+    parser.add_argument('--maze', default='gen:braid:101x101:0', help="'classic', gen:<style>:<rows>x<cols>:<seed>[:<slow share>] or a maze file path")
+    parser.add_argument('--pacmen', type=int, default=20)
+    parser.add_argument('--ghosts', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--ticks', type=int, default=300, help="Tick limit per run")
+    parser.add_argument('--naive', action='store_true', help="Also run with one search per agent per move")
+    args = parser.parse_args()
+
+    modes = (True, False) if args.naive else (True,)
+    for batched in modes:
+        result = run_multi_agent(load_benchmark_maze(args.maze), args.pacmen, args.ghosts, args.seed, batched, args.ticks)
+        print(f"{'batched' if batched else 'naive':>7}: {result['ticks']} ticks, {result['ms_per_tick']:.2f} ms/tick, "
+              f"{result['searches'] / result['ticks']:.1f} searches/tick, "
+              f"{result['food_left']} food left, caught {result['caught']}")
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,11 @@
-import pygame
 import sys
-import time
-import random # Added for ghost's random move if stuck
-from algorithm import PathfindingAlgorithms
-
-# Initialize pygame
-pygame.init()
+import game_core
+from game_core import GameState, MENU_ALGORITHMS
+from maze import load_maze
 
 # Constants
 WIDTH, HEIGHT = 600, 700
 GRID_SIZE = 30
-ROWS, COLS = 20, 20
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 YELLOW = (255, 255, 0)
@@ -20,135 +15,55 @@ RED = (255, 0, 0)
 PURPLE = (128, 0, 128)
 ORANGE = (255, 165, 0)
 PINK = (255, 182, 193)  # Ghost color
-GHOST_PENALTY_TIME = 5  # Seconds added to timer if caught
-
-# Set up the display
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Pacman Algorithm Comparison with Ghost") # Updated Caption
-clock = pygame.time.Clock()
-font = pygame.font.SysFont('Arial', 20)
-big_font = pygame.font.SysFont('Arial', 32)
-
-class GameState:
-    MENU = "menu"
-    PLAYING = "playing"
-    FINISHED = "finished" # This state might be implicitly handled by game_completed flag
-    RESULTS = "results"
-
-class PacmanGame:
-    def __init__(self):
-        self.grid = []
-        self.pacman_pos = None
-        self.food_positions = set()
-        self.original_food_positions = set()
-        self.score = 0
-        self.start_time = None
-        self.end_time = None
-        self.game_completed = False
-        self.pathfinder = None
-        self.current_algorithm = None
-        self.state = GameState.MENU
-        self.results = {}  # Store results for each algorithm
-        self.tested_algorithms = set()
-
-        # Ghost attributes
-        self.ghost_pos = None
-        self.initial_ghost_pos = (ROWS - 2, COLS - 2) 
-        self.ghost_move_interval = 0.3  # Seconds, ghost moves
-        self.ghost_last_move_time = 0
-        self.pacman_caught_count = 0
-        self.time_penalty = 0 # Total time penalty from being caught in current run
-
-        self.current_path_to_food = [] # Pacman's current path
-
-        self.create_grid()
-        self.pathfinder = PathfindingAlgorithms(self.grid)
-
-    def create_grid(self):
-        """Create the maze layout"""
-        maze = [
-            [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 1, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1],
-            [1, 0, 1, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1],
-            [1, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1],
-            [1, 1, 1, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 1, 1, 1, 1],
-            [1, 1, 1, 1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1, 1, 1, 1, 1],
-            [1, 0, 0, 0, 0, 0, 0, 1, 1, 0, 1, 1, 0, 0, 0, 0, 0, 0, 0, 1], # Pacman at (1,1)
-            [1, 0, 1, 1, 0, 1, 0, 1, 0, 0, 0, 1, 0, 1, 0, 1, 1, 1, 0, 1],
-            [1, 0, 0, 1, 0, 1, 0, 1, 1, 1, 1, 1, 0, 1, 0, 1, 0, 0, 0, 1],
-            [1, 1, 0, 1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1, 0, 1, 1, 1],
-            [1, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 1, 1, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 1, 1, 1, 0, 1],
-            [1, 0, 0, 0, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 0, 0, 0, 0, 1],
-            [1, 0, 1, 1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1, 1, 1, 0, 1],
-            [1, 0, 1, 1, 0, 1, 0, 1, 1, 0, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1], # Ghost near (18,18) -> (ROWS-2, COLS-2)
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-        ]
-        self.grid = maze
-        self.food_positions.clear()
-        for r in range(ROWS):
-            for c in range(COLS):
-                if self.grid[r][c] == 0:
-                    self.food_positions.add((r, c))
-        
-        self.original_food_positions = self.food_positions.copy()
-        self.pacman_pos = (1, 1)
-        self.food_positions.discard(self.pacman_pos)
-        self.original_food_positions.discard(self.pacman_pos)
-
-        # Initialize ghost position safely
-        self.ghost_pos = self.initial_ghost_pos
-        if self.grid[self.ghost_pos[0]][self.ghost_pos[1]] == 1 or self.ghost_pos == self.pacman_pos:
-            found_valid_ghost_start = False
-            for r_idx in range(ROWS - 2, 0, -1):
-                for c_idx in range(COLS - 2, 0, -1):
-                    if self.grid[r_idx][c_idx] == 0 and (r_idx, c_idx) != self.pacman_pos:
-                        self.ghost_pos = (r_idx, c_idx)
-                        found_valid_ghost_start = True
-                        break
-                if found_valid_ghost_start:
-                    break
-            if not found_valid_ghost_start: # Fallback if no good spot found (should not happen in this map)
-                 self.ghost_pos = (ROWS - 2, 1) if self.grid[ROWS-2][1] == 0 else (1, COLS-2)
-
-
-        self.food_positions.discard(self.ghost_pos) # Ghost doesn't sit on food
-        self.original_food_positions.discard(self.ghost_pos)
-
-    def reset_game(self):
-        self.food_positions = self.original_food_positions.copy()
-        self.pacman_pos = (1, 1)
-        
-        # Reset ghost position safely
-        self.ghost_pos = self.initial_ghost_pos
-        if self.grid[self.ghost_pos[0]][self.ghost_pos[1]] == 1 or self.ghost_pos == self.pacman_pos:
-            found_valid_ghost_start = False
-            for r_idx in range(ROWS - 2, 0, -1):
-                for c_idx in range(COLS - 2, 0, -1):
-                    if self.grid[r_idx][c_idx] == 0 and (r_idx, c_idx) != self.pacman_pos:
-                        self.ghost_pos = (r_idx, c_idx)
-                        found_valid_ghost_start = True
-                        break
-                if found_valid_ghost_start:
-                    break
-            if not found_valid_ghost_start:
-                 self.ghost_pos = (ROWS - 2, 1) if self.grid[ROWS-2][1] == 0 and (ROWS-2,1) != self.pacman_pos else (1, COLS-2)
-
-
-        self.score = 0
-        self.start_time = None
-        self.end_time = None
-        self.game_completed = False
-        self.pacman_caught_count = 0
-        self.time_penalty = 0
-        self.current_path_to_food = []
-        self.ghost_last_move_time = 0
+MUD = (70, 45, 20)  # Slow tiles
+TEXT_CACHE_SIZE = 256
+CAUGHT_PAUSE_FRAMES = 5  # Frames the game holds still after a catch, half a second at 10 FPS
+
+# pygame and the display are set up by load_pygame when the first renderer is created,
+# so importing this module stays cheap and works without a display (asyncio is deferred to run too)
+pygame = None
+screen = None
+font = None
+big_font = None
+HUD_RECT = None  # Status text, drawn over the bottom board rows
+
+def load_pygame():
+    """Import and initialize pygame and load the fonts, once"""
+    global pygame, font, big_font
+    if pygame is not None:
+        return
+    import pygame as pygame_module
+    pygame = pygame_module
+    pygame.init()
+    font = pygame.font.SysFont('Arial', 20)
+    big_font = pygame.font.SysFont('Arial', 32)
+
+def resize_display(rows, cols):
+    """Fit the window to a loaded maze: the board plus the 100 px strip below it, never smaller than the default"""
+    global WIDTH, HEIGHT, HUD_RECT, screen
+    WIDTH = max(600, cols * GRID_SIZE)
+    HEIGHT = max(700, rows * GRID_SIZE + 100)
+    HUD_RECT = pygame.Rect(0, HEIGHT - 160, WIDTH, 160)
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Pacman Algorithm Comparison with Ghost") # Updated Caption
+
+class PacmanGame(game_core.PacmanGame):
+    """The headless game from game_core with pygame rendering on top, opens the window when created"""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        load_pygame()
+        resize_display(self.rows, self.cols)
+        self.background = None  # Static maze surface, built on the first draw_game
+        self.text_cache = {}
+        # What is currently on screen, so draw_game knows which cells to repaint
+        self.board_drawn = False
+        self.drawn_pacman_pos = None
+        self.drawn_ghost_pos = None
+        self.drawn_food_count = 0
+        self.pause_frames = 0  # Frames left of the pause after a catch, see run
 
     def draw_menu(self):
+        self.board_drawn = False
         screen.fill(BLACK)
         title = big_font.render("Choose Pathfinding Algorithm", True, WHITE)
         title_rect = title.get_rect(center=(WIDTH // 2, 100))
@@ -157,10 +72,13 @@ class PacmanGame:
         algorithms = [
             ("1. BFS (Breadth-First Search)", BLUE),
             ("2. Dijkstra's Algorithm", RED),
-            ("3. A* (A-Star Search)", GREEN)
+            ("3. A* (A-Star Search)", GREEN),
+            ("4. JPS (Jump Point Search)", PURPLE),
+            ("5. Tour (planned pellet order)", ORANGE),
+            ("6. Lookahead (searches the ghost's replies)", PINK)
         ]
         for i, (text, color) in enumerate(algorithms):
-            algo_key = ['bfs', 'dijkstra', 'astar'][i]
+            algo_key = MENU_ALGORITHMS[i]
             if algo_key in self.tested_algorithms:
                 text += " - COMPLETED"
                 # Try to show time if available
@@ -171,79 +89,143 @@ class PacmanGame:
             algo_text = font.render(text, True, color)
             screen.blit(algo_text, (WIDTH // 2 - 200, 200 + i * 50)) # Adjusted x for longer text
         
-        instruction_text = "Press number to test. Ghost is active!" if len(self.tested_algorithms) == 0 else f"Test remaining algorithms ({3-len(self.tested_algorithms)} left). Ghost active!"
+        instruction_text = "Press number to test. Ghost is active!" if len(self.tested_algorithms) == 0 else f"Test remaining algorithms ({len(MENU_ALGORITHMS)-len(self.tested_algorithms)} left). Ghost active!"
         instruction = font.render(instruction_text, True, WHITE)
-        instruction_rect = instruction.get_rect(center=(WIDTH // 2, 400))
+        instruction_rect = instruction.get_rect(center=(WIDTH // 2, 250 + len(algorithms) * 50))
         screen.blit(instruction, instruction_rect)
         
         if self.tested_algorithms:
-            tested_text = font.render(f"Algorithms tested: {len(self.tested_algorithms)}/3", True, YELLOW)
-            tested_rect = tested_text.get_rect(center=(WIDTH // 2, 450))
+            tested_text = font.render(f"Algorithms tested: {len(self.tested_algorithms)}/{len(MENU_ALGORITHMS)}", True, YELLOW)
+            tested_rect = tested_text.get_rect(center=(WIDTH // 2, 300 + len(algorithms) * 50))
             screen.blit(tested_text, tested_rect)
         pygame.display.flip()
 
-    def draw_game(self):
-        screen.fill(BLACK)
-        for r in range(ROWS):
-            for c in range(COLS):
+    def build_background(self):
+        """Pre-bake the static maze (walls and slow tiles) into an off-screen surface"""
+        self.background = pygame.Surface((WIDTH, HEIGHT))
+        self.background.fill(BLACK)
+        for r in range(self.rows):
+            for c in range(self.cols):
                 if self.grid[r][c] == 1:
-                    pygame.draw.rect(screen, BLUE, (c * GRID_SIZE, r * GRID_SIZE, GRID_SIZE, GRID_SIZE))
-        
+                    pygame.draw.rect(self.background, BLUE, (c * GRID_SIZE, r * GRID_SIZE, GRID_SIZE, GRID_SIZE))
+                elif self.grid[r][c] > 1:
+                    pygame.draw.rect(self.background, MUD, (c * GRID_SIZE, r * GRID_SIZE, GRID_SIZE, GRID_SIZE))
+
+    def render_text(self, text, color, text_font=None):
+        """font.render with a cache of the resulting surfaces, keyed by string"""
+        text_font = text_font or font
+        key = (text, color, text_font)
+        surface = self.text_cache.get(key)
+        if surface is None:
+            if len(self.text_cache) > TEXT_CACHE_SIZE:
+                self.text_cache.clear()  # Changing strings like the timer would grow it forever
+            surface = self.text_cache[key] = text_font.render(text, True, color)
+        return surface
+
+    def cell_rect(self, pos):
+        return pygame.Rect(pos[1] * GRID_SIZE, pos[0] * GRID_SIZE, GRID_SIZE, GRID_SIZE)
+
+    def draw_pacman(self):
+        pygame.draw.circle(screen, YELLOW, (self.pacman_pos[1] * GRID_SIZE + GRID_SIZE // 2, self.pacman_pos[0] * GRID_SIZE + GRID_SIZE // 2), GRID_SIZE // 2)
+
+    def draw_ghost(self):
+        pygame.draw.circle(screen, PINK, (self.ghost_pos[1] * GRID_SIZE + GRID_SIZE // 2, self.ghost_pos[0] * GRID_SIZE + GRID_SIZE // 2), GRID_SIZE // 2 - 1)
+        # Simple eyes for ghost
+        eye_r = GRID_SIZE // 8
+        eye_offset_x = GRID_SIZE // 5
+        pupil_r = GRID_SIZE // 12
+        pygame.draw.circle(screen, WHITE, (self.ghost_pos[1] * GRID_SIZE + GRID_SIZE // 2 - eye_offset_x, self.ghost_pos[0] * GRID_SIZE + GRID_SIZE // 2 - eye_offset_x//2), eye_r)
+        pygame.draw.circle(screen, WHITE, (self.ghost_pos[1] * GRID_SIZE + GRID_SIZE // 2 + eye_offset_x, self.ghost_pos[0] * GRID_SIZE + GRID_SIZE // 2 - eye_offset_x//2), eye_r)
+        pygame.draw.circle(screen, BLACK, (self.ghost_pos[1] * GRID_SIZE + GRID_SIZE // 2 - eye_offset_x, self.ghost_pos[0] * GRID_SIZE + GRID_SIZE // 2 - eye_offset_x//2), pupil_r)
+        pygame.draw.circle(screen, BLACK, (self.ghost_pos[1] * GRID_SIZE + GRID_SIZE // 2 + eye_offset_x, self.ghost_pos[0] * GRID_SIZE + GRID_SIZE // 2 - eye_offset_x//2), pupil_r)
+
+    def draw_cell(self, pos):
+        """Restore one cell from the background and draw whatever is on it now"""
+        rect = self.cell_rect(pos)
+        screen.blit(self.background, rect, rect)
+        if pos in self.food_positions:
+            pygame.draw.circle(screen, WHITE, (pos[1] * GRID_SIZE + GRID_SIZE // 2, pos[0] * GRID_SIZE + GRID_SIZE // 2), GRID_SIZE // 8)
+        if pos == self.pacman_pos:
+            self.draw_pacman()
+        if pos == self.ghost_pos:
+            self.draw_ghost()
+        return rect
+
+    def draw_board(self):
+        """Full repaint of the board, only needed when a run starts or food is reset"""
+        screen.blit(self.background, (0, 0))
         for food in self.food_positions:
             pygame.draw.circle(screen, WHITE, (food[1] * GRID_SIZE + GRID_SIZE // 2, food[0] * GRID_SIZE + GRID_SIZE // 2), GRID_SIZE // 8)
-        
-        pygame.draw.circle(screen, YELLOW, (self.pacman_pos[1] * GRID_SIZE + GRID_SIZE // 2, self.pacman_pos[0] * GRID_SIZE + GRID_SIZE // 2), GRID_SIZE // 2)
-        
-        # Draw Ghost
+        self.draw_pacman()
         if self.ghost_pos:
-            pygame.draw.circle(screen, PINK, (self.ghost_pos[1] * GRID_SIZE + GRID_SIZE // 2, self.ghost_pos[0] * GRID_SIZE + GRID_SIZE // 2), GRID_SIZE // 2 - 1)
-            # Simple eyes for ghost
-            eye_r = GRID_SIZE // 8
-            eye_offset_x = GRID_SIZE // 5
-            pupil_r = GRID_SIZE // 12
-            pygame.draw.circle(screen, WHITE, (self.ghost_pos[1] * GRID_SIZE + GRID_SIZE // 2 - eye_offset_x, self.ghost_pos[0] * GRID_SIZE + GRID_SIZE // 2 - eye_offset_x//2), eye_r)
-            pygame.draw.circle(screen, WHITE, (self.ghost_pos[1] * GRID_SIZE + GRID_SIZE // 2 + eye_offset_x, self.ghost_pos[0] * GRID_SIZE + GRID_SIZE // 2 - eye_offset_x//2), eye_r)
-            pygame.draw.circle(screen, BLACK, (self.ghost_pos[1] * GRID_SIZE + GRID_SIZE // 2 - eye_offset_x, self.ghost_pos[0] * GRID_SIZE + GRID_SIZE // 2 - eye_offset_x//2), pupil_r)
-            pygame.draw.circle(screen, BLACK, (self.ghost_pos[1] * GRID_SIZE + GRID_SIZE // 2 + eye_offset_x, self.ghost_pos[0] * GRID_SIZE + GRID_SIZE // 2 - eye_offset_x//2), pupil_r)
+            self.draw_ghost()
 
+    def draw_hud(self):
+        """Redraw the status text area, which overlaps the bottom rows of the board"""
+        screen.blit(self.background, HUD_RECT, HUD_RECT)
+        first_row = HUD_RECT.top // GRID_SIZE
+        for r in range(first_row, self.rows):
+            for c in range(self.cols):
+                if (r, c) in self.food_positions or (r, c) == self.pacman_pos or (r, c) == self.ghost_pos:
+                    self.draw_cell((r, c))
 
         algo_name_disp = self.current_algorithm.upper() if self.current_algorithm else "N/A"
         if algo_name_disp == 'DIJKSTRA': algo_name_disp = "DIJKSTRA'S"
-        algo_text = font.render(f'Algorithm: {algo_name_disp}', True, WHITE)
-        screen.blit(algo_text, (10, HEIGHT - 160)) # Adjusted Y position
-
-        score_text = font.render(f'Score: {self.score}', True, WHITE)
-        screen.blit(score_text, (10, HEIGHT - 140))
-
-        food_text = font.render(f'Food Left: {len(self.food_positions)}', True, WHITE)
-        screen.blit(food_text, (10, HEIGHT - 120))
+        screen.blit(self.render_text(f'Algorithm: {algo_name_disp}', WHITE), (10, HEIGHT - 160)) # Adjusted Y position
+        screen.blit(self.render_text(f'Score: {self.score}', WHITE), (10, HEIGHT - 140))
+        screen.blit(self.render_text(f'Food Left: {len(self.food_positions)}', WHITE), (10, HEIGHT - 120))
         
         caught_info_text = f'Caught: {self.pacman_caught_count} | Penalty: {self.time_penalty:.2f}s'
-        caught_text = font.render(caught_info_text, True, RED)
-        screen.blit(caught_text, (10, HEIGHT - 100))
+        screen.blit(self.render_text(caught_info_text, RED), (10, HEIGHT - 100))
 
-        if self.start_time:
-            current_total_time = (time.time() - self.start_time) + self.time_penalty
-            if self.game_completed and self.end_time:
-                current_total_time = (self.end_time - self.start_time) + self.time_penalty
+        if self.start_time is not None:
+            current_total_time = self.elapsed_time()
+            if self.game_completed and self.end_time is not None:
                 time_disp_text = f'Final Time: {current_total_time:.2f}s'
                 time_color = GREEN
             else:
                 time_disp_text = f'Time: {current_total_time:.2f}s'
                 time_color = WHITE
-            time_text_surf = font.render(time_disp_text, True, time_color)
-            screen.blit(time_text_surf, (10, HEIGHT - 80))
+            screen.blit(self.render_text(time_disp_text, time_color), (10, HEIGHT - 80))
         
         if self.game_completed:
-            completion_text = font.render('Algorithm Run Complete!', True, GREEN) # Changed text
+            completion_text = self.render_text('Algorithm Run Complete!', GREEN) # Changed text
             text_rect = completion_text.get_rect(center=(WIDTH // 2, HEIGHT - 40))
             screen.blit(completion_text, text_rect)
-            continue_text = font.render('Press SPACE for Menu / Results', True, WHITE) # Changed text
+            continue_text = self.render_text('Press SPACE for Menu / Results', WHITE) # Changed text
             continue_rect = continue_text.get_rect(center=(WIDTH // 2, HEIGHT - 20))
             screen.blit(continue_text, continue_rect)
-        pygame.display.flip()
+        return HUD_RECT
+
+    def draw_game(self):
+        """
+        Dirty-rect render: after the first full paint only the cells Pacman and the ghost
+        left or entered (which covers eaten pellets) and the HUD are redrawn and pushed
+        to the display with display.update
+        """
+        if self.background is None:
+            self.build_background()
+
+        if not self.board_drawn or len(self.food_positions) > self.drawn_food_count:
+            self.draw_board()
+            self.draw_hud()
+            pygame.display.flip()
+        else:
+            dirty_cells = {self.drawn_pacman_pos, self.pacman_pos}
+            if self.ghost_pos:
+                dirty_cells.update((self.drawn_ghost_pos, self.ghost_pos))
+            dirty_cells.discard(None)
+            dirty_rects = [self.draw_cell(pos) for pos in dirty_cells]
+            dirty_rects.append(self.draw_hud())
+            pygame.display.update(dirty_rects)
+
+        self.board_drawn = True
+        self.drawn_pacman_pos = self.pacman_pos
+        self.drawn_ghost_pos = self.ghost_pos
+        self.drawn_food_count = len(self.food_positions)
 
     def draw_results(self):
+        self.board_drawn = False
         screen.fill(BLACK)
         title = big_font.render("Algorithm Performance Results", True, WHITE)
         title_rect = title.get_rect(center=(WIDTH // 2, 50))
@@ -251,6 +233,7 @@ class PacmanGame:
         
         sorted_results_list = sorted(self.results.items(), key=lambda x: x[1])
         rank_colors = [GREEN, YELLOW, ORANGE] 
+        search_summary = self.search_stats.summary()
         
         y_pos = 150
         for i, (algo, time_val) in enumerate(sorted_results_list):
@@ -267,15 +250,25 @@ class PacmanGame:
             
             result_surface = font.render(rank_text_content, True, color)
             screen.blit(result_surface, (WIDTH // 2 - 200, y_pos)) # Adjusted x
+
+            algo_stats = search_summary.get(algo)
+            if algo_stats:
+                stats_text = (f"   {algo_stats['calls']} searches, {algo_stats['mean_nodes_expanded']:.0f} nodes/search, "
+                              f"{algo_stats['mean_duration_ns'] / 1000:.0f} us/search")
+                stats_surface = font.render(stats_text, True, WHITE)
+                screen.blit(stats_surface, (WIDTH // 2 - 200, y_pos + 22))
             
             desc = ""
             if rank == 1: desc = "🏆 FASTEST"
             elif rank == 2: desc = "🥈 SECOND"
             elif rank == 3: desc = "🥉 THIRD"
+            elif rank == 4: desc = "FOURTH"
+            elif rank == 5: desc = "FIFTH"
+            elif rank == 6: desc = "SIXTH"
             if desc:
                 desc_surface = font.render(desc, True, color)
                 screen.blit(desc_surface, (WIDTH // 2 + 150, y_pos)) # Adjusted x
-            y_pos += 40
+            y_pos += 60
         
         analysis_y = y_pos + 30
         if sorted_results_list:
@@ -303,151 +296,32 @@ class PacmanGame:
         screen.blit(instruction, instruction_rect)
         pygame.display.flip()
 
-    def move_pacman(self, direction):
-        row, col = self.pacman_pos
-        new_pos = None
-        if direction == 'UP': new_pos = (row - 1, col)
-        elif direction == 'DOWN': new_pos = (row + 1, col)
-        elif direction == 'LEFT': new_pos = (row, col - 1)
-        elif direction == 'RIGHT': new_pos = (row, col + 1)
-        
-        # Pathfinding should ensure this move is valid regarding walls/ghost at planning time
-        # This basic check is for walls only when executing the move.
-        if new_pos and self.pathfinder.is_valid_move(new_pos, dynamic_obstacles=None): # Pacman doesn't self-sabotage with dynamic obstacles for its own move execution
-            self.pacman_pos = new_pos
-            if self.pacman_pos in self.food_positions:
-                self.food_positions.remove(self.pacman_pos)
-                self.score += 10
-            return True
-        return False
-
-    def move_ghost(self):
-        if not self.ghost_pos or self.game_completed:
-            return
-
-        now = time.time()
-        if now - self.ghost_last_move_time > self.ghost_move_interval:
-            self.ghost_last_move_time = now
-            # Ghost targets Pacman, does not consider itself an obstacle for its own path.
-            path_to_pacman = self.pathfinder.bfs(self.ghost_pos, self.pacman_pos, dynamic_obstacles=None)
-            
-            if path_to_pacman:
-                direction = path_to_pacman[0]
-                r, c = self.ghost_pos
-                next_ghost_pos = None
-                if direction == 'UP': next_ghost_pos = (r - 1, c)
-                elif direction == 'DOWN': next_ghost_pos = (r + 1, c)
-                elif direction == 'LEFT': next_ghost_pos = (r, c - 1)
-                elif direction == 'RIGHT': next_ghost_pos = (r, c + 1)
-
-                if next_ghost_pos and self.pathfinder.is_valid_move(next_ghost_pos): # Ghost can move if valid (not wall)
-                    self.ghost_pos = next_ghost_pos
-            else: # Ghost is stuck or Pacman is somehow unreachable by BFS (e.g. map error)
-                  # Try a random valid move to unstick itself
-                neighbors = self.pathfinder.get_neighbors(self.ghost_pos, dynamic_obstacles=None)
-                if neighbors:
-                    chosen_move_pos, _ = random.choice(neighbors)
-                    self.ghost_pos = chosen_move_pos
-    
     def handle_pacman_caught(self):
-        print(f"Pacman caught by ghost! Penalty +{GHOST_PENALTY_TIME}s.")
-        self.pacman_caught_count += 1
-        self.time_penalty += GHOST_PENALTY_TIME
-        self.pacman_pos = (1, 1) # Reset Pacman
-        
-        # Optionally reset ghost or move it away to give Pacman a fresh start
-        # self.ghost_pos = self.initial_ghost_pos 
-        # Ensure ghost is not on Pacman's reset spot
-        if self.ghost_pos == self.pacman_pos:
-            self.ghost_pos = self.initial_ghost_pos if self.initial_ghost_pos != self.pacman_pos else (ROWS -2, COLS -2)
-            # Further ensure new ghost_pos is valid
-            if self.grid[self.ghost_pos[0]][self.ghost_pos[1]] == 1 or self.ghost_pos == self.pacman_pos:
-                 self.ghost_pos = (1, COLS-2) # A fallback
-
-        self.current_path_to_food = [] # Force path recalculation
-        self.draw_game() # Show updated state
-        pygame.time.delay(500) # Brief pause to signify being caught
-
-    def auto_play_step(self):
-        if not self.start_time:
-            self.start_time = time.time()
-            self.ghost_last_move_time = self.start_time # Sync ghost's first potential move
-
-        if self.game_completed:
-            return
-
-        # 1. Ghost moves
-        self.move_ghost()
-
-        # 2. Check collision: Ghost moved onto Pacman
-        if self.pacman_pos == self.ghost_pos:
-            self.handle_pacman_caught()
-            return # End this step early as Pacman is reset
-
-        # 3. Pacman acts (if not caught above)
-        if self.food_positions:
-            recalculate_pacman_path = not self.current_path_to_food
-            if self.current_path_to_food: # Check if current path is still valid (e.g. ghost moved into it)
-                next_step_dir = self.current_path_to_food[0]
-                r, c = self.pacman_pos
-                potential_next_pac_pos = None
-                if next_step_dir == 'UP': potential_next_pac_pos = (r - 1, c)
-                elif next_step_dir == 'DOWN': potential_next_pac_pos = (r + 1, c)
-                elif next_step_dir == 'LEFT': potential_next_pac_pos = (r, c - 1)
-                elif next_step_dir == 'RIGHT': potential_next_pac_pos = (r, c + 1)
-                
-                if potential_next_pac_pos == self.ghost_pos: # Pacman's next step is where ghost is NOW
-                    recalculate_pacman_path = True
-
-            if recalculate_pacman_path:
-                # Pacman plans path to food, avoiding current ghost position
-                closest_food_pos, path_to_food = self.pathfinder.find_closest_target(
-                    self.pacman_pos, list(self.food_positions), self.current_algorithm,
-                    dynamic_obstacles={self.ghost_pos} # Pacman avoids the ghost
-                )
-                self.current_path_to_food = path_to_food
-            
-            if self.current_path_to_food:
-                direction_to_move = self.current_path_to_food.pop(0)
-                self.move_pacman(direction_to_move)
-
-                # 4. Check collision: Pacman moved onto Ghost
-                if self.pacman_pos == self.ghost_pos:
-                    self.handle_pacman_caught()
-                    return # End this step early
-        
-        # 5. Check game completion (all food eaten)
-        if not self.food_positions and not self.game_completed:
-            self.game_completed = True
-            self.end_time = time.time()
-            final_run_time = (self.end_time - self.start_time) + self.time_penalty
-            self.results[self.current_algorithm] = final_run_time # Store total time including penalties
-            self.tested_algorithms.add(self.current_algorithm)
-            
-            algo_disp_name = self.current_algorithm.upper()
-            if algo_disp_name == 'DIJKSTRA': algo_disp_name = "DIJKSTRA'S"
-            
-            print(f"{algo_disp_name} completed in {final_run_time:.2f}s (Score: {self.score}, Caught: {self.pacman_caught_count}, Penalty: {self.time_penalty:.2f}s).")
-
-    def select_algorithm(self, choice):
-        algorithms_map = {1: 'bfs', 2: 'dijkstra', 3: 'astar'}
-        if choice in algorithms_map:
-            selected_algo_key = algorithms_map[choice]
-            if selected_algo_key not in self.tested_algorithms:
-                self.current_algorithm = selected_algo_key
-                self.reset_game() # Reset for the new algorithm test
-                self.state = GameState.PLAYING
-                return True
-        return False
-
-def main():
-    game = PacmanGame()
+        super().handle_pacman_caught()
+        # Brief pause to signify being caught; run skips the ticks, while input, drawing and plans go on
+        self.pause_frames = CAUGHT_PAUSE_FRAMES
+
+async def run(maze_path=None, use_processes=False, record_prefix=None, avoidance='ghost_cell'):
+    """
+    Frame loop on asyncio: input, one game tick and drawing per frame, then the rest of the
+    frame is awaited, which is when plans from the background planner are delivered
+    With record_prefix every run is saved as <record_prefix>-<algorithm>.replay
+    """
+    import asyncio  # Imported here with the planner, they take longer to load than the game core
+    from async_planner import AsyncPlanner
+    from replay import ReplayRecorder
+    maze = load_maze(maze_path) if maze_path else None
+    game = PacmanGame(maze=maze, avoidance=avoidance)
+    game.planner = AsyncPlanner(game.grid, use_processes)
+    loop = asyncio.get_running_loop()
+    frame_time = 1 / game_core.TICK_RATE
     running = True
     print("Pacman Algorithm Comparison")
-    print("Test BFS, Dijkstra's, and A* algorithms. Pacman will try to dodge the ghost.")
+    print("Test BFS, Dijkstra's, A*, JPS, the tour planner and the lookahead search. Pacman will try to dodge the ghost.")
     print("Collisions with the ghost incur a time penalty.")
 
     while running:
+        frame_started = loop.time()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
@@ -456,15 +330,20 @@ def main():
                     if event.key == pygame.K_1: game.select_algorithm(1)
                     elif event.key == pygame.K_2: game.select_algorithm(2)
                     elif event.key == pygame.K_3: game.select_algorithm(3)
+                    elif event.key == pygame.K_4: game.select_algorithm(4)
+                    elif event.key == pygame.K_5: game.select_algorithm(5)
+                    elif event.key == pygame.K_6: game.select_algorithm(6)
                 elif game.state == GameState.PLAYING and game.game_completed:
                     if event.key == pygame.K_SPACE:
-                        if len(game.tested_algorithms) == 3: # All algorithms tested
+                        if len(game.tested_algorithms) == len(MENU_ALGORITHMS): # All algorithms tested
                             game.state = GameState.RESULTS
                         else:
                             game.state = GameState.MENU # Go back to menu for next selection
                 elif game.state == GameState.RESULTS:
                     if event.key == pygame.K_r: # Restart all tests
-                        game = PacmanGame() # Re-initialize the game object fully
+                        game.planner.close()
+                        game = PacmanGame(maze=maze, avoidance=avoidance) # Re-initialize the game object fully
+                        game.planner = AsyncPlanner(game.grid, use_processes)
                         game.state = GameState.MENU # Start from menu
                     elif event.key == pygame.K_q:
                         running = False
@@ -472,16 +351,39 @@ def main():
         if game.state == GameState.MENU:
             game.draw_menu()
         elif game.state == GameState.PLAYING:
-            if not game.game_completed:
+            if game.pause_frames > 0:
+                game.pause_frames -= 1
+            elif not game.game_completed:
+                if record_prefix and game.recorder is None and game.tick == 0:
+                    ReplayRecorder(game) # Each run gets its own log, started before its first tick
                 game.auto_play_step()
+                if game.game_completed and game.recorder is not None:
+                    game.recorder.save(f"{record_prefix}-{game.current_algorithm}.replay")
+                    game.recorder = None
             game.draw_game() # Draw regardless of completion to show final state / "Press SPACE"
         elif game.state == GameState.RESULTS:
             game.draw_results()
-        
-        clock.tick(10) # 10 FPS
 
-    pygame.quit()
+        # 10 FPS; searches finish on the planner while this frame waits
+        await asyncio.sleep(max(0.0, frame_time - (loop.time() - frame_started)))
+
+    game.planner.close()
+    if game.recorder is not None: # Quit mid-run, keep what was played
+        game.recorder.save(f"{record_prefix}-{game.current_algorithm}.replay")
+
+def main(maze_path=None, use_processes=False, record_prefix=None, avoidance='ghost_cell'):
+    import asyncio
+    asyncio.run(run(maze_path, use_processes, record_prefix, avoidance))
+    if pygame is not None:
+        pygame.quit()
     sys.exit()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="Pacman pathfinding algorithm comparison")
+    parser.add_argument('maze', nargs='?', help="Maze file, the built-in layout by default")
+    parser.add_argument('--processes', action='store_true', help="Plan in a worker process instead of a thread")
+    parser.add_argument('--record', metavar='PREFIX', help="Save every run as PREFIX-<algorithm>.replay")
+    parser.add_argument('--threat', action='store_true', help="Keep Pacman out of every cell the ghost reaches first")
+    args = parser.parse_args()
+    main(args.maze, args.processes, args.record, 'threat' if args.threat else 'ghost_cell')
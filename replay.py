@@ -0,0 +1,260 @@
+import argparse
+import struct
+import time
+from array import array
+from algorithm import DIRECTION_CODES
+from game_core import GHOST_PENALTY_TIME, LOOKAHEAD_NODE_BUDGET, TOUR_MOVE_BUDGETS, GameState, PacmanGame
+
+# File layout: HEADER, the algorithm name, the grid (one byte per cell), the food at the start
+# (one bit per cell, row-major), then one tick record after another up to the end of the file
+HEADER = struct.Struct('<4sBqHHHHHHB')  # magic, flags, seed, rows, cols, Pacman start, ghost start, name length
+MAGIC = b'PRP1'
+HAS_SEED = 1  # Header flag, the run had an integer seed
+# Tick record: one byte, bits 0-2 Pacman's direction code and bits 3-5 the ghost's (0 = no move),
+# bit 6 set when Pacman searched, bit 7 on a catch, which is followed by CATCH: the ghost's cell after it
+DIRECTION_MASK = 0x07
+GHOST_SHIFT = 3
+SEARCH_BIT = 0x40
+CATCH_BIT = 0x80
+CATCH = struct.Struct('<HH')
+STEP_CODES = {(-1, 0): 1, (1, 0): 2, (0, -1): 3, (0, 1): 4}  # (row step, col step) -> direction code
+CODE_STEPS = {code: step for step, code in STEP_CODES.items()}
+SNAPSHOT_INTERVAL = 256  # Ticks between the player's snapshots, the most a seek replays
+
+class ReplayRecorder:
+    """
+    Records a PacmanGame run as a compact binary event log
+    Attach it right after reset_game: the game reports Pacman's moves and the end of every
+    tick, and each tick becomes one byte (plus four after a catch). Moves are logged, not
+    re-derived, so a run with a background planner replays exactly too.
+    """
+    def __init__(self, game):
+        self.game = game
+        self.data = bytearray(self.header())
+        self.pacman_code = 0  # Direction code of Pacman's move this tick
+        self.ghost_pos = game.ghost_pos
+        self.search_count = game.search_count
+        self.caught = game.pacman_caught_count
+        game.recorder = self
+
+    def header(self):
+        game = self.game
+        seed = game.seed if isinstance(game.seed, int) else 0
+        flags = HAS_SEED if isinstance(game.seed, int) else 0
+        name = game.current_algorithm.encode()
+        cells = bytes(game.grid[r][c] for r in range(game.rows) for c in range(game.cols))
+        food = bytearray((game.rows * game.cols + 7) // 8)
+        for r, c in game.food_positions:
+            cell = r * game.cols + c
+            food[cell >> 3] |= 1 << (cell & 7)
+        return (HEADER.pack(MAGIC, flags, seed, game.rows, game.cols, *game.pacman_pos, *game.ghost_pos, len(name))
+                + name + cells + food)
+
+    def pacman_moved(self, direction):
+        self.pacman_code = DIRECTION_CODES[direction]
+
+    def end_tick(self):
+        game = self.game
+        record = self.pacman_code
+        if game.search_count != self.search_count:
+            record |= SEARCH_BIT
+        if game.pacman_caught_count != self.caught:
+            self.data.append(record | CATCH_BIT)
+            self.data += CATCH.pack(*game.ghost_pos) # The catch may move the ghost off Pacman's start
+        else:
+            if game.ghost_pos != self.ghost_pos:
+                step = (game.ghost_pos[0] - self.ghost_pos[0], game.ghost_pos[1] - self.ghost_pos[1])
+                record |= STEP_CODES[step] << GHOST_SHIFT
+            self.data.append(record)
+        self.pacman_code = 0
+        self.ghost_pos = game.ghost_pos
+        self.search_count = game.search_count
+        self.caught = game.pacman_caught_count
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.data)
+
+class ReplayPlayer:
+    """
+    Plays a recorded run back into a PacmanGame without running any search
+    The game starts at tick 0; step applies one record, seek jumps to any tick by restoring
+    the last snapshot before it (one every SNAPSHOT_INTERVAL ticks, taken on the way) and
+    applying the records after it. game_class can be pacman.PacmanGame to draw the replay.
+    """
+    def __init__(self, data, game_class=PacmanGame):
+        magic, flags, seed, rows, cols, pac_r, pac_c, ghost_r, ghost_c, name_length = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("Not a Pacman replay")
+        offset = HEADER.size
+        self.algorithm = bytes(data[offset:offset + name_length]).decode()
+        offset += name_length
+        cells = data[offset:offset + rows * cols]
+        offset += rows * cols
+        food = data[offset:offset + (rows * cols + 7) // 8]
+        offset += len(food)
+
+        self.seed = seed if flags & HAS_SEED else None
+        grid = [list(cells[r * cols:(r + 1) * cols]) for r in range(rows)]
+        self.game = game_class(seed=self.seed, verbose=False, start_pos=(pac_r, pac_c), maze=grid)
+        self.game.current_algorithm = self.algorithm
+        self.game.reset_game()
+        self.game.state = GameState.PLAYING
+        self.game.ghost_pos = (ghost_r, ghost_c)
+        self.game.food_positions = {
+            divmod(cell, cols) for cell in range(rows * cols) if food[cell >> 3] >> (cell & 7) & 1
+        }
+        self.game.original_food_positions = set(self.game.food_positions)
+
+        self.data = data
+        self.offsets = array('I')  # offsets[t] = position of the record of tick t + 1
+        while offset < len(data):
+            self.offsets.append(offset)
+            offset += 1 + (CATCH.size if data[offset] & CATCH_BIT else 0)
+        self.snapshots = [self.snapshot()]  # snapshots[k] = state at tick k * SNAPSHOT_INTERVAL
+
+    @classmethod
+    def load(cls, path, game_class=PacmanGame):
+        with open(path, 'rb') as f:
+            return cls(f.read(), game_class)
+
+    @property
+    def ticks(self):
+        return len(self.offsets)
+
+    def snapshot(self):
+        game = self.game
+        return (game.tick, game.start_time, game.end_time, game.game_completed, game.pacman_pos, game.ghost_pos,
+                frozenset(game.food_positions), game.score, game.pacman_caught_count, game.time_penalty,
+                game.search_count)
+
+    def restore(self, snapshot):
+        game = self.game
+        (game.tick, game.start_time, game.end_time, game.game_completed, game.pacman_pos, game.ghost_pos,
+         food, game.score, game.pacman_caught_count, game.time_penalty, game.search_count) = snapshot
+        game.food_positions = set(food)
+
+    def step(self):
+        """Apply the next tick record, False once the replay is over"""
+        game = self.game
+        if game.tick >= self.ticks:
+            return False
+        offset = self.offsets[game.tick]
+        record = self.data[offset]
+        game.tick += 1
+        if game.start_time is None:
+            game.start_time = game.current_time()
+
+        ghost_code = (record >> GHOST_SHIFT) & DIRECTION_MASK
+        if ghost_code:
+            dr, dc = CODE_STEPS[ghost_code]
+            game.ghost_pos = (game.ghost_pos[0] + dr, game.ghost_pos[1] + dc)
+        pacman_code = record & DIRECTION_MASK
+        if pacman_code:
+            dr, dc = CODE_STEPS[pacman_code]
+            game.pacman_pos = (game.pacman_pos[0] + dr, game.pacman_pos[1] + dc)
+            if game.pacman_pos in game.food_positions:
+                game.food_positions.remove(game.pacman_pos)
+                game.score += 10
+        if record & SEARCH_BIT:
+            game.search_count += 1
+        if record & CATCH_BIT:
+            game.pacman_pos = game.start_pos
+            game.ghost_pos = CATCH.unpack_from(self.data, offset + 1)
+            game.pacman_caught_count += 1
+            game.time_penalty += GHOST_PENALTY_TIME
+        elif not game.food_positions and not game.game_completed: # A catch tick ends before the food check
+            game.game_completed = True
+            game.end_time = game.current_time()
+
+        if game.tick % SNAPSHOT_INTERVAL == 0 and game.tick // SNAPSHOT_INTERVAL == len(self.snapshots):
+            self.snapshots.append(self.snapshot())
+        return True
+
+    def seek(self, tick):
+        """Bring the game to the state after tick (clamped to the recording)"""
+        tick = max(0, min(tick, self.ticks))
+        index = min(tick // SNAPSHOT_INTERVAL, len(self.snapshots) - 1)
+        if not index * SNAPSHOT_INTERVAL <= self.game.tick <= tick:
+            self.restore(self.snapshots[index])
+        while self.game.tick < tick:
+            self.step()
+
+    def fast_forward(self):
+        """Apply every remaining record as fast as possible"""
+        while self.step():
+            pass
+
+def record_game(algorithm, seed=None, max_ticks=10000, start_pos=None, maze=None):
+    """Play a headless game like game_core.run_headless and return its recorder"""
+    game = PacmanGame(seed=seed, verbose=False, start_pos=start_pos, maze=maze)
+    game.lookahead_node_budget = LOOKAHEAD_NODE_BUDGET
+    game.tour_move_budgets = TOUR_MOVE_BUDGETS
+    game.current_algorithm = algorithm
+    game.reset_game()
+    game.state = GameState.PLAYING
+    recorder = ReplayRecorder(game)
+    while not game.game_completed and game.tick < max_ticks:
+        game.auto_play_step()
+    return recorder
+
+def view(player, start_tick, speed):
+    """Draw the replay from start_tick with the pygame renderer, speed ticks per frame"""
+    import pacman
+    pygame = pacman.pygame
+    player.seek(start_tick)
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_q):
+                running = False
+        for _ in range(speed):
+            player.step()
+        player.game.draw_game()
+        pygame.time.wait(1000 // 10)
+    pygame.quit()
+
+def main():
+    parser = argparse.ArgumentParser(description="Record a headless Pacman run, or inspect and replay a recording")
+    commands = parser.add_subparsers(dest='command', required=True)
+    record = commands.add_parser('record', help="Play a headless game and save its replay")
+    record.add_argument('path')
+    record.add_argument('--algorithm', default='bfs')
+    record.add_argument('--seed', type=int, default=0)
+    record.add_argument('--maze', help="Maze file, the built-in layout by default")
+    record.add_argument('--max-ticks', type=int, default=10000)
+    play = commands.add_parser('play', help="Seek a replay to a tick and print the state there")
+    play.add_argument('path')
+    play.add_argument('--tick', type=int, default=None, help="Tick to seek to, the end by default")
+    play.add_argument('--view', action='store_true', help="Draw the replay from --tick on with pygame")
+    play.add_argument('--speed', type=int, default=1, help="Ticks per frame when viewing")
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        maze = None
+        if args.maze:
+            from maze import load_maze
+            maze = load_maze(args.maze)
+        recorder = record_game(args.algorithm, args.seed, args.max_ticks, maze=maze)
+        recorder.save(args.path)
+        print(f"{recorder.game.tick} ticks, {len(recorder.data)} bytes written to {args.path}")
+        return
+
+    game_class = PacmanGame
+    if args.view:
+        import pacman
+        game_class = pacman.PacmanGame
+    started = time.perf_counter()
+    player = ReplayPlayer.load(args.path, game_class)
+    if args.view:
+        view(player, args.tick or 0, args.speed)
+        return
+    player.seek(player.ticks if args.tick is None else args.tick)
+    game = player.game
+    print(f"{player.algorithm} seed {player.seed}: tick {game.tick}/{player.ticks} reached in "
+          f"{(time.perf_counter() - started) * 1000:.1f} ms")
+    print(f"Pacman {game.pacman_pos}, ghost {game.ghost_pos}, score {game.score}, food left {len(game.food_positions)}, "
+          f"caught {game.pacman_caught_count}, searches {game.search_count}, time {game.elapsed_time():.2f}s")
+
+if __name__ == "__main__":
+    main()
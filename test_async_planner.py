@@ -0,0 +1,48 @@
+import asyncio
+import logging
+import async_planner
+from async_planner import AsyncPlanner
+from game_core import GameState, PacmanGame
+
+def failing_worker(*args):
+    raise RuntimeError("worker failed")
+
+async def play(game, max_ticks):
+    """Tick the game like pacman.run, letting the planner's results arrive between ticks"""
+    while not game.game_completed and game.tick < max_ticks:
+        game.auto_play_step()
+        await asyncio.sleep(0.001)
+    game.planner.close()
+
+def new_game(algorithm):
+    game = PacmanGame(seed=1, verbose=False)
+    game.current_algorithm = algorithm
+    game.reset_game()
+    game.state = GameState.PLAYING
+    game.planner = AsyncPlanner(game.grid)
+    return game
+
+def test_failed_search_falls_back_to_the_game_thread(monkeypatch, caplog):
+    monkeypatch.setattr(async_planner, 'run_search', failing_worker)
+    game = new_game('bfs')
+    with caplog.at_level(logging.ERROR, logger='async_planner'):
+        asyncio.run(play(game, 3000))
+    assert game.game_completed
+    assert not game.awaiting_plan
+    assert 'failed on the planner' in caplog.text
+
+def test_failed_tour_plan_falls_back_to_the_game_thread(monkeypatch, caplog):
+    monkeypatch.setattr(async_planner, 'run_tour_plan', failing_worker)
+    game = new_game('tour')
+    with caplog.at_level(logging.ERROR, logger='async_planner'):
+        asyncio.run(play(game, 3000))
+    assert game.game_completed
+    assert 'failed on the planner' in caplog.text
+
+def test_planner_that_refuses_work_does_not_stall_the_game(caplog):
+    game = new_game('bfs')
+    game.planner.executor.shutdown()  # Like a dead process pool, every submit raises
+    with caplog.at_level(logging.ERROR, logger='async_planner'):
+        asyncio.run(play(game, 3000))
+    assert game.game_completed
+    assert 'Could not queue' in caplog.text
@@ -0,0 +1,197 @@
+from array import array
+from time import perf_counter, perf_counter_ns
+from distance_cache import DistanceFieldCache
+
+class TourPlanner:
+    """
+    Orders every pellet into one tour instead of walking to the nearest pellet and searching again
+    The pellet-to-pellet distance matrix is read from wall-only BFS distance fields, one per
+    pellet, which never change on a static maze. The order starts as nearest neighbor and is
+    improved with 2-opt and Or-opt moves until no move helps or the time budget runs out.
+    A move budget caps the candidate moves examined instead, whatever the clock says, so a run
+    repeats plan for plan.
+    """
+    def __init__(self, pathfinder, time_budget=0.05, move_budget=None):
+        self.pathfinder = pathfinder
+        self.time_budget = time_budget  # Seconds of 2-opt/Or-opt improvement per plan
+        self.move_budget = move_budget  # Candidate moves examined per plan, replaces the time budget when set
+        self.moves_left = 0  # Of the current plan's move budget
+        self.fields = DistanceFieldCache(pathfinder, max_fields=0)  # Sized to the pellets in plan()
+        self.nodes = []  # Cell ids: Pacman's cell, then the reachable pellets
+        self.matrix = []  # matrix[i][j] = maze distance between nodes i and j
+        self.unreachable = []  # Pellets no path leads to, left out of the tour
+        self.reachable_cells = 0  # Cells each distance field labels
+        self.expanded = 0  # Cells labelled by the BFS runs of the last build_matrix, for the search stats
+
+    def blocked_distances(self, start, blocked):
+        """BFS distances from start that do not pass through the blocked cells, -1 where unreachable"""
+        pf = self.pathfinder
+        moves, move_table = pf.moves, pf.move_table
+        distances = array('i', [-1]) * (pf.rows * pf.cols)
+        for cell in blocked:
+            distances[cell] = -2  # Never entered
+        start_cell = pf.cell_id(start)
+        distances[start_cell] = 0
+        frontier = [start_cell]
+        while frontier:
+            next_frontier = []
+            for cell in frontier:
+                next_distance = distances[cell] + 1
+                for offset, _ in move_table[moves[cell]]:
+                    neighbor = cell + offset
+                    if distances[neighbor] == -1:
+                        distances[neighbor] = next_distance
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+        for cell in blocked:
+            if distances[cell] == -2:
+                distances[cell] = -1
+        return distances
+
+    def build_matrix(self, start, pellets, blocked=None):
+        """
+        Distance fields of every pellet, read into a node-to-node distance matrix
+        With blocked cells, the distances out of start go around them (one fresh BFS), while
+        pellet-to-pellet distances still come from the cached wall-only fields
+        """
+        pf = self.pathfinder
+        self.fields.max_fields = max(self.fields.max_fields, len(pellets) + 1)
+        misses = self.fields.misses
+        start_distances, _ = self.fields.get_field(start)
+        self.reachable_cells = sum(1 for distance in start_distances if distance >= 0)
+        self.nodes = [pf.cell_id(start)]
+        self.unreachable = []
+        for pellet in pellets:
+            cell = pf.cell_id(pellet)
+            if start_distances[cell] < 0:
+                self.unreachable.append(pellet)
+            else:
+                self.nodes.append(cell)
+        columns = [start_distances] + [self.fields.get_field(divmod(cell, pf.cols))[0] for cell in self.nodes[1:]]
+        self.matrix = [array('i', (column[cell] for column in columns)) for cell in self.nodes]
+        # Only fields built on a cache miss cost a BFS, each over every cell reachable from the start
+        self.expanded = (self.fields.misses - misses) * self.reachable_cells
+        if blocked:
+            around = self.blocked_distances(start, [pf.cell_id(pos) for pos in blocked])
+            self.expanded += sum(1 for distance in around if distance >= 0)
+            cut_off = self.reachable_cells  # Longer than any real path, so cut-off pellets go last
+            for index, cell in enumerate(self.nodes):
+                distance = around[cell] if around[cell] >= 0 else cut_off
+                self.matrix[0][index] = self.matrix[index][0] = distance
+
+    def nearest_neighbor(self):
+        """Greedy order: from the start, always the closest pellet not yet taken"""
+        matrix = self.matrix
+        remaining = set(range(1, len(self.nodes)))
+        tour = [0]
+        while remaining:
+            row = matrix[tour[-1]]
+            nearest = min(remaining, key=row.__getitem__)
+            remaining.remove(nearest)
+            tour.append(nearest)
+        return tour
+
+    def tour_length(self, tour):
+        matrix = self.matrix
+        return sum(matrix[a][b] for a, b in zip(tour, tour[1:]))
+
+    def two_opt(self, tour, deadline):
+        """Reverse segments while that shortens the open tour; tour[0] stays first. True if improved"""
+        matrix = self.matrix
+        last = len(tour) - 1
+        improved = False
+        for i in range(1, last):
+            if perf_counter() > deadline or self.moves_left <= 0:
+                break
+            self.moves_left -= last - i
+            before, first = tour[i - 1], tour[i]
+            row_before, row_first = matrix[before], matrix[first]
+            for j in range(i + 1, last + 1):
+                end = tour[j]
+                delta = row_before[end] - row_before[first]
+                if j < last:
+                    after = tour[j + 1]
+                    delta += row_first[after] - matrix[end][after]
+                if delta < 0:
+                    tour[i:j + 1] = tour[i:j + 1][::-1]
+                    improved = True
+                    first = tour[i]
+                    row_first = matrix[first]
+        return improved
+
+    def or_opt(self, tour, deadline):
+        """Move runs of 1 to 3 pellets (possibly reversed) to a cheaper place in the tour. True if improved"""
+        matrix = self.matrix  # Symmetric, maze distances do not depend on the direction walked
+        improved = False
+        for length in (1, 2, 3):
+            i = 1
+            while i + length <= len(tour):
+                if perf_counter() > deadline or self.moves_left <= 0:
+                    return improved
+                size = len(tour)
+                self.moves_left -= size
+                first, last = tour[i], tour[i + length - 1]
+                row_first, row_last = matrix[first], matrix[last]
+                prev = tour[i - 1]
+                removed_gain = row_first[prev]
+                if i + length < size:
+                    nxt = tour[i + length]
+                    removed_gain += row_last[nxt] - matrix[prev][nxt]
+                best = None
+                for k in range(size):
+                    if i - 1 <= k <= i + length - 1:
+                        continue  # Edges touching the run, inserting there changes nothing
+                    a = tour[k]
+                    if k + 1 < size:
+                        b = tour[k + 1]
+                        base = matrix[a][b]
+                        forward = row_first[a] + row_last[b] - base
+                        backward = row_last[a] + row_first[b] - base
+                    else:
+                        forward, backward = row_first[a], row_last[a]  # Appended after the tour end
+                    if forward < removed_gain and (best is None or forward < best[0]):
+                        best = (forward, k, False)
+                    if backward < removed_gain and (best is None or backward < best[0]):
+                        best = (backward, k, True)
+                if best is None:
+                    i += 1
+                    continue
+                _, k, reverse = best
+                run = tour[i:i + length]
+                if reverse:
+                    run.reverse()
+                if k < i:
+                    tour[:] = tour[:k + 1] + run + tour[k + 1:i] + tour[i + length:]
+                else:
+                    tour[:] = tour[:i] + tour[i + length:k + 1] + run + tour[k + 1:]
+                improved = True
+        return improved
+
+    def plan(self, start, pellets, blocked=None, time_budget=None, move_budget=None):
+        """
+        Visiting order of the pellets from start, as a list of positions
+        Paths out of start avoid the blocked cells (e.g. around the ghost); the pellet fields
+        are cached, so a re-plan costs one BFS plus the improvement time (or moves).
+        Unreachable pellets are left out and kept in self.unreachable.
+        """
+        pf = self.pathfinder
+        started = perf_counter_ns() if pf.stats is not None else 0
+        move_budget = self.move_budget if move_budget is None else move_budget
+        if move_budget is None:
+            deadline = perf_counter() + (self.time_budget if time_budget is None else time_budget)
+            self.moves_left = float('inf')
+        else:
+            deadline = float('inf')
+            self.moves_left = move_budget
+        self.build_matrix(start, list(pellets), blocked)
+        tour = self.nearest_neighbor()
+        improved = True
+        while improved and perf_counter() < deadline and self.moves_left > 0:
+            improved = self.two_opt(tour, deadline)
+            improved = self.or_opt(tour, deadline) or improved
+        pf.record_search('tour', 'tour_plan', started, self.expanded, len(self.nodes), len(self.nodes))
+        return [divmod(self.nodes[index], pf.cols) for index in tour[1:]]
+
+    def leg(self, start, pellet):
+        """Shortest wall-only path from start to a planned pellet, read from its cached field"""
+        return self.fields.path(start, pellet)
@@ -0,0 +1,122 @@
+import numpy as np
+
+class WavefrontBFS:
+    """
+    NumPy BFS engine: the grid is held as a boolean open-cell array and each BFS layer
+    is computed in one go by shifting the whole frontier one cell in every direction
+    and masking with the open cells not yet reached. Paths are read back by descending
+    the resulting distance field from the target to the start.
+    """
+    def __init__(self, grid):
+        if hasattr(grid, 'cells'):  # maze.Maze, read its buffer directly instead of cell by cell
+            cells = np.frombuffer(grid.cells, dtype=np.uint8).reshape(grid.rows, grid.row_bytes)
+            if grid.packed:
+                cells = np.unpackbits(cells, axis=1, bitorder='little')[:, :grid.cols]
+            self.open_cells = cells != 1
+        else:
+            self.open_cells = np.asarray(grid) != 1
+        self.rows, self.cols = self.open_cells.shape
+        # Counters of the last distance_field call: frontier cells expanded, cells reached, widest layer
+        self.last_expanded = 0
+        self.last_reached = 0
+        self.last_peak = 0
+
+    def passable(self, dynamic_obstacles=None):
+        """Open-cell mask for one search, with dynamic obstacles masked out"""
+        if not dynamic_obstacles:
+            return self.open_cells
+        passable = self.open_cells.copy()
+        for row, col in dynamic_obstacles:
+            if 0 <= row < self.rows and 0 <= col < self.cols:
+                passable[row, col] = False
+        return passable
+
+    def distance_field(self, start, dynamic_obstacles=None, stop_mask=None):
+        """
+        Expand layers from start until the wave dies out or touches stop_mask
+        Returns an int32 array of distances from start, -1 where unreached
+        """
+        # A one cell closed border lets the flat +-1 / +-width shifts run without bounds checks
+        passable = np.pad(self.passable(dynamic_obstacles), 1).ravel()
+        width = self.cols + 2
+        distances = np.full((self.rows + 2, width), -1, dtype=np.int32)
+        flat_distances = distances.ravel()
+        reached = np.zeros(passable.shape, dtype=bool)
+        stop = np.pad(stop_mask, 1).ravel() if stop_mask is not None else None
+        shifts = np.array([-width, width, -1, 1])
+
+        start_cell = (start[0] + 1) * width + start[1] + 1
+        reached[start_cell] = True
+        flat_distances[start_cell] = 0
+        frontier = np.array([start_cell])
+        layer = 0
+        self.last_expanded = 0
+        self.last_reached = 1
+        self.last_peak = 1
+
+        while stop is None or not stop[frontier].any():
+            self.last_expanded += frontier.size
+            # Shift the whole frontier one cell in every direction, then mask to open unreached cells
+            expanded = (frontier[:, None] + shifts).ravel()
+            expanded = expanded[passable[expanded]]
+            expanded = np.unique(expanded[~reached[expanded]])
+            if not expanded.size:
+                break
+            layer += 1
+            reached[expanded] = True
+            flat_distances[expanded] = layer
+            frontier = expanded
+            self.last_reached += frontier.size
+            self.last_peak = max(self.last_peak, frontier.size)
+        return distances[1:-1, 1:-1]
+
+    def descend(self, distances, target):
+        """Read the path to target back from a distance field by stepping to cells one layer closer"""
+        row, col = target
+        distance = distances[row, col]
+        if distance < 0:
+            return []
+        path = []
+        while distance > 0:
+            # (row step back towards start, col step back, direction of the forward move)
+            for dr, dc, direction in ((1, 0, 'UP'), (-1, 0, 'DOWN'), (0, 1, 'LEFT'), (0, -1, 'RIGHT')):
+                prev_row, prev_col = row + dr, col + dc
+                if (0 <= prev_row < self.rows and 0 <= prev_col < self.cols
+                        and distances[prev_row, prev_col] == distance - 1):
+                    path.append(direction)
+                    row, col = prev_row, prev_col
+                    break
+            distance -= 1
+        path.reverse()
+        return path
+
+    def bfs(self, start, target, dynamic_obstacles=None):
+        """Shortest path from start to target as a direction list"""
+        stop_mask = np.zeros((self.rows, self.cols), dtype=bool)
+        stop_mask[target] = True
+        distances = self.distance_field(start, dynamic_obstacles, stop_mask)
+        if target == start:
+            return []
+        return self.descend(distances, target)
+
+    def bfs_multi(self, start, targets, dynamic_obstacles=None):
+        """
+        Nearest target from start in a single wavefront, stopping at the first layer that holds one
+        Ties within that layer go to the first target in row-major order
+        Returns (target_position, path_to_target)
+        """
+        goal_mask = np.zeros((self.rows, self.cols), dtype=bool)
+        for row, col in targets:
+            goal_mask[row, col] = True
+        goal_mask[start] = False
+        if not goal_mask.any():
+            return None, []
+
+        distances = self.distance_field(start, dynamic_obstacles, goal_mask)
+        reached_goals = np.flatnonzero(goal_mask & (distances >= 0))
+        if reached_goals.size == 0:
+            return None, []
+        layer = distances.ravel()[reached_goals].min()
+        cell = reached_goals[distances.ravel()[reached_goals] == layer][0]
+        target = (int(cell // self.cols), int(cell % self.cols))
+        return target, self.descend(distances, target)